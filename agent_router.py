@@ -1,7 +1,7 @@
 
 import logging
 from agents.snapshot_fetcher import fetch_snapshot
-from agents.data_analysis import analyze_snapshot
+from agents.data_analysis import analyze_history, analyze_snapshot, load_history
 from agents.report_builder import build_report
 from agents.email_sender import send_email
 from config import SENDER_EMAIL, RECIPIENTS
@@ -17,6 +17,13 @@ def run_daily_pipeline():
         results = analyze_snapshot(data)
         logging.info("Snapshot analyzed. %d issues detected.", len(results))
 
+        history = load_history()
+        if not history or str(data.get("date", "")) > str(history[-1].get("date", "")):
+            history.append(data)
+        anomalies = analyze_history(history)
+        results.extend(anomalies)
+        logging.info("History of %d snapshots analyzed. %d anomalies detected.", len(history), len(anomalies))
+
         report = build_report(results)
         logging.info("Report built successfully.")
 
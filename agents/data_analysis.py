@@ -1,4 +1,26 @@
 
+from __future__ import annotations
+
+import os
+import glob
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = os.getenv("ANALYSIS_HISTORY_DIR", "daily_snapshots")
+WINDOW = int(os.getenv("ANALYSIS_WINDOW", "8"))  # snapshots in the rolling window
+MIN_PERIODS = 3  # observations needed before z-scores are reported
+Z_THRESHOLD = float(os.getenv("ANALYSIS_Z_THRESHOLD", "3.0"))
+RANK_JUMP = int(os.getenv("ANALYSIS_RANK_JUMP", "10"))
+DRIFT_THRESHOLD = float(os.getenv("ANALYSIS_DRIFT_THRESHOLD", "0.5"))  # relative to rolling mean
+
+FIELDS = ("vote_power", "rank", "reward_rate")
+
+
 def analyze_snapshot(snapshot):
     results = []
     for provider in snapshot.get("providers", []):
@@ -11,3 +33,310 @@ def analyze_snapshot(snapshot):
         elif reward_rate > 2.5:
             results.append({"provider": provider["name"], "status": "Risk of penalty", "rate": reward_rate})
     return results
+
+
+def _snapshot_day(snapshot: Dict[str, Any]) -> str:
+    """``YYYY-MM-DD`` of a daily (``date``) or legacy (``timestamp``) snapshot."""
+    return str(snapshot.get("date") or snapshot.get("timestamp") or "")[:10]
+
+
+def load_history(network: str = "flare", directory: str = HISTORY_DIR) -> List[Dict[str, Any]]:
+    """
+    Read every ``<directory>/**/<network>_*.json`` snapshot, oldest first.
+
+    Files that are empty or not valid JSON are skipped with a warning.
+    """
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "**", f"{network}_*.json"), recursive=True):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping snapshot {path}: {e}")
+            continue
+        if isinstance(data, dict):
+            snapshots.append((_snapshot_day(data), path, data))
+    snapshots.sort(key=lambda entry: entry[:2])
+    return [data for _, _, data in snapshots]
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def history_matrix(snapshots: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[str], Dict[str, np.ndarray]]:
+    """
+    Stack ``snapshots`` (oldest first) into time x provider matrices.
+
+    Returns:
+        ``(dates, provider names, {field: array of shape (T, P)})``; values a
+        provider did not report in a snapshot are NaN
+    """
+    names: Dict[str, int] = {}
+    for snapshot in snapshots:
+        for provider in snapshot.get("providers", []):
+            names.setdefault(provider.get("name", ""), len(names))
+    matrices = {field: np.full((len(snapshots), len(names)), np.nan) for field in FIELDS}
+    for t, snapshot in enumerate(snapshots):
+        for provider in snapshot.get("providers", []):
+            column = names[provider.get("name", "")]
+            for field in FIELDS:
+                matrices[field][t, column] = _number(provider.get(field))
+    dates = [str(s.get("date") or s.get("timestamp") or "") for s in snapshots]
+    return dates, list(names), matrices
+
+
+def rolling_stats(values: np.ndarray, window: int = WINDOW) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean, standard deviation and count of the ``window`` rows *before* each row.
+
+    Computed for every row and column at once from cumulative sums; NaNs are
+    ignored.
+    """
+    valid = ~np.isnan(values)
+    # Sum offsets from each column's first value: large vote powers would
+    # otherwise cancel badly and a constant history would not give std == 0
+    reference = _first_observed(values, valid)
+    filled = np.where(valid, values - reference, 0.0)
+    zero = np.zeros((1, values.shape[1]))
+    sums = np.vstack([zero, np.cumsum(filled, axis=0)])
+    squares = np.vstack([zero, np.cumsum(filled * filled, axis=0)])
+    counts = np.vstack([zero, np.cumsum(valid, axis=0)])
+
+    end = np.arange(values.shape[0])
+    start = np.maximum(0, end - window)
+    n = counts[end] - counts[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        offset = (sums[end] - sums[start]) / n
+        var = (squares[end] - squares[start]) / n - offset * offset
+    return reference + offset, np.sqrt(np.clip(var, 0.0, None)), n
+
+
+def _first_observed(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """First non-NaN value of each column (0 for columns without one)."""
+    first = values[np.argmax(valid, axis=0), np.arange(values.shape[1])]
+    return np.where(valid.any(axis=0), first, 0.0)
+
+
+def _scores(
+    value: np.ndarray, mean: np.ndarray, std: np.ndarray, count: np.ndarray,
+    rank: np.ndarray, last_rank: np.ndarray, rate: np.ndarray, rate_mean: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ready = count >= MIN_PERIODS
+        zscore = np.where(ready & (std > 0), (value - mean) / std, np.nan)
+        # A constant history followed by a change is infinitely unusual
+        zscore = np.where(ready & (std == 0) & (value != mean), np.sign(value - mean) * np.inf, zscore)
+        return {
+            "zscore": zscore,
+            "rank_jump": rank - last_rank,
+            "drift": np.where(rate_mean > 0, (rate - rate_mean) / rate_mean, np.nan),
+        }
+
+
+def _anomalies(
+    date: str, names: Sequence[str], scores: Dict[str, np.ndarray],
+    values: np.ndarray, rates: np.ndarray, ranks: np.ndarray,
+    z_threshold: float, rank_jump: int, drift_threshold: float,
+) -> List[Dict[str, Any]]:
+    """Turn one row of scores into report entries."""
+    zscore, jump, drift = scores["zscore"], scores["rank_jump"], scores["drift"]
+    with np.errstate(invalid="ignore"):
+        flagged = (np.abs(zscore) >= z_threshold) | (np.abs(jump) >= rank_jump) | (np.abs(drift) >= drift_threshold)
+    results = []
+    for column in np.flatnonzero(flagged):
+        z, j, d = zscore[column], jump[column], drift[column]
+        if abs(z) >= z_threshold:
+            status = "Vote power collapse" if z < 0 else "Vote power surge"
+        elif abs(j) >= rank_jump:
+            status = f"Rank {'dropped' if j > 0 else 'rose'} {abs(int(j))} places"
+        else:
+            status = f"Reward rate drift {d:+.0%}"
+        results.append({
+            "provider": names[column],
+            "date": date,
+            "status": status,
+            "rate": float(np.nan_to_num(rates[column])),
+            "vote_power": float(values[column]),
+            "rank": None if np.isnan(ranks[column]) else int(ranks[column]),
+            "zscore": None if np.isnan(z) else float(z),
+            "rank_jump": None if np.isnan(j) else int(j),
+            "reward_rate_drift": None if np.isnan(d) else float(d),
+        })
+    return results
+
+
+def _last_observed(values: np.ndarray) -> np.ndarray:
+    """For each row, the most recent non-NaN value in earlier rows (NaN if none)."""
+    rows = np.where(~np.isnan(values), np.arange(values.shape[0])[:, None], -1)
+    latest = np.maximum.accumulate(rows, axis=0)
+    previous = np.vstack([np.full((1, values.shape[1]), -1), latest[:-1]])
+    taken = values[np.maximum(previous, 0), np.arange(values.shape[1])]
+    return np.where(previous >= 0, taken, np.nan)
+
+
+def analyze_history(
+    snapshots: Sequence[Dict[str, Any]],
+    window: int = WINDOW,
+    z_threshold: float = Z_THRESHOLD,
+    rank_jump: int = RANK_JUMP,
+    drift_threshold: float = DRIFT_THRESHOLD,
+    latest_only: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Flag vote power collapses/surges, rank jumps and reward-rate drift.
+
+    Every provider is compared with its own rolling window of the previous
+    ``window`` snapshots. All snapshots are scored in one vectorized pass.
+
+    Args:
+        snapshots: Snapshots of one network, oldest first
+        latest_only: Only report anomalies of the newest snapshot
+
+    Returns:
+        Entries with ``provider``, ``date``, ``status`` and ``rate`` (as used
+        by ``build_report``) plus the underlying scores
+    """
+    if not snapshots:
+        return []
+    dates, names, m = history_matrix(snapshots)
+    mean, std, count = rolling_stats(m["vote_power"], window)
+    rate_mean, _, _ = rolling_stats(m["reward_rate"], window)
+    scores = _scores(
+        m["vote_power"], mean, std, count, m["rank"], _last_observed(m["rank"]), m["reward_rate"], rate_mean
+    )
+    rows = [len(dates) - 1] if latest_only else range(len(dates))
+    results = []
+    for t in rows:
+        row_scores = {key: value[t] for key, value in scores.items()}
+        results.extend(_anomalies(
+            dates[t], names, row_scores, m["vote_power"][t], m["reward_rate"][t], m["rank"][t],
+            z_threshold, rank_jump, drift_threshold,
+        ))
+    return results
+
+
+class _RollingWindow:
+    """
+    Ring buffer with running sums: O(1) per column to add a row.
+
+    Values are stored as offsets from each column's first observation, and
+    the sums are recomputed from the buffer every time it wraps around, so
+    rounding errors cannot build up over a long stream.
+    """
+
+    def __init__(self, window: int, columns: int = 0):
+        self.window = window
+        self.values = np.zeros((window, columns))
+        self.valid = np.zeros((window, columns), dtype=bool)
+        self.reference = np.full(columns, np.nan)
+        self.sums = np.zeros(columns)
+        self.squares = np.zeros(columns)
+        self.counts = np.zeros(columns)
+        self.position = 0
+
+    def grow(self, columns: int) -> None:
+        extra = columns - self.sums.size
+        if extra <= 0:
+            return
+        self.values = np.hstack([self.values, np.zeros((self.window, extra))])
+        self.valid = np.hstack([self.valid, np.zeros((self.window, extra), dtype=bool)])
+        self.reference = np.concatenate([self.reference, np.full(extra, np.nan)])
+        self.sums = np.concatenate([self.sums, np.zeros(extra)])
+        self.squares = np.concatenate([self.squares, np.zeros(extra)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra)])
+
+    def stats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            offset = self.sums / self.counts
+            var = self.squares / self.counts - offset * offset
+        return self.reference + offset, np.sqrt(np.clip(var, 0.0, None)), self.counts.copy()
+
+    def push(self, row: np.ndarray) -> None:
+        valid = ~np.isnan(row)
+        unset = valid & np.isnan(self.reference)
+        self.reference[unset] = row[unset]
+        filled = np.where(valid, row - self.reference, 0.0)
+        old = self.values[self.position]
+        self.sums += filled - old
+        self.squares += filled * filled - old * old
+        self.counts += valid.astype(float) - self.valid[self.position]
+        self.values[self.position] = filled
+        self.valid[self.position] = valid
+        self.position = (self.position + 1) % self.window
+        if self.position == 0:
+            self.sums = self.values.sum(axis=0)
+            self.squares = (self.values * self.values).sum(axis=0)
+            self.counts = self.valid.sum(axis=0).astype(float)
+
+
+class AnomalyDetector:
+    """
+    Incremental version of :func:`analyze_history` for a stream of snapshots.
+
+    Each :meth:`update` scores the new snapshot against the rolling windows
+    and then adds it, in constant time per provider.
+    """
+
+    def __init__(
+        self,
+        window: int = WINDOW,
+        z_threshold: float = Z_THRESHOLD,
+        rank_jump: int = RANK_JUMP,
+        drift_threshold: float = DRIFT_THRESHOLD,
+    ):
+        self.z_threshold = z_threshold
+        self.rank_jump = rank_jump
+        self.drift_threshold = drift_threshold
+        self.columns: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.vote_power = _RollingWindow(window)
+        self.reward_rate = _RollingWindow(window)
+        self.last_rank = np.zeros(0)
+
+    def _row(self, snapshot: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        for provider in snapshot.get("providers", []):
+            name = provider.get("name", "")
+            if name not in self.columns:
+                self.columns[name] = len(self.names)
+                self.names.append(name)
+        size = len(self.names)
+        self.vote_power.grow(size)
+        self.reward_rate.grow(size)
+        if self.last_rank.size < size:
+            self.last_rank = np.concatenate([self.last_rank, np.full(size - self.last_rank.size, np.nan)])
+
+        row = {field: np.full(size, np.nan) for field in FIELDS}
+        for provider in snapshot.get("providers", []):
+            column = self.columns[provider.get("name", "")]
+            for field in FIELDS:
+                row[field][column] = _number(provider.get(field))
+        return row
+
+    def update(self, snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score ``snapshot`` against the history, add it, and return its anomalies."""
+        row = self._row(snapshot)
+        mean, std, count = self.vote_power.stats()
+        rate_mean, _, _ = self.reward_rate.stats()
+        scores = _scores(
+            row["vote_power"], mean, std, count, row["rank"], self.last_rank, row["reward_rate"], rate_mean
+        )
+        date = str(snapshot.get("date") or snapshot.get("timestamp") or "")
+        results = _anomalies(
+            date, self.names, scores, row["vote_power"], row["reward_rate"], row["rank"],
+            self.z_threshold, self.rank_jump, self.drift_threshold,
+        )
+        self.vote_power.push(row["vote_power"])
+        self.reward_rate.push(row["reward_rate"])
+        seen = ~np.isnan(row["rank"])
+        self.last_rank[seen] = row["rank"][seen]
+        return results
+
+    def update_all(self, snapshots: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for snapshot in snapshots:
+            results.extend(self.update(snapshot))
+        return results
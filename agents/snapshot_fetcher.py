@@ -1,8 +1,215 @@
 
-import requests
+from __future__ import annotations
 
-def fetch_snapshot(url="https://tripkane.github.io/flare-ftso-snapshot/snapshot.json"):
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    raise Exception("Failed to fetch snapshot")
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from exceptions import NetworkError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "https://tripkane.github.io/flare-ftso-snapshot/snapshot.json"
+LOCAL_DIRS = ("daily_snapshots", os.path.join("docs", "daily_snapshots"))
+CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR", os.path.join(".cache", "snapshots"))
+CACHE_MAX_AGE = float(os.getenv("SNAPSHOT_CACHE_MAX_AGE", "300"))  # seconds without revalidation
+FETCH_TIMEOUT = float(os.getenv("SNAPSHOT_FETCH_TIMEOUT", "10"))  # seconds
+
+
+class SnapshotSource:
+    """Somewhere a snapshot can come from; ``get`` returns None if unavailable."""
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class LocalSnapshotSource(SnapshotSource):
+    """
+    Newest snapshot of ``network`` in the local checkout.
+
+    The manifest (the local index) is consulted first; directories without
+    one are searched for ``<network>_*_YYYY-MM-DD.json`` files.
+    """
+
+    def __init__(self, network: str = "flare", directories: Sequence[str] = LOCAL_DIRS):
+        self.network = network
+        self.directories = tuple(directories)
+
+    def _from_manifest(self, directory: str) -> Optional[str]:
+        try:
+            with open(os.path.join(directory, "manifest.json")) as f:
+                entries = json.load(f).get(self.network, [])
+        except (OSError, ValueError, AttributeError):
+            return None
+        for entry in sorted(entries, key=_snapshot_date, reverse=True):
+            path = os.path.join(directory, entry)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _from_listing(self, directory: str) -> Optional[str]:
+        newest = None
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.startswith(f"{self.network}_") and filename.endswith(".json"):
+                    path = os.path.join(root, filename)
+                    if newest is None or _snapshot_date(path) > _snapshot_date(newest):
+                        newest = path
+        return newest
+
+    def latest_path(self) -> Optional[str]:
+        for directory in self.directories:
+            path = self._from_manifest(directory) or self._from_listing(directory)
+            if path:
+                return path
+        return None
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        path = self.latest_path()
+        if path is None:
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read local snapshot {path}: {e}")
+            return None
+        logger.info(f"Using local snapshot {path}")
+        return data
+
+
+class RemoteSnapshotSource(SnapshotSource):
+    """
+    Snapshot fetched over HTTP and kept in an on-disk cache.
+
+    A cached copy younger than ``max_age`` is used without any request.
+    Older copies are revalidated with ``If-None-Match``/``If-Modified-Since``
+    and a ``304`` reuses the cached body. If the request fails, a cached
+    copy is returned rather than nothing.
+
+    Args:
+        url: Snapshot URL
+        cache_dir: Directory for cached bodies and their validators
+        max_age: Seconds a cached copy is trusted without revalidation
+        timeout: Request timeout in seconds
+        http_get: ``requests.get``-compatible callable, injectable for tests
+    """
+
+    def __init__(
+        self,
+        url: str = DEFAULT_URL,
+        cache_dir: str = CACHE_DIR,
+        max_age: float = CACHE_MAX_AGE,
+        timeout: float = FETCH_TIMEOUT,
+        http_get: Optional[Callable[..., Any]] = None,
+    ):
+        self.url = url
+        self.max_age = max_age
+        self.timeout = timeout
+        self.http_get = http_get
+        stem = hashlib.sha1(url.encode()).hexdigest()[:16]
+        self.body_path = os.path.join(cache_dir, f"{stem}.json")
+        self.meta_path = os.path.join(cache_dir, f"{stem}.meta.json")
+        self.requests_made = 0
+
+    def _load_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            with open(self.body_path) as f:
+                meta["data"] = json.load(f)
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, data: Any, etag: Optional[str], last_modified: Optional[str]) -> None:
+        os.makedirs(os.path.dirname(self.body_path) or ".", exist_ok=True)
+        for path, payload in (
+            (self.body_path, data),
+            (self.meta_path, {"url": self.url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}),
+        ):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+
+    def _touch(self) -> None:
+        """Record a successful revalidation so the copy is fresh again."""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            meta["fetched_at"] = time.time()
+            with open(self.meta_path, "w") as f:
+                json.dump(meta, f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        cached = self._load_cache()
+        if cached and time.time() - cached.get("fetched_at", 0) < self.max_age:
+            return cached["data"]
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        http_get = self.http_get
+        if http_get is None:
+            import requests
+            http_get = requests.get
+        try:
+            self.requests_made += 1
+            response = http_get(self.url, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            if cached:
+                logger.warning(f"Fetching {self.url} failed ({e}); using cached copy")
+                return cached["data"]
+            raise NetworkError(f"Failed to fetch snapshot from {self.url}: {e}")
+
+        if response.status_code == 304 and cached:
+            self._touch()
+            return cached["data"]
+        if response.status_code == 200:
+            data = response.json()
+            self._save_cache(data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return data
+        if cached:
+            logger.warning(f"Fetching {self.url} returned HTTP {response.status_code}; using cached copy")
+            return cached["data"]
+        return None
+
+
+class ChainedSnapshotSource(SnapshotSource):
+    """Return the snapshot of the first source that has one."""
+
+    def __init__(self, sources: Iterable[SnapshotSource]):
+        self.sources: List[SnapshotSource] = list(sources)
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        for source in self.sources:
+            data = source.get()
+            if data is not None:
+                return data
+        return None
+
+
+def _snapshot_date(path: str) -> str:
+    return os.path.basename(path).rsplit("_", 1)[-1]
+
+
+def default_source(url: str = DEFAULT_URL, network: str = "flare") -> SnapshotSource:
+    """Local checkout first, then the cached remote copy."""
+    return ChainedSnapshotSource([LocalSnapshotSource(network), RemoteSnapshotSource(url)])
+
+
+def fetch_snapshot(url=DEFAULT_URL, source: Optional[SnapshotSource] = None):
+    data = (source or default_source(url)).get()
+    if data is None:
+        raise NetworkError("Failed to fetch snapshot")
+    return data
@@ -0,0 +1,107 @@
+"""
+LRU + TTL cache for generated answers.
+
+Answers are keyed on the normalised question, the context budget and the
+snapshot data version, so a new snapshot view invalidates every earlier
+answer without any explicit bookkeeping. The cache records how often it was
+hit and how much generation time those hits saved.
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))  # seconds
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercase ``question``, drop punctuation and collapse whitespace.
+
+    Every word is kept: questions differing only in words such as "most" or
+    "how many" ask for different answers.
+    """
+    return " ".join(_PUNCTUATION_RE.sub(" ", question.lower()).split())
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+        ttl: Seconds an entry stays valid
+        clock: Monotonic time source, injectable for tests
+    """
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (expires at, answer, seconds it took to generate)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(question: str, version: int, *extra: Hashable) -> Tuple[Hashable, ...]:
+        return (normalize_question(question), version) + extra
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached answer for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, answer, cost = entry
+            if self.clock() >= expires:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += cost
+            return answer
+
+    def put(self, key: Hashable, answer: Any, cost: float = 0.0) -> None:
+        """Store ``answer`` that took ``cost`` seconds to produce."""
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, answer, cost)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
@@ -0,0 +1,127 @@
+"""
+Benchmark the query server's inference backends on this machine.
+
+Each backend runs in a fresh subprocess, so the load time and peak RSS are
+not skewed by earlier backends. Reported per backend: model load time,
+generated tokens per second for single prompts and for one padded batch,
+and peak resident memory.
+
+Requires transformers and torch; the onnx backend also needs
+``optimum[onnxruntime]``.
+
+Usage:
+    python benchmarks/bench_inference.py [--backends torch torch-int8 onnx] [--model gpt2]
+                                         [--threads 4] [--prompts 8] [--new-tokens 32]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+PROMPT = (
+    "Answer this question about the FTSO dataset:\n"
+    "network|date|epoch|rank|name|vote_power|reward_rate\n"
+    "flare|2025-07-31|35|1|Bifrost Wallet|1676293923|0.0356\n"
+    "flare|2025-07-31|35|2|Flare.Space|1496426166|0.0456\n"
+    "Question: {question}\nAnswer:"
+)
+QUESTIONS = [
+    "Who has the most vote power?",
+    "What is the reward rate of Flare.Space?",
+    "Which provider is ranked second?",
+    "How much vote power does Bifrost Wallet have?",
+]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(name, model, threads, prompts, new_tokens):
+    """Load ``name`` and time generation; runs inside the child process."""
+    from inference_backends import get_backend
+    from inference_worker import pipeline_batch, prepare_for_batching
+
+    start = time.perf_counter()
+    text_gen = prepare_for_batching(get_backend(name, model=model, threads=threads).load())
+    load = time.perf_counter() - start
+
+    tokenizer = text_gen.tokenizer
+    texts = [PROMPT.format(question=QUESTIONS[i % len(QUESTIONS)]) for i in range(prompts)]
+    kwargs = {"max_new_tokens": new_tokens, "do_sample": False}
+
+    def generated_tokens(prompt, output):
+        return len(tokenizer(output[len(prompt):])["input_ids"])
+
+    text_gen(texts[0], **kwargs)  # warm-up
+
+    start = time.perf_counter()
+    tokens = 0
+    for text in texts:
+        output = text_gen(text, **kwargs)[0]["generated_text"]
+        tokens += generated_tokens(text, output)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outputs = pipeline_batch(lambda p, **kw: text_gen(p, **kwargs, **kw), texts)
+    batched = time.perf_counter() - start
+    batch_tokens = sum(generated_tokens(t, o) for t, o in zip(texts, outputs))
+
+    return {
+        "backend": name,
+        "load_s": round(load, 2),
+        "tokens_per_s": round(tokens / sequential, 1) if sequential else 0.0,
+        "batched_tokens_per_s": round(batch_tokens / batched, 1) if batched else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench(name, args):
+    """Run one backend in a subprocess and return its result dict."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child", name,
+        "--model", args.model, "--threads", str(args.threads),
+        "--prompts", str(args.prompts), "--new-tokens", str(args.new_tokens),
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+        return {"backend": name, "error": error}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query_server inference backends.")
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--model", default=os.getenv("INFERENCE_MODEL", "gpt2"))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("INFERENCE_THREADS", "0")))
+    parser.add_argument("--prompts", type=int, default=8, help="Prompts per measurement")
+    parser.add_argument("--new-tokens", type=int, default=32, help="Tokens generated per prompt")
+    parser.add_argument("--child", metavar="BACKEND", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.model, args.threads, args.prompts, args.new_tokens)))
+        return
+
+    print(f"model={args.model} threads={args.threads or 'default'} prompts={args.prompts} new_tokens={args.new_tokens}")
+    print(f"{'backend':<12} {'load s':>8} {'tok/s':>8} {'batch tok/s':>12} {'peak RSS MB':>12}")
+    for name in args.backends:
+        result = bench(name, args)
+        if "error" in result:
+            print(f"{name:<12} error: {result['error']}")
+            continue
+        print(
+            f"{name:<12} {result['load_s']:>8.2f} {result['tokens_per_s']:>8.1f} "
+            f"{result['batched_tokens_per_s']:>12.1f} {result['peak_rss_mb']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark flaremetrics page loads under each scraping profile.
+
+For every profile a fresh browser performs a cold load (new session, empty
+cache) followed by warm loads in the same session. Reported per load:
+time until the provider table is ready, number of network requests and
+bytes transferred according to the browser's Resource Timing entries.
+
+Requires Chrome/Chromium and chromedriver (see ``CHROMIUM_BINARY`` and
+``CHROMEDRIVER``).
+
+Usage:
+    python benchmarks/bench_page_load.py [--network flare] [--warm 3] [--profiles full lean]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from webdriver_manager import WebDriverManager, get_profile, PROFILES
+from page_readiness import wait_for_table_rows
+from snapshot import flaremetrics_url
+
+_TRANSFER_SCRIPT = """
+const entries = performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const e of entries) { bytes += e.transferSize || 0; }
+return [entries.length, bytes];
+"""
+
+
+def measure_load(driver, url):
+    """Load ``url`` and return (seconds to table ready, rows, requests, bytes)."""
+    driver.execute_script("performance.clearResourceTimings();")
+    start = time.perf_counter()
+    driver.get(url)
+    readiness = wait_for_table_rows(driver)
+    elapsed = time.perf_counter() - start
+    requests, transferred = driver.execute_script(_TRANSFER_SCRIPT)
+    return elapsed, readiness.rows, requests, transferred
+
+
+def bench_profile(name, url, warm_loads):
+    manager = WebDriverManager(profile=get_profile(name))
+    start = time.perf_counter()
+    driver = manager.create_driver()
+    startup = time.perf_counter() - start
+    try:
+        results = [("cold",) + measure_load(driver, url)]
+        for i in range(warm_loads):
+            results.append((f"warm{i + 1}",) + measure_load(driver, url))
+    finally:
+        manager.cleanup_driver(driver)
+    return startup, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--network", default="flare", choices=["flare", "songbird"])
+    parser.add_argument("--warm", type=int, default=3, help="Warm loads per profile")
+    parser.add_argument("--profiles", nargs="+", default=sorted(PROFILES), choices=sorted(PROFILES))
+    args = parser.parse_args()
+
+    url = flaremetrics_url(args.network)
+    print(f"{url}\n")
+    print(f"{'profile':<8} {'load':<6} {'ready s':>8} {'rows':>5} {'requests':>9} {'KiB':>9}")
+    for name in args.profiles:
+        startup, results = bench_profile(name, url, args.warm)
+        for label, elapsed, rows, requests, transferred in results:
+            print(
+                f"{name:<8} {label:<6} {elapsed:8.2f} {rows:5d} {requests:9d} "
+                f"{transferred / 1024:9.1f}"
+            )
+        print(f"{name:<8} {'start':<6} {startup:8.2f}  (browser start-up)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark the flaremetrics table parser backends.
+
+Pages are either saved HTML files passed on the command line or fixtures
+rendered from the saved daily snapshot JSON files, so the row count matches
+the real provider tables. Every backend is checked against the original
+BeautifulSoup implementation before timing.
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat N] [page.html ...]
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import argparse
+from html import escape
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flaremetrics_parser import (
+    available_backends,
+    parse_provider_table,
+    extract_numbers,
+    extract_decimal,
+)
+
+
+def legacy_parse(html):
+    """Original per-cell BeautifulSoup parser kept as the baseline."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    providers = []
+    # Table columns: rank, Name, Vote Power, Vote Power %, 24h %, Reward Rate, Registered
+    for row in soup.select("table tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) >= 7:
+            rank = cols[0].get_text(strip=True)
+            name = cols[1].get_text(strip=True)
+            raw_vote = cols[2].get_text("", strip=True)
+            raw_vote_pct = cols[3].get_text("", strip=True)
+            raw_change_24h = cols[4].get_text("", strip=True)
+            raw_reward = cols[5].get_text("", strip=True)
+            registered = cols[6].get_text(strip=True)
+
+            # --- Updated vote_power/vote_power_locked logic ---
+            vote_nums = extract_numbers(raw_vote)
+            if len(vote_nums) >= 2:
+                # Already split, just clean commas and convert to int
+                vote_power = int(vote_nums[0].replace(",", "")) if vote_nums[0] else 0
+                vote_power_locked = int(vote_nums[1].replace(",", "")) if vote_nums[1] else 0
+            elif len(vote_nums) == 1:
+                # Single number present. Check for doubled value pattern.
+                num = vote_nums[0].replace(",", "")
+                if num and len(num) % 2 == 0:
+                    half = len(num) // 2
+                    first, second = num[:half], num[half:]
+                    if first == second:
+                        vote_power = int(first)
+                        vote_power_locked = int(second)
+                    else:
+                        vote_power = int(num)
+                        vote_power_locked = int(num)
+                else:
+                    vote_power = int(num) if num else 0
+                    vote_power_locked = int(num) if num else 0
+            else:
+                # Fallback: try to split the raw_vote string in half (legacy case)
+                vp = raw_vote.replace(",", "")
+                if vp and len(vp) % 2 == 0:
+                    mid = len(vp) // 2
+                    vp1 = vp[:mid]
+                    vp2 = vp[mid:]
+                    vote_power = int(vp1) if vp1.isdigit() else 0
+                    vote_power_locked = int(vp2) if vp2.isdigit() else 0
+                else:
+                    vote_power = 0
+                    vote_power_locked = 0
+
+            # Extract vote power percentages
+            pcts = re.findall(r"[0-9][0-9.,]*%", raw_vote_pct)
+            vote_power_pct = float(pcts[0].replace('%', '').replace(',', '')) if len(pcts) > 0 else 0.0
+            vote_power_pct_locked = float(pcts[1].replace('%', '').replace(',', '')) if len(pcts) > 1 else 0.0
+
+            # 24h change percent
+            change_pcts = re.findall(r"[0-9][0-9.,]*%", raw_change_24h)
+            change_24h_pct = float(change_pcts[0].replace('%', '').replace(',', '')) if change_pcts else 0.0
+
+            # Reward rate as decimal
+            reward_rate = float(extract_decimal(raw_reward)) if extract_decimal(raw_reward) else 0.0
+
+            providers.append({
+                "rank": rank,
+                "name": name,
+                "vote_power": vote_power,
+                "vote_power_locked": vote_power_locked,
+                "vote_power_pct": vote_power_pct,
+                "vote_power_pct_locked": vote_power_pct_locked,
+                "change_24h_pct": change_24h_pct,
+                "reward_rate": reward_rate,
+                "registered": registered
+            })
+    return providers
+
+
+def render_page(snapshot):
+    """Render a flaremetrics-like page from a saved daily snapshot."""
+    rows = []
+    for p in snapshot.get("providers", []):
+        rows.append(
+            "<tr>"
+            f"<td>{escape(str(p.get('rank', '')))}</td>"
+            f"<td><a href=\"#\"><img src=\"logo.png\"> {escape(p.get('name', ''))}</a></td>"
+            f"<td><div><span>{p.get('vote_power', 0):,}</span><span>{p.get('vote_power_locked', 0):,}</span></div></td>"
+            f"<td><span>{p.get('vote_power_pct', 0)}%</span> <span>{p.get('vote_power_pct_locked', 0)}%</span></td>"
+            f"<td><span>{p.get('change_24h_pct', 0)}%</span></td>"
+            f"<td><!--[-->{p.get('reward_rate', 0)}<!--]--></td>"
+            f"<td>{escape(str(p.get('registered', '')))}</td>"
+            "</tr>"
+        )
+    return (
+        "<html><body><div id=\"app\"><table><thead><tr><th>#</th></tr></thead><tbody>"
+        + "".join(rows)
+        + "</tbody></table></div></body></html>"
+    )
+
+
+def load_pages(paths):
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                pages.append((os.path.basename(path), f.read()))
+        return pages
+    pages = []
+    for path in sorted(glob.glob(os.path.join("daily_snapshots", "*", "*.json"))):
+        with open(path) as f:
+            snapshot = json.load(f)
+        if snapshot.get("providers") and "vote_power" in snapshot["providers"][0]:
+            pages.append((os.path.basename(path), render_page(snapshot)))
+    return pages
+
+
+def time_parser(func, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, html in pages:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pages", nargs="*", help="Saved flaremetrics HTML pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print("No pages to parse")
+        return
+    rows = sum(len(legacy_parse(html)) for _, html in pages)
+    print(f"{len(pages)} pages, {rows} provider rows, best of {args.repeat}")
+
+    baseline = time_parser(legacy_parse, pages, args.repeat)
+    print(f"{'legacy bs4':<12} {baseline * 1000:9.1f} ms   1.00x")
+
+    for backend in available_backends():
+        for name, html in pages:
+            if parse_provider_table(html, backend) != legacy_parse(html):
+                raise SystemExit(f"{backend} output differs from legacy parser on {name}")
+        elapsed = time_parser(lambda html: parse_provider_table(html, backend), pages, args.repeat)
+        print(f"{backend:<12} {elapsed * 1000:9.1f} ms {baseline / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
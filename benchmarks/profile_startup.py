@@ -0,0 +1,115 @@
+"""
+Profile start-up time of the collection entry points.
+
+Each target runs in a fresh interpreter. Wall-clock time is the median of
+``--runs`` invocations; a separate ``-X importtime`` run shows which modules
+dominate the import cost. Targets slower than ``--budget`` milliseconds are
+flagged, and ``--check`` turns that into a non-zero exit status.
+
+Usage:
+    python benchmarks/profile_startup.py [--runs 5] [--top 10] [--budget 200] [--check]
+    python benchmarks/profile_startup.py --raw snapshot   # dump raw importtime lines
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# name -> (python arguments, subject to the start-up budget)
+TARGETS = {
+    "snapshot --help": (["snapshot.py", "--help"], True),
+    "snapshot schedule-check": ([
+        "-c",
+        "import snapshot; snapshot.is_current_time_epoch_start(snapshot.load_epoch_schedule())",
+    ], True),
+    "current_vote_power --help": (["current_vote_power.py", "--help"], True),
+    "current_vote_power_rpc --help": (["current_vote_power_rpc.py", "--help"], True),
+    "collector_daemon --help": (["collector_daemon.py", "--help"], True),
+    "clean_snapshots import": (["-c", "import clean_snapshots"], True),
+    "export_history --help": (["export_history.py", "--help"], True),
+    # The web server is long-lived; its import time is reported for reference only
+    "query_server import": (["-c", "import query_server"], False),
+}
+
+
+def run_wall(args, runs):
+    """Return the median wall time in milliseconds of ``python <args>``."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable] + args, cwd=ROOT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_importtime(args):
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args, cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line.split(":", 1)[1].split("|")
+        # Nesting depth is encoded as indentation of the module name
+        rows.append((name.rstrip()[1:], int(self_us), int(cumulative)))
+    return rows
+
+
+def top_level(rows):
+    """Return rows imported directly by the target (not nested imports)."""
+    return [row for row in rows if not row[0].startswith(" ")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="Invocations per target")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imports to list per target")
+    parser.add_argument("--budget", type=float, default=200.0, help="Start-up budget in ms")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any target exceeds the budget")
+    parser.add_argument("--raw", metavar="TARGET", help="Print raw importtime output for TARGET and exit")
+    args = parser.parse_args()
+
+    if args.raw:
+        matches = [name for name in TARGETS if name.startswith(args.raw)]
+        if not matches:
+            parser.error(f"unknown target: {args.raw}")
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime"] + TARGETS[matches[0]][0], cwd=ROOT,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        sys.stdout.write(proc.stderr)
+        return
+
+    over_budget = []
+    baseline = run_wall(["-c", "pass"], args.runs)
+    print(f"interpreter baseline: {baseline:.0f} ms\n")
+    for name, (target, budgeted) in TARGETS.items():
+        wall = run_wall(target, args.runs)
+        flag = "  OVER BUDGET" if budgeted and wall > args.budget else ""
+        print(f"{name:<32} {wall:7.0f} ms{flag}")
+        if flag:
+            over_budget.append(name)
+
+        heaviest = sorted(top_level(run_importtime(target)), key=lambda row: row[2], reverse=True)
+        for module, _, cumulative in heaviest[: args.top]:
+            print(f"    {module:<36} {cumulative / 1000:7.1f} ms")
+        print()
+
+    if over_budget:
+        print(f"{len(over_budget)} target(s) over the {args.budget:.0f} ms budget: {', '.join(over_budget)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Pre-aggregated dashboard bundles.
+
+Run after each collection. For every network this writes
+``docs/bundles/<network>.json`` (and a gzip-compressed ``.json.gz`` copy) so
+the dashboard loads one file instead of a manifest plus one request per
+snapshot. A bundle holds:
+
+* ``providers`` - every provider name once; everything else refers to
+  providers by their index in this list
+* ``daily`` - the epoch snapshots as columns: ``dates``, one time x provider
+  matrix per field (``null`` where a provider is absent) and ``rows``, the
+  provider indices of each snapshot in their original order
+* ``current`` - the same layout for the most recent current vote power files
+  (``timestamps`` instead of ``dates``)
+* ``latest`` in each section - provider indices of the newest entry ranked by
+  vote power
+
+Files are only rewritten when their content changes, so unchanged bundles do
+not show up in the workflow's commit.
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import gzip
+import json
+import logging
+import argparse
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+NETWORKS = ("flare", "songbird")
+DAILY_DIR = os.path.join("docs", "daily_snapshots")
+CURRENT_DIR = os.path.join("docs", "current_vote_power")
+BUNDLE_DIR = os.getenv("BUNDLE_DIR", os.path.join("docs", "bundles"))
+CURRENT_FILES = int(os.getenv("BUNDLE_CURRENT_FILES", "48"))  # newest current vote power files kept
+
+_STAMP_RE = re.compile(r"\d{4}-\d{2}-\d{2}(T[\d-]+Z)?")
+
+
+def file_stamp(path: str) -> str:
+    """Date or timestamp in a snapshot file name, used to order files."""
+    match = _STAMP_RE.search(os.path.basename(path))
+    return match.group(0) if match else os.path.basename(path)
+
+
+def list_files(directory: str, network: str) -> List[str]:
+    """
+    Paths of ``network``'s snapshot files in ``directory``, oldest first.
+
+    The directory's manifest decides which files are published; directories
+    without one are listed recursively.
+    """
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            entries = json.load(f).get(network, [])
+        paths = [os.path.join(directory, entry) for entry in entries]
+    except (OSError, ValueError, AttributeError):
+        paths = [
+            os.path.join(root, filename)
+            for root, _, files in os.walk(directory)
+            for filename in files
+            if filename.startswith(f"{network}_") and filename.endswith(".json")
+        ]
+    return sorted((p for p in paths if os.path.exists(p)), key=file_stamp)
+
+
+def _load(paths: Sequence[str]) -> List[Dict[str, Any]]:
+    snapshots = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable snapshot {path}: {e}")
+            continue
+        if isinstance(data, dict) and isinstance(data.get("providers"), list):
+            snapshots.append(data)
+    return snapshots
+
+
+def _ranking(columns: Dict[str, List[List[Any]]], row: Sequence[int]) -> List[int]:
+    """Provider indices of the last snapshot, highest vote power first."""
+    field = "vote_power" if "vote_power" in columns else "vote_power_pct"
+    values = columns.get(field, [[]])[-1]
+
+    def key(index: int) -> float:
+        value = values[index] if index < len(values) else None
+        return -value if isinstance(value, (int, float)) else float("inf")
+
+    return sorted(row, key=key)
+
+
+def encode_section(
+    snapshots: Sequence[Dict[str, Any]], providers: Dict[str, int], time_key: str
+) -> Dict[str, Any]:
+    """
+    Encode ``snapshots`` as columns over the shared ``providers`` dictionary.
+
+    Names not yet in ``providers`` are appended to it.
+    """
+    fields: Dict[str, None] = {}
+    rows: List[List[int]] = []
+    for snapshot in snapshots:
+        row = []
+        for provider in snapshot["providers"]:
+            name = provider.get("name", "")
+            row.append(providers.setdefault(name, len(providers)))
+            fields.update((key, None) for key in provider if key != "name")
+        rows.append(row)
+
+    columns: Dict[str, List[List[Any]]] = {field: [] for field in fields}
+    for snapshot in snapshots:
+        values = {field: [None] * len(providers) for field in fields}
+        for provider in snapshot["providers"]:
+            index = providers[provider.get("name", "")]
+            for field in fields:
+                values[field][index] = provider.get(field)
+        for field in fields:
+            columns[field].append(values[field])
+
+    times = [snapshot.get(time_key) for snapshot in snapshots]
+    return {
+        time_key + "s": times,
+        "rows": rows,
+        "columns": columns,
+        "latest": _ranking(columns, rows[-1]) if rows else [],
+    }
+
+
+def _pad(section: Dict[str, Any], width: int) -> None:
+    """Widen every matrix row to ``width`` providers (names added by a later section)."""
+    for matrix in section["columns"].values():
+        for values in matrix:
+            values.extend([None] * (width - len(values)))
+
+
+def build_bundle(
+    network: str,
+    daily_dir: str = DAILY_DIR,
+    current_dir: str = CURRENT_DIR,
+    current_files: int = CURRENT_FILES,
+) -> Dict[str, Any]:
+    """Return the bundle for ``network``."""
+    providers: Dict[str, int] = {}
+    daily = encode_section(_load(list_files(daily_dir, network)), providers, "date")
+    recent = list_files(current_dir, network)[-current_files:] if current_files > 0 else []
+    current = encode_section(_load(recent), providers, "timestamp")
+    _pad(daily, len(providers))
+    _pad(current, len(providers))
+    return {
+        "version": BUNDLE_VERSION,
+        "network": network,
+        "providers": list(providers),
+        "daily": daily,
+        "current": current,
+    }
+
+
+def write_if_changed(path: str, payload: bytes) -> bool:
+    """Atomically replace ``path`` with ``payload`` unless it already holds it."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == payload:
+                return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_bundle(bundle: Dict[str, Any], out_dir: str = BUNDLE_DIR) -> bool:
+    """
+    Write ``bundle`` as compact JSON plus a gzip copy.
+
+    The gzip header carries no timestamp, so identical bundles give identical
+    bytes. Returns True if either file changed.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    raw = json.dumps(bundle, separators=(",", ":")).encode()
+    path = os.path.join(out_dir, f"{bundle['network']}.json")
+    changed = write_if_changed(path, raw)
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    changed = write_if_changed(path + ".gz", compressed) or changed
+    logger.info(
+        f"Bundle {path}: {len(bundle['providers'])} providers, "
+        f"{len(bundle['daily']['dates'])} daily, {len(bundle['current']['timestamps'])} current, "
+        f"{len(raw)} bytes ({len(compressed)} gzipped){'' if changed else ', unchanged'}"
+    )
+    return changed
+
+
+def build_bundles(
+    networks: Sequence[str] = NETWORKS,
+    daily_dir: str = DAILY_DIR,
+    current_dir: str = CURRENT_DIR,
+    out_dir: str = BUNDLE_DIR,
+    current_files: int = CURRENT_FILES,
+) -> List[str]:
+    """Build and write the bundle of every network; return the networks whose bundle changed."""
+    changed = []
+    for network in networks:
+        bundle = build_bundle(network, daily_dir, current_dir, current_files)
+        if write_bundle(bundle, out_dir):
+            changed.append(network)
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the pre-aggregated dashboard bundles.")
+    parser.add_argument("--networks", nargs="+", default=list(NETWORKS), help="Networks to bundle")
+    parser.add_argument("--daily-dir", default=DAILY_DIR, help="Published daily snapshots")
+    parser.add_argument("--current-dir", default=CURRENT_DIR, help="Published current vote power files")
+    parser.add_argument("--out", default=BUNDLE_DIR, help="Output directory")
+    parser.add_argument("--current-files", type=int, default=CURRENT_FILES, help="Newest current files to include")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    changed = build_bundles(args.networks, args.daily_dir, args.current_dir, args.out, args.current_files)
+    print(f"Bundles updated: {', '.join(changed) if changed else 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""
+Concurrent per-network collection.
+
+Flare and Songbird are independent, so each network is collected in its own
+worker thread and the total wall time is that of the slowest network rather
+than the sum of both. Shared manifest files are guarded by ``manifest_lock``.
+"""
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_TIMEOUT = float(os.getenv("COLLECTION_TIMEOUT", "900"))  # seconds per network
+
+# Serialises read-modify-write cycles on docs manifests across worker threads
+manifest_lock = threading.RLock()
+
+
+@dataclass
+class NetworkOutcome:
+    """Result of collecting a single network."""
+    network: str
+    ok: bool
+    result: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def run_networks(
+    networks: Iterable[str],
+    collect: Callable[[str], Any],
+    timeout: float = COLLECTION_TIMEOUT,
+    on_timeout: Optional[Callable[[], None]] = None,
+) -> Dict[str, NetworkOutcome]:
+    """
+    Run ``collect(network)`` for every network concurrently.
+
+    Each network runs on a daemon thread, so a network that hangs past the
+    deadline cannot keep the interpreter from exiting. Threads cannot be
+    killed, though: ``on_timeout`` is called once when the deadline passes so
+    the caller can stop the blocked work (e.g. quit its browser sessions,
+    which makes the pending WebDriver call fail and frees the thread).
+
+    Args:
+        networks: Networks to collect
+        collect: Callable doing the full collection for one network
+        timeout: Seconds each network may take before it is reported as timed out
+        on_timeout: Called when at least one network timed out
+
+    Returns:
+        Mapping of network name to NetworkOutcome
+    """
+    networks = list(networks)
+    if not networks:
+        return {}
+
+    started: Dict[str, float] = {}
+    finished: Dict[str, float] = {}
+
+    def _run(net: str, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        started[net] = time.monotonic()
+        try:
+            result = collect(net)
+        except BaseException as e:
+            finished[net] = time.monotonic()
+            future.set_exception(e)
+        else:
+            finished[net] = time.monotonic()
+            future.set_result(result)
+
+    futures: Dict[Future, str] = {}
+    for net in networks:
+        future: Future = Future()
+        futures[future] = net
+        threading.Thread(target=_run, args=(net, future), name=f"collect-{net}", daemon=True).start()
+    done, not_done = wait(futures, timeout=timeout)
+
+    outcomes: Dict[str, NetworkOutcome] = {}
+    for future in done:
+        net = futures[future]
+        elapsed = finished.get(net, 0.0) - started.get(net, 0.0)
+        try:
+            outcomes[net] = NetworkOutcome(net, True, result=future.result(), elapsed=elapsed)
+        except Exception as e:
+            logger.error(f"Collection failed for {net}: {e}")
+            outcomes[net] = NetworkOutcome(net, False, error=str(e), elapsed=elapsed)
+
+    for future in not_done:
+        net = futures[future]
+        logger.error(f"Collection for {net} timed out after {timeout:.0f}s")
+        outcomes[net] = NetworkOutcome(net, False, error="timeout", elapsed=timeout)
+
+    if not_done and on_timeout is not None:
+        try:
+            on_timeout()
+        except Exception as e:
+            logger.error(f"Stopping timed out collections failed: {e}")
+
+    return {net: outcomes[net] for net in networks}
@@ -0,0 +1,211 @@
+"""
+Long-running collector that replaces one-process-per-cron-run collection.
+
+The daemon keeps HTTP sessions and pooled browser sessions warm and
+schedules ten-minute vote-power samples and epoch-start snapshots itself
+from the epoch table. Slots missed while the process was busy or stopped
+are caught up once instead of being replayed one by one.
+
+Usage:
+    python collector_daemon.py [--networks flare songbird] [--interval 600] [--once]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import signal
+import logging
+import argparse
+import datetime
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import snapshot
+import current_vote_power
+from scrape_backends import default_backends
+from webdriver_manager import WebDriverPool
+from collection_runner import run_networks
+from epoch_calendar import EpochCalendar
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NETWORKS = ("flare", "songbird")
+VOTE_POWER_INTERVAL = int(os.getenv("DAEMON_VOTE_POWER_INTERVAL", "600"))  # seconds
+MAX_SLEEP = float(os.getenv("DAEMON_MAX_SLEEP", "60"))  # seconds between wake-ups
+
+VOTE_POWER = "vote_power"
+SNAPSHOT = "snapshot"
+
+
+@dataclass
+class Job:
+    """A unit of scheduled work."""
+    kind: str
+    slot: datetime.datetime
+    missed: int = 0
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+
+class CollectorScheduler:
+    """
+    Decide which collections are due at a given time.
+
+    Vote-power samples run every ``interval`` seconds aligned to the clock
+    (e.g. :00, :10, :20). Snapshots run once per epoch start. When several
+    slots were missed only the latest is run and the gap is reported.
+    """
+
+    def __init__(
+        self,
+        calendar: EpochCalendar,
+        interval: int = VOTE_POWER_INTERVAL,
+        now: Optional[datetime.datetime] = None,
+        snapshot_done: Callable[[datetime.datetime], bool] = lambda start: False,
+    ):
+        self.interval = datetime.timedelta(seconds=interval)
+        self.calendar = calendar
+        now = now or _utcnow()
+
+        # Sample straight away on start-up
+        self.next_sample = now
+
+        # Next epoch start still to be captured; the current one if it was missed
+        latest = calendar.latest_start(now)
+        if latest is not None and not snapshot_done(latest):
+            self.next_epoch = latest
+        else:
+            self.next_epoch = calendar.next_start(now)
+
+    def _next_aligned(self, now: datetime.datetime) -> datetime.datetime:
+        step = int(self.interval.total_seconds())
+        seconds = int((now - datetime.datetime(1970, 1, 1)).total_seconds())
+        return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=(seconds // step + 1) * step)
+
+    def due(self, now: datetime.datetime) -> List[Job]:
+        """Return the jobs due at ``now`` and advance the schedule past them."""
+        jobs = []
+
+        if self.next_epoch is not None and self.next_epoch <= now:
+            latest = self.calendar.latest_start(now)
+            missed = self.calendar.epoch_at(latest) - self.calendar.epoch_at(self.next_epoch)
+            jobs.append(Job(SNAPSHOT, latest, missed=missed))
+            self.next_epoch = self.calendar.next_start(now)
+
+        if now >= self.next_sample:
+            missed = int((now - self.next_sample) / self.interval)
+            jobs.append(Job(VOTE_POWER, self.next_sample, missed=missed))
+            self.next_sample = self._next_aligned(now)
+
+        return jobs
+
+    def next_due(self) -> datetime.datetime:
+        """Return the time at which the next job becomes due."""
+        candidates = [self.next_sample]
+        if self.next_epoch is not None:
+            candidates.append(self.next_epoch)
+        return min(candidates)
+
+
+class CollectorDaemon:
+    """Run scheduled collections in-process with warm clients."""
+
+    def __init__(
+        self,
+        networks: Sequence[str] = NETWORKS,
+        interval: int = VOTE_POWER_INTERVAL,
+        schedule=None,
+        clock: Callable[[], datetime.datetime] = _utcnow,
+    ):
+        self.networks = list(networks)
+        self.schedule = EpochCalendar.coerce(schedule) if schedule is not None else EpochCalendar.load()
+        self.clock = clock
+        self.pool = WebDriverPool(size=len(self.networks))
+        # One strategy chain per network so HTTP sessions stay alive between runs
+        self.backends: Dict[str, list] = {
+            net: default_backends(driver_factory=self.pool.session) for net in self.networks
+        }
+        self.scheduler = CollectorScheduler(
+            self.schedule,
+            interval=interval,
+            now=clock(),
+            snapshot_done=self._snapshot_done,
+        )
+        self._stop = threading.Event()
+
+    def _snapshot_done(self, start: datetime.datetime) -> bool:
+        date_str = start.date().isoformat()
+        return all(snapshot._snapshot_exists(net, date_str) for net in self.networks)
+
+    def run_job(self, job: Job) -> None:
+        if job.missed:
+            logger.warning(f"Catching up {job.kind}: skipped {job.missed} missed slot(s) before {job.slot}")
+        if job.kind == VOTE_POWER:
+            run_networks(
+                self.networks,
+                lambda net: current_vote_power.collect_network(net, backends=self.backends[net]),
+                on_timeout=self.pool.abort,
+            )
+        elif job.kind == SNAPSHOT:
+            logger.info(f"Capturing epoch snapshot for epoch starting {job.slot}")
+            run_networks(
+                self.networks,
+                lambda net: snapshot.capture_snapshot(self.schedule, net, backends=self.backends[net]),
+                on_timeout=self.pool.abort,
+            )
+
+    def run_pending(self) -> List[Job]:
+        """Run every job that is due now and return them."""
+        jobs = self.scheduler.due(self.clock())
+        for job in jobs:
+            try:
+                self.run_job(job)
+            except Exception as e:
+                logger.error(f"{job.kind} job for {job.slot} failed: {e}")
+        return jobs
+
+    def run_forever(self) -> None:
+        """Loop until :meth:`stop` is called or SIGTERM/SIGINT is received."""
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: self.stop())
+        logger.info(f"Collector daemon started for {', '.join(self.networks)}")
+        try:
+            while not self._stop.is_set():
+                self.run_pending()
+                wait = (self.scheduler.next_due() - self.clock()).total_seconds()
+                self._stop.wait(min(max(wait, 1.0), MAX_SLEEP))
+        finally:
+            self.close()
+            logger.info("Collector daemon stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run FTSO collections as a long-lived daemon.")
+    parser.add_argument("--networks", nargs="+", default=list(NETWORKS), choices=list(NETWORKS))
+    parser.add_argument("--interval", type=int, default=VOTE_POWER_INTERVAL,
+                        help="Seconds between vote power samples")
+    parser.add_argument("--once", action="store_true", help="Run due jobs once and exit")
+    args = parser.parse_args(argv)
+
+    daemon = CollectorDaemon(networks=args.networks, interval=args.interval)
+    if args.once:
+        try:
+            daemon.run_pending()
+        finally:
+            daemon.close()
+    else:
+        daemon.run_forever()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -27,7 +27,8 @@ CHROMEDRIVER: Optional[str] = os.getenv("CHROMEDRIVER")
 
 # Snapshot configuration
 SNAPSHOT_RETRIES: int = int(os.getenv("SNAPSHOT_RETRIES", "6"))
-SNAPSHOT_RETRY_DELAY: int = int(os.getenv("SNAPSHOT_RETRY_DELAY", "600"))
+# The backoff settings (SNAPSHOT_RETRY_BASE_DELAY, SNAPSHOT_RETRY_MAX_DELAY,
+# SNAPSHOT_RETRY_DEADLINE) are read by retry_policy.py
 
 # Validate critical configuration
 def validate_config() -> None:
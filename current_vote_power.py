@@ -5,21 +5,27 @@ import sys
 import logging
 from typing import Dict, List, Any, Optional
 
-from pydantic import BaseModel
-
-from snapshot import scrape_flaremetrics
-from webdriver_manager import get_webdriver
-from schemas import validate_snapshot_data, sanitize_file_path
-from exceptions import FileOperationError, WebDriverError, DataValidationError
+from webdriver_manager import WebDriverPool
+from collection_runner import run_networks, manifest_lock
+from file_utils import write_json_atomic
+from exceptions import FileOperationError, WebDriverError, WebScrapingError, DataValidationError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def validate_snapshot_data(data):
+    """Validate ``data`` against the snapshot schema (pydantic loads on first use)."""
+    from schemas import validate_snapshot_data as _validate
+    return _validate(data)
+
+
 def _to_serializable(obj):
     """Return JSON-serializable data from a Pydantic model or plain object."""
-    if isinstance(obj, BaseModel):
+    # If pydantic was never imported, obj cannot be a model
+    pydantic = sys.modules.get("pydantic")
+    if pydantic is not None and isinstance(obj, pydantic.BaseModel):
         if hasattr(obj, "model_dump"):
             return obj.model_dump()
         return obj.dict()
@@ -45,21 +51,89 @@ def save_current_vote_power(data, network="flare"):
 
 def update_manifest(docs_dir, filename, network):
     manifest_path = os.path.join(docs_dir, "manifest.json")
-    if os.path.exists(manifest_path):
-        with open(manifest_path) as f:
-            manifest = json.load(f)
-    else:
-        manifest = {"flare": [], "songbird": []}
-    manifest.setdefault(network, [])
-    if filename not in manifest[network]:
-        manifest[network].append(filename)
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    with manifest_lock:
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {"flare": [], "songbird": []}
+        manifest.setdefault(network, [])
+        if filename not in manifest[network]:
+            manifest[network].append(filename)
+        write_json_atomic(manifest_path, manifest)
+
+
+def collect_network(net: str, driver_factory=None, backends=None) -> bool:
+    """
+    Collect and save current vote power for a single network.
+
+    Args:
+        net: 'flare' or 'songbird'
+        driver_factory: Context manager factory for browser sessions used by
+            the Selenium fallback (defaults to a fresh session per scrape)
+        backends: Pre-built scraping strategies to reuse across calls
+
+    Returns:
+        True if data was saved
+    """
+    # Imported here so --help does not pay for the scraping stack
+    from scrape_backends import scrape_providers, default_backends
+
+    logger.info(f"Starting vote power collection for {net}")
+
+    try:
+        # HTTP fast path first; a browser session is only used as fallback
+        if backends is None:
+            backends = default_backends(driver_factory=driver_factory)
+        result = scrape_providers(net, backends)
+        providers = result.providers
+
+        if not providers:
+            logger.warning(f"No providers found for {net}")
+            return False
+
+        # Prepare data with validation
+        data = {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ"),
+            "network": net,
+            "source": result.strategy,
+            "providers": [
+                {
+                    "name": p["name"], 
+                    "vote_power": p.get("vote_power_pct", 0.0)
+                }
+                for p in providers
+            ],
+        }
+
+        # Validate data before saving
+        try:
+            validated_data = validate_snapshot_data(data)
+            logger.info(f"Data validation successful for {net}")
+        except Exception as e:
+            logger.error(f"Data validation failed for {net}: {e}")
+            # Continue with unvalidated data but log the issue
+            validated_data = data
+
+        save_current_vote_power(validated_data, net)
+        logger.info(f"Successfully collected vote power data for {net}")
+        return True
+
+    except WebDriverError as e:
+        logger.error(f"WebDriver error for {net}: {e}")
+    except WebScrapingError as e:
+        logger.error(f"Scraping error for {net}: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error collecting data for {net}: {e}")
+    return False
 
 
 def main(network: Optional[str] = None) -> None:
     """
     Main function to collect current vote power data.
+
+    Networks are collected concurrently, each with its own pooled browser
+    session for the Selenium fallback.
     
     Args:
         network: Network to collect data for ('flare', 'songbird', or None for both)
@@ -69,51 +143,14 @@ def main(network: Optional[str] = None) -> None:
     else:
         networks = ["flare", "songbird"]
 
-    for net in networks:
-        logger.info(f"Starting vote power collection for {net}")
-        
-        try:
-            # Use context manager from webdriver_manager to ensure unique sessions
-            with get_webdriver() as driver:
-                providers = scrape_flaremetrics(driver, net)
-                
-            if not providers:
-                logger.warning(f"No providers found for {net}")
-                continue
-                
-            # Prepare data with validation
-            data = {
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ"),
-                "network": net,
-                "providers": [
-                    {
-                        "name": p["name"], 
-                        "vote_power": p.get("vote_power_pct", 0.0)
-                    }
-                    for p in providers
-                ],
-            }
-            
-            # Validate data before saving
-            try:
-                validated_data = validate_snapshot_data(data)
-                logger.info(f"Data validation successful for {net}")
-            except Exception as e:
-                logger.error(f"Data validation failed for {net}: {e}")
-                # Continue with unvalidated data but log the issue
-                validated_data = data
-            
-            save_current_vote_power(validated_data, net)
-            logger.info(f"Successfully collected vote power data for {net}")
-            
-        except WebDriverError as e:
-            logger.error(f"WebDriver error for {net}: {e}")
-            continue
-        except Exception as e:
-            logger.error(f"Unexpected error collecting data for {net}: {e}")
-            continue
+    with WebDriverPool(size=len(networks)) as pool:
+        run_networks(networks, lambda net: collect_network(net, pool.session), on_timeout=pool.abort)
 
 
 if __name__ == "__main__":
-    net = sys.argv[1] if len(sys.argv) > 1 else None
-    main(net)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Collect current FTSO vote power from flaremetrics.io.")
+    parser.add_argument("network", nargs="?", choices=["flare", "songbird"],
+                        help="Network to collect (default: both)")
+    main(parser.parse_args().network)
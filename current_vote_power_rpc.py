@@ -3,22 +3,43 @@ import datetime
 import os
 import sys
 import logging
-from typing import Dict, List, Any, Optional
-
-from pydantic import BaseModel
+from typing import Dict, List, Any, Optional, Tuple
 
 from flare_rpc_new import fetch_flare_providers_rpc, FlareRPCError, make_rpc_call, get_contract_address, encode_string_param
-from schemas import validate_snapshot_data, sanitize_file_path
 from exceptions import FileOperationError, DataValidationError
+from collection_runner import run_networks, manifest_lock
+from file_utils import write_json_atomic
+from retry_policy import RetryPolicy, register_error_class, RPC_ERROR
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Only transport faults and rate limits are retried; see retry_policy
+register_error_class(FlareRPCError, RPC_ERROR)
+
+# Transient RPC faults (rate limits, dropped connections) recover within seconds
+RPC_RETRY_POLICY = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=30.0, deadline=120.0)
+
+
+def rpc_call_with_retry(network: str, method: str, params: List[Any] = None) -> Any:
+    """Call :func:`make_rpc_call` under the shared RPC retry policy."""
+    return RPC_RETRY_POLICY.call(
+        make_rpc_call, network, method, params, description=f"{network} {method}"
+    )
+
+
+def validate_snapshot_data(data, trusted=False):
+    """Validate ``data`` against the snapshot schema (pydantic loads on first use)."""
+    from schemas import validate_snapshot_data as _validate
+    return _validate(data, trusted=trusted)
+
 
 def _to_serializable(obj):
     """Return JSON-serializable data from a Pydantic model or plain object."""
-    if isinstance(obj, BaseModel):
+    # If pydantic was never imported, obj cannot be a model
+    pydantic = sys.modules.get("pydantic")
+    if pydantic is not None and isinstance(obj, pydantic.BaseModel):
         if hasattr(obj, "model_dump"):
             return obj.model_dump()
         return obj.dict()
@@ -46,16 +67,64 @@ def save_current_vote_power(data, network="flare"):
 def update_manifest(docs_dir, filename, network):
     """Update the manifest file with new snapshot"""
     manifest_path = os.path.join(docs_dir, "manifest.json")
-    if os.path.exists(manifest_path):
-        with open(manifest_path) as f:
-            manifest = json.load(f)
-    else:
-        manifest = {"flare": [], "songbird": []}
-    manifest.setdefault(network, [])
-    if filename not in manifest[network]:
-        manifest[network].append(filename)
-    with open(manifest_path, "w") as f:
-        json.dump(manifest, f, indent=2)
+    with manifest_lock:
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {"flare": [], "songbird": []}
+        manifest.setdefault(network, [])
+        if filename not in manifest[network]:
+            manifest[network].append(filename)
+        write_json_atomic(manifest_path, manifest)
+
+
+# VotePowerContract and the event carrying (provider, vote power) updates
+VOTE_POWER_CONTRACT = "0x1000000000000000000000000000000000000002"
+VOTE_POWER_EVENT_SIG = "0xe7aa66356adbd5e839ef210626f6d8f6f72109c17fadf4c4f9ca82b315ae79b4"
+VOTE_POWER_LOOKBACK_BLOCKS = 1000
+
+
+def decode_vote_power_event(event: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+    """
+    Decode a VotePower log into ``(provider_address, vote_power)``.
+
+    Event data format: provider_address (32 bytes) + vote_power (32 bytes).
+
+    Returns:
+        The decoded pair, or None if the log data is too short
+    """
+    data = event["data"]
+    if len(data) < 130:  # 0x + 128 hex chars (64 bytes)
+        return None
+    # Extract provider address (first 32 bytes, take last 20 bytes for address)
+    provider_address = "0x" + data[2 + 24:2 + 64]  # Skip 0x and 12 zero bytes
+    # Extract vote power (second 32 bytes)
+    vote_power = int(data[66:130], 16)
+    return provider_address, vote_power
+
+
+def providers_from_vote_powers(provider_vote_powers: Dict[str, int], network: str) -> List[Dict[str, Any]]:
+    """Convert an address -> vote power map into provider rows with percentages."""
+    total_vote_power = sum(provider_vote_powers.values())
+
+    providers = []
+    for address, vote_power in provider_vote_powers.items():
+        if total_vote_power > 0:
+            vote_power_pct = (vote_power / total_vote_power) * 100
+        else:
+            vote_power_pct = 0
+
+        providers.append({
+            "name": get_provider_name_for_address(address, network),
+            "address": address,
+            "raw_vote_power": vote_power,
+            "vote_power_pct": round(vote_power_pct, 4),
+        })
+
+    # Sort by vote power percentage
+    providers.sort(key=lambda x: x["vote_power_pct"], reverse=True)
+    return providers
 
 
 def fetch_accurate_vote_power_from_blockchain(network: str) -> List[Dict[str, Any]]:
@@ -77,28 +146,23 @@ def fetch_accurate_vote_power_from_blockchain(network: str) -> List[Dict[str, An
     logger.info(f"Fetching accurate vote power data from blockchain events for {network}")
     
     try:
-        # Use the VotePowerContract (0x1000000000000000000000000000000000000002) 
-        # to get vote power events which contain the real-time vote power data
-        vote_power_contract = "0x1000000000000000000000000000000000000002"
-        vote_power_event_sig = "0xe7aa66356adbd5e839ef210626f6d8f6f72109c17fadf4c4f9ca82b315ae79b4"
-        
         # Get current block number
-        current_block_result = make_rpc_call(network, "eth_blockNumber", [])
+        current_block_result = rpc_call_with_retry(network, "eth_blockNumber", [])
         current_block = int(current_block_result, 16)
         
         # Look for events in recent blocks (last 1000 blocks to get current state)
-        from_block = hex(current_block - 1000)
+        from_block = hex(current_block - VOTE_POWER_LOOKBACK_BLOCKS)
         to_block = "latest"
         
         logger.info(f"Searching for vote power events from block {from_block} to {to_block}")
         
         # Get vote power events
-        events_result = make_rpc_call(
+        events_result = rpc_call_with_retry(
             network,
             "eth_getLogs",
             [{
-                "address": vote_power_contract,
-                "topics": [vote_power_event_sig],
+                "address": VOTE_POWER_CONTRACT,
+                "topics": [VOTE_POWER_EVENT_SIG],
                 "fromBlock": from_block,
                 "toBlock": to_block
             }]
@@ -114,20 +178,11 @@ def fetch_accurate_vote_power_from_blockchain(network: str) -> List[Dict[str, An
         
         for event in events_result:
             try:
-                # Event data format: provider_address (32 bytes) + vote_power (32 bytes)
-                data = event["data"]
-                if len(data) >= 130:  # 0x + 128 hex chars (64 bytes)
-                    # Extract provider address (first 32 bytes, take last 20 bytes for address)
-                    provider_hex = data[2 + 24:2 + 64]  # Skip 0x and 12 zero bytes
-                    provider_address = "0x" + provider_hex
-                    
-                    # Extract vote power (second 32 bytes)
-                    vote_power_hex = data[66:130]  # Next 32 bytes
-                    vote_power = int(vote_power_hex, 16)
-                    
+                decoded = decode_vote_power_event(event)
+                if decoded:
                     # Store the latest vote power for each provider
+                    provider_address, vote_power = decoded
                     provider_vote_powers[provider_address] = vote_power
-                    
             except Exception as e:
                 logger.debug(f"Error processing event: {e}")
                 continue
@@ -135,29 +190,7 @@ def fetch_accurate_vote_power_from_blockchain(network: str) -> List[Dict[str, An
         if not provider_vote_powers:
             raise FlareRPCError(f"No valid vote power data extracted from events for {network}")
         
-        # Calculate total vote power
-        total_vote_power = sum(provider_vote_powers.values())
-        
-        # Convert to providers list with percentages
-        providers = []
-        for address, vote_power in provider_vote_powers.items():
-            if total_vote_power > 0:
-                vote_power_pct = (vote_power / total_vote_power) * 100
-            else:
-                vote_power_pct = 0
-                
-            # Get provider name
-            provider_name = get_provider_name_for_address(address, network)
-            
-            providers.append({
-                "name": provider_name,
-                "address": address,
-                "raw_vote_power": vote_power,
-                "vote_power_pct": round(vote_power_pct, 4),
-            })
-        
-        # Sort by vote power percentage
-        providers.sort(key=lambda x: x["vote_power_pct"], reverse=True)
+        providers = providers_from_vote_powers(provider_vote_powers, network)
         
         logger.info(f"Successfully extracted vote power for {len(providers)} providers from blockchain events")
         return providers
@@ -192,9 +225,77 @@ def get_provider_name_for_address(address: str, network: str) -> str:
     return provider_mapping.get(address_lower, f"Provider_{address[:8]}...{address[-6:]}")
 
 
+def save_providers(net: str, providers: List[Dict[str, Any]]) -> None:
+    """Apply the FTSO cap to ``providers``, validate and save the snapshot."""
+    # Apply FTSO vote power cap (2.5% per provider)
+    # This is crucial for accurate FTSO calculations
+    capped_providers = apply_ftso_vote_power_cap(providers)
+
+    # Prepare data with validation
+    data = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ"),
+        "network": net,
+        "providers": [
+            {
+                "name": p["name"], 
+                "vote_power": p.get("vote_power_pct", 0.0),
+                "capped_vote_power": p.get("capped_vote_power", 0.0),
+                "original_vote_power": p.get("original_vote_power_pct", 0.0)
+            }
+            for p in capped_providers
+        ],
+    }
+
+    # Validate data before saving; names come from our own address mapping,
+    # so the trusted schema skips sanitizing them
+    try:
+        validated_data = validate_snapshot_data(data, trusted=True)
+        logger.info(f"Data validation successful for {net}")
+    except Exception as e:
+        logger.error(f"Data validation failed for {net}: {e}")
+        # Continue with unvalidated data but log the issue
+        validated_data = data
+
+    save_current_vote_power(validated_data, net)
+
+
+def collect_network(net: str) -> bool:
+    """
+    Collect and save current vote power for a single network via RPC.
+
+    Args:
+        net: 'flare' or 'songbird'
+
+    Returns:
+        True if data was saved
+    """
+    logger.info(f"Starting vote power collection for {net} via RPC")
+
+    try:
+        # Use accurate blockchain method with vote power events instead of wrong data source
+        logger.info(f"Fetching accurate vote power data from blockchain events for {net}")
+        providers = fetch_accurate_vote_power_from_blockchain(net)
+
+        if not providers:
+            logger.warning(f"No providers found for {net}")
+            return False
+
+        save_providers(net, providers)
+        logger.info(f"Successfully collected vote power data for {net} via RPC")
+        return True
+
+    except FlareRPCError as e:
+        logger.error(f"RPC error for {net}: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error collecting data for {net}: {e}")
+    return False
+
+
 def main(network: Optional[str] = None) -> None:
     """
     Main function to collect current vote power data via RPC.
+
+    Networks are queried concurrently in worker threads.
     
     Args:
         network: Network to collect data for ('flare', 'songbird', or None for both)
@@ -204,55 +305,7 @@ def main(network: Optional[str] = None) -> None:
     else:
         networks = ["flare", "songbird"]
 
-    for net in networks:
-        logger.info(f"Starting vote power collection for {net} via RPC")
-        
-        try:
-            # Use accurate blockchain method with vote power events instead of wrong data source
-            logger.info(f"Fetching accurate vote power data from blockchain events for {net}")
-            providers = fetch_accurate_vote_power_from_blockchain(net)
-                
-            if not providers:
-                logger.warning(f"No providers found for {net}")
-                continue
-            
-            # Apply FTSO vote power cap (2.5% per provider)
-            # This is crucial for accurate FTSO calculations
-            capped_providers = apply_ftso_vote_power_cap(providers)
-                
-            # Prepare data with validation
-            data = {
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ"),
-                "network": net,
-                "providers": [
-                    {
-                        "name": p["name"], 
-                        "vote_power": p.get("vote_power_pct", 0.0),
-                        "capped_vote_power": p.get("capped_vote_power", 0.0),
-                        "original_vote_power": p.get("original_vote_power_pct", 0.0)
-                    }
-                    for p in capped_providers
-                ],
-            }
-            
-            # Validate data before saving
-            try:
-                validated_data = validate_snapshot_data(data)
-                logger.info(f"Data validation successful for {net}")
-            except Exception as e:
-                logger.error(f"Data validation failed for {net}: {e}")
-                # Continue with unvalidated data but log the issue
-                validated_data = data
-            
-            save_current_vote_power(validated_data, net)
-            logger.info(f"Successfully collected vote power data for {net} via RPC")
-            
-        except FlareRPCError as e:
-            logger.error(f"RPC error for {net}: {e}")
-            continue
-        except Exception as e:
-            logger.error(f"Unexpected error collecting data for {net}: {e}")
-            continue
+    run_networks(networks, collect_network)
 
 
 def apply_ftso_vote_power_cap(providers: List[Dict[str, Any]], cap_percentage: float = 2.5) -> List[Dict[str, Any]]:
@@ -302,5 +355,9 @@ def apply_ftso_vote_power_cap(providers: List[Dict[str, Any]], cap_percentage: f
 
 
 if __name__ == "__main__":
-    net = sys.argv[1] if len(sys.argv) > 1 else None
-    main(net)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Collect current FTSO vote power from Flare/Songbird RPC.")
+    parser.add_argument("network", nargs="?", choices=["flare", "songbird"],
+                        help="Network to collect (default: both)")
+    main(parser.parse_args().network)
@@ -0,0 +1,218 @@
+"""
+Indexed view of the Flare reward epoch schedule.
+
+The schedule is parsed once into sorted integer UTC timestamps; lookups
+(epoch at a time, previous/next start, is a date an epoch start) are
+binary searches. Calendars loaded from ``flare_epoch_schedule.json``
+extrapolate beyond the last listed epoch using the fixed 3.5-day cadence.
+
+All datetimes are naive UTC, like the rest of the snapshot tooling.
+"""
+from __future__ import annotations
+
+import os
+import json
+import bisect
+import hashlib
+import datetime
+from calendar import timegm
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+EPOCH_CADENCE = 302400  # seconds (3.5 days)
+SCHEDULE_FILE = "flare_epoch_schedule.json"
+
+_DAY = 86400
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# Calendars loaded from disk, keyed on (path, mtime)
+_cache: Dict[Tuple[str, float], "EpochCalendar"] = {}
+
+
+def _to_ts(when: datetime.datetime) -> int:
+    return timegm(when.timetuple())
+
+
+def _from_ts(ts: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(seconds=ts)
+
+
+def parse_timestamp(value: str) -> Optional[datetime.datetime]:
+    """
+    Parse a snapshot timestamp as naive UTC.
+
+    Accepts ISO timestamps ending in ``Z`` or ``+00:00`` as well as the
+    ``YYYY-MM-DDTHH-MM-SSZ`` form used in file names and inside many current
+    vote power files. Returns None if ``value`` is not a timestamp.
+    """
+    text = value.strip().replace("Z", "").replace("+00:00", "")
+    if "T" in text:
+        day, _, clock = text.partition("T")
+        text = f"{day}T{clock.replace('-', ':')}"
+    try:
+        return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _day_ts(day: Union[datetime.date, str]) -> int:
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day)
+    elif isinstance(day, datetime.datetime):
+        day = day.date()
+    return (day.toordinal() - _EPOCH.toordinal()) * _DAY
+
+
+class EpochCalendar:
+    """
+    Sorted epoch start times with O(log n) lookups.
+
+    Args:
+        starts: Epoch start times as UTC epoch seconds
+        first_epoch: Epoch number of the first start
+        extrapolate: Continue past the last start every ``cadence`` seconds
+        cadence: Seconds between extrapolated epoch starts
+    """
+
+    def __init__(
+        self,
+        starts: Iterable[int],
+        first_epoch: int = 0,
+        extrapolate: bool = False,
+        cadence: int = EPOCH_CADENCE,
+    ):
+        self._starts: List[int] = sorted(starts)
+        self.first_epoch = first_epoch
+        self.extrapolate = extrapolate and bool(self._starts)
+        self.cadence = cadence
+
+    # --- Construction ---
+
+    @classmethod
+    def from_schedule(cls, schedule: List[Dict[str, Any]], extrapolate: bool = False) -> "EpochCalendar":
+        """Build a calendar from schedule entries with a ``Start (UTC)`` field."""
+        starts = [
+            _to_ts(datetime.datetime.fromisoformat(epoch["Start (UTC)"]))
+            for epoch in schedule
+        ]
+        first = schedule[0].get("Epoch Number", 0) if schedule else 0
+        return cls(starts, first_epoch=first, extrapolate=extrapolate)
+
+    @classmethod
+    def from_datetimes(cls, starts: Iterable[datetime.datetime], **kwargs: Any) -> "EpochCalendar":
+        """Build a calendar from naive UTC start datetimes."""
+        return cls((_to_ts(start) for start in starts), **kwargs)
+
+    @classmethod
+    def load(cls, file_path: str = SCHEDULE_FILE, extrapolate: bool = True) -> "EpochCalendar":
+        """
+        Load (and cache) the calendar for the schedule file at ``file_path``.
+
+        An unreadable schedule yields an empty calendar, mirroring
+        ``load_epoch_schedule`` returning an empty list.
+        """
+        try:
+            key = (os.path.abspath(file_path), os.path.getmtime(file_path))
+        except OSError as e:
+            print(f"Error loading epoch schedule: {e}")
+            return cls([])
+        calendar = _cache.get(key)
+        if calendar is None or calendar.extrapolate != extrapolate:
+            try:
+                with open(file_path, "r") as f:
+                    calendar = cls.from_schedule(json.load(f), extrapolate=extrapolate)
+            except Exception as e:
+                print(f"Error loading epoch schedule: {e}")
+                return cls([])
+            _cache[key] = calendar
+        return calendar
+
+    @classmethod
+    def coerce(cls, schedule: Union["EpochCalendar", List[Dict[str, Any]]]) -> "EpochCalendar":
+        """Return ``schedule`` as a calendar, parsing a raw schedule list once."""
+        if isinstance(schedule, cls):
+            return schedule
+        return cls.from_schedule(list(schedule))
+
+    # --- Index arithmetic ---
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def fingerprint(self) -> str:
+        """Return a short hash identifying the epoch starts this calendar yields."""
+        payload = ",".join(map(str, self._starts))
+        payload += f"|{self.cadence if self.extrapolate else 0}"
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def _start_ts(self, index: int) -> int:
+        if index < len(self._starts):
+            return self._starts[index]
+        return self._starts[-1] + (index - len(self._starts) + 1) * self.cadence
+
+    def _index_at_or_before(self, ts: int) -> int:
+        """Index of the last start <= ``ts``; -1 if before the first start."""
+        index = bisect.bisect_right(self._starts, ts) - 1
+        if self.extrapolate and index == len(self._starts) - 1 and index >= 0:
+            index += (ts - self._starts[-1]) // self.cadence
+        return index
+
+    # --- Lookups ---
+
+    def epoch_at(self, when: datetime.datetime) -> Optional[int]:
+        """Return the epoch number running at ``when`` (None before the first)."""
+        index = self._index_at_or_before(_to_ts(when))
+        return self.first_epoch + index if index >= 0 else None
+
+    def start_of(self, epoch: int) -> Optional[datetime.datetime]:
+        """Return the start of epoch number ``epoch``."""
+        index = epoch - self.first_epoch
+        if index < 0 or (index >= len(self._starts) and not self.extrapolate):
+            return None
+        return _from_ts(self._start_ts(index))
+
+    def latest_start(self, when: datetime.datetime) -> Optional[datetime.datetime]:
+        """Return the most recent epoch start on or before ``when``."""
+        index = self._index_at_or_before(_to_ts(when))
+        return _from_ts(self._start_ts(index)) if index >= 0 else None
+
+    def next_start(self, when: datetime.datetime) -> Optional[datetime.datetime]:
+        """Return the first epoch start strictly after ``when``."""
+        index = self._index_at_or_before(_to_ts(when)) + 1
+        if index >= len(self._starts) and not self.extrapolate:
+            return None
+        return _from_ts(self._start_ts(index))
+
+    def is_near_start(self, when: datetime.datetime, window: datetime.timedelta) -> bool:
+        """Return True if an epoch start lies within ``window`` of ``when``."""
+        if not self._starts:
+            return False
+        ts = _to_ts(when)
+        index = self._index_at_or_before(ts)
+        limit = window.total_seconds()
+        for candidate in (index, index + 1):
+            if candidate < 0 or (candidate >= len(self._starts) and not self.extrapolate):
+                continue
+            if abs(ts - self._start_ts(candidate)) <= limit:
+                return True
+        return False
+
+    def is_start_date(self, day: Union[datetime.date, str]) -> bool:
+        """Return True if an epoch starts on calendar day ``day`` (UTC)."""
+        if not self._starts:
+            return False
+        day_start = _day_ts(day)
+        index = self._index_at_or_before(day_start + _DAY - 1)
+        return index >= 0 and self._start_ts(index) >= day_start
+
+    __contains__ = is_start_date
+
+    def starts_between(self, start: datetime.datetime, end: datetime.datetime) -> List[datetime.datetime]:
+        """Return epoch starts in ``[start, end]``."""
+        first = self._index_at_or_before(_to_ts(start) - 1) + 1
+        last = self._index_at_or_before(_to_ts(end))
+        if not self.extrapolate:
+            last = min(last, len(self._starts) - 1)
+        return [_from_ts(self._start_ts(i)) for i in range(first, last + 1)]
@@ -25,6 +25,11 @@ class WebScrapingError(FTSOSnapshotError):
         return base_msg
 
 
+class EmptyResultError(WebScrapingError):
+    """Raised when a page loads but the provider table has no rows."""
+    pass
+
+
 class DataValidationError(FTSOSnapshotError):
     """Raised when data validation fails."""
     
@@ -94,4 +99,9 @@ class NetworkError(FTSOSnapshotError):
 
 class ConfigurationError(FTSOSnapshotError):
     """Raised when configuration is invalid or missing."""
-    pass
\ No newline at end of file
+    pass
+
+
+class InferenceOverloadedError(FTSOSnapshotError):
+    """Raised when the inference queue is full and a request is shed."""
+    pass
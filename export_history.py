@@ -1,101 +1,351 @@
 import json
 import os
-import re
-import requests
-from requests.exceptions import JSONDecodeError, HTTPError
-from html import unescape
+import sys
+import shutil
+import logging
 
+from file_utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_GRAPHQL_URL = "https://flare-explorer.flare.network/graphql"
+PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "4"))
+COMPACT_SEGMENTS = int(os.getenv("EXPORT_COMPACT_SEGMENTS", "30"))  # small segments kept before merging
+SEGMENT_EVENTS = int(os.getenv("EXPORT_SEGMENT_EVENTS", "100000"))  # segments this large are never merged
+HISTORY_VERSION = 1
 
-QUERY = """
-query($first: Int!, $skip: Int!) {
-  delegationChangedEvents(first: $first, skip: $skip) {
+FIELDS = """
     id
     delegator
     delegatee
     amount
     blockNumber
     transactionHash
-  }
-}
 """
 
+# Keyset pagination: each page continues after the (blockNumber, id) of the
+# previous page's last event, so the server never has to skip rows. Events are
+# ordered by blockNumber with id as the tie-breaker.
+QUERY = """
+query($first: Int!, $block: BigInt!, $id: String!, $start: BigInt!, $end: BigInt!) {
+  delegationChangedEvents(
+    first: $first
+    orderBy: blockNumber
+    orderDirection: asc
+    where: {or: [
+      {blockNumber_gt: $block, blockNumber_gte: $start, blockNumber_lt: $end},
+      {blockNumber: $block, id_gt: $id, blockNumber_gte: $start, blockNumber_lt: $end}
+    ]}
+  ) {%s  }
+}
+""" % FIELDS
+
+EDGE_QUERY = """
+query($direction: OrderDirection!) {
+  delegationChangedEvents(first: 1, orderBy: blockNumber, orderDirection: $direction) {%s  }
+}
+""" % FIELDS
+
+
+def _post_graphql(url: str, query: str, variables: dict) -> list:
+    """POST one GraphQL query and return its ``delegationChangedEvents``."""
+    # Imported here so that ``--help`` does not pay for requests
+    import requests
+    from requests.exceptions import JSONDecodeError, HTTPError
+
+    payload = {"query": query, "variables": variables}
+    resp = requests.post(url, json=payload, timeout=30)
+    try:
+        resp.raise_for_status()
+    except HTTPError:
+        print(f"HTTP error {resp.status_code} from {url}: {resp.text[:200]}")
+        raise
+    try:
+        json_resp = resp.json()
+    except JSONDecodeError as exc:
+        snippet = resp.text[:200]
+        print(f"Invalid JSON response from {url}: {snippet!r}")
+        raise RuntimeError(f"Failed to decode JSON from {url}") from exc
+    if json_resp.get("errors"):
+        raise RuntimeError(f"GraphQL errors from {url}: {json_resp['errors']}")
+    return (json_resp.get("data") or {}).get("delegationChangedEvents") or []
+
+
+def block_bounds(url: str):
+    """Return ``(first, last)`` block holding delegation events, or None if there are none."""
+    first = _post_graphql(url, EDGE_QUERY, {"direction": "asc"})
+    if not first:
+        return None
+    last = _post_graphql(url, EDGE_QUERY, {"direction": "desc"})
+    return int(first[0]["blockNumber"]), int((last or first)[0]["blockNumber"])
 
-def fetch_all_delegations_graphql(url: str, first: int = 1000) -> list:
-    """Fetch all delegation change events via GraphQL."""
-    delegations = []
-    skip = 0
+
+def block_ranges(low: int, high: int, parts: int) -> list:
+    """Split blocks ``low..high`` (inclusive) into ``parts`` disjoint ``[start, end)`` ranges."""
+    parts = max(1, min(parts, high - low + 1))
+    size = (high - low + 1) / parts
+    edges = [low + round(i * size) for i in range(parts)] + [high + 1]
+    return [(edges[i], edges[i + 1]) for i in range(parts)]
+
+
+def iter_delegations_graphql(url: str, first: int = PAGE_SIZE, start: int = 0, end: int = None, after=None):
+    """
+    Yield delegation change events in ``[start, end)`` page by page.
+
+    Args:
+        url: GraphQL endpoint
+        first: Page size
+        start: First block
+        end: Block after the last one (None for no limit)
+        after: ``(blockNumber, id)`` of an event already seen; iteration
+            continues after it
+    """
+    end = 2 ** 63 if end is None else end
+    block, last_id = after if after else (start - 1, "")
     while True:
-        payload = {"query": QUERY, "variables": {"first": first, "skip": skip}}
-        resp = requests.post(url, json=payload, timeout=30)
-        try:
-            resp.raise_for_status()
-        except HTTPError:
-            print(f"HTTP error {resp.status_code} from {url}: {resp.text[:200]}")
-            raise
-        try:
-            json_resp = resp.json()
-        except JSONDecodeError as exc:
-            snippet = resp.text[:200]
-            print(f"Invalid JSON response from {url}: {snippet!r}")
-            raise RuntimeError(f"Failed to decode JSON from {url}") from exc
-        data = json_resp.get("data", {}).get("delegationChangedEvents", [])
-        if not data:
-            break
-        delegations.extend(data)
-        skip += first
-    return delegations
-
-
-def scrape_delegations_flaremetrics(network: str = "flare") -> list:
-    """Scrape delegation events from flaremetrics.io."""
-    url = f"https://flaremetrics.io/{network}"
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    html = resp.text
-    rows = []
-    for row_html in re.findall(r"<tr>(.*?)</tr>", html, re.DOTALL):
-        cols = re.findall(r"<td.*?>(.*?)</td>", row_html, re.DOTALL)
-        rows.append([unescape(re.sub("<.*?>", "", c)).strip() for c in cols])
-
-    delegations = []
-    for cols in rows:
-        if len(cols) >= 5:
-            delegations.append(
-                {
-                    "delegator": cols[0],
-                    "delegatee": cols[1],
-                    "amount": cols[2],
-                    "blockNumber": cols[3],
-                    "transactionHash": cols[4],
-                }
-            )
-    return delegations
-
-
-def fetch_all_delegations(url: str, first: int = 1000, network: str = "flare") -> list:
-    """Fetch delegation events with multiple fallbacks."""
+        variables = {
+            "first": first, "block": str(block), "id": last_id, "start": str(start), "end": str(end),
+        }
+        page = _post_graphql(url, QUERY, variables)
+        yield from page
+        if len(page) < first:
+            return
+        block, last_id = int(page[-1]["blockNumber"]), page[-1]["id"]
+
+
+def _write_jsonl(events, path: str) -> int:
+    count = 0
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_delegations_graphql(url: str, path: str, first: int = PAGE_SIZE, workers: int = EXPORT_WORKERS,
+                               after=None) -> int:
+    """
+    Stream all delegation events into the JSON Lines file ``path``.
+
+    The block span is split into ``workers`` disjoint ranges that are paged
+    concurrently, each into its own part file; the parts are then joined in
+    block order. Memory use does not depend on the number of events.
+
+    Args:
+        after: ``(blockNumber, id)`` watermark; only later events are exported
+
+    Returns:
+        Number of events written
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    bounds = block_bounds(url)
+    ranges = []
+    if bounds:
+        low = max(bounds[0], after[0]) if after else bounds[0]
+        if low <= bounds[1]:
+            ranges = block_ranges(low, bounds[1], workers)
+    cursors = [after if after and i == 0 and start == after[0] else None for i, (start, _) in enumerate(ranges)]
+    parts = [f"{path}.part{i}" for i in range(len(ranges))]
     try:
-        return fetch_all_delegations_graphql(url, first=first)
-    except Exception as exc:
-        print(f"GraphQL fetch failed: {exc}; trying flaremetrics")
-        return scrape_delegations_flaremetrics(network)
+        with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as pool:
+            counts = list(pool.map(
+                lambda args: _write_jsonl(iter_delegations_graphql(url, first, *args[0], after=args[1]), args[2]),
+                zip(ranges, cursors, parts),
+            ))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp_path, path)
+    finally:
+        for part in parts:
+            if os.path.exists(part):
+                os.remove(part)
+    return sum(counts)
+
+
+def _last_line(path: str):
+    """Return the last line of ``path`` decoded as JSON (None for an empty file)."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0 and tail.count(b"\n") < 2:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+    lines = tail.strip().splitlines()
+    return json.loads(lines[-1]) if lines else None
+
+
+class HistoryStore:
+    """
+    Segmented JSON Lines history of one network with a high-water mark.
+
+    ``<out_dir>/<network>/`` holds numbered segments (``000001.jsonl``, ...)
+    and ``state.json`` with the ``(block, id)`` of the newest exported event
+    and the segment list. A segment is renamed into place before the state
+    that references it is saved, so an interrupted run leaves at most an
+    unreferenced file, which the next run deletes.
+    """
+
+    def __init__(self, out_dir: str = "history", network: str = "flare"):
+        self.directory = os.path.join(out_dir, network)
+        self.state_path = os.path.join(self.directory, "state.json")
+        self.state = {"version": HISTORY_VERSION, "block": None, "id": None, "events": 0, "segments": []}
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get("version") == HISTORY_VERSION:
+                self.state = state
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def watermark(self):
+        """``(block, id)`` of the newest exported event, or None before the first export."""
+        if self.state["block"] is None:
+            return None
+        return self.state["block"], self.state["id"]
+
+    @property
+    def segments(self) -> list:
+        return self.state["segments"]
+
+    def _segment_path(self, segment: dict) -> str:
+        return os.path.join(self.directory, segment["file"])
+
+    def _next_file(self) -> str:
+        numbers = [int(segment["file"].split(".")[0]) for segment in self.segments]
+        return f"{max(numbers, default=0) + 1:06d}.jsonl"
+
+    def _save(self) -> None:
+        write_json_atomic(self.state_path, self.state)
+
+    def remove_orphans(self) -> None:
+        """Delete files left behind by an interrupted run."""
+        known = {segment["file"] for segment in self.segments} | {"state.json"}
+        for name in os.listdir(self.directory):
+            if name not in known:
+                os.remove(os.path.join(self.directory, name))
+
+    def append(self, export) -> int:
+        """
+        Write a new segment with ``export(path, after)`` and advance the watermark.
+
+        ``export`` writes the events after the watermark to ``path`` and returns
+        how many it wrote. An empty result leaves the store unchanged.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.remove_orphans()
+        name = self._next_file()
+        tmp_path = os.path.join(self.directory, f"{name}.tmp")
+        count = export(tmp_path, self.watermark)
+        if not count:
+            os.remove(tmp_path)
+            return 0
+        with open(tmp_path) as f:
+            first_event = json.loads(f.readline())
+        last_event = _last_line(tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        self.segments.append({
+            "file": name,
+            "events": count,
+            "first_block": int(first_event["blockNumber"]),
+            "last_block": int(last_event["blockNumber"]),
+        })
+        self.state["block"], self.state["id"] = int(last_event["blockNumber"]), last_event["id"]
+        self.state["events"] += count
+        self._save()
+        return count
+
+    def compact(self, max_segments: int = COMPACT_SEGMENTS, segment_events: int = SEGMENT_EVENTS) -> bool:
+        """
+        Merge the trailing small segments once there are more than ``max_segments``.
+
+        Segments with at least ``segment_events`` events are never rewritten,
+        so compaction only moves recent data. Returns True if segments were merged.
+        """
+        tail = len(self.segments)
+        while tail > 0 and self.segments[tail - 1]["events"] < segment_events:
+            tail -= 1
+        small = self.segments[tail:]
+        if len(small) <= max(1, max_segments):
+            return False
+        name = self._next_file()
+        tmp_path = os.path.join(self.directory, f"{name}.tmp")
+        with open(tmp_path, "wb") as out:
+            for segment in small:
+                with open(self._segment_path(segment), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        merged = {
+            "file": name,
+            "events": sum(segment["events"] for segment in small),
+            "first_block": small[0]["first_block"],
+            "last_block": small[-1]["last_block"],
+        }
+        self.state["segments"] = self.segments[:tail] + [merged]
+        self._save()
+        for segment in small:
+            os.remove(self._segment_path(segment))
+        print(f"Compacted {len(small)} segments into {name}")
+        return True
+
+    def __iter__(self):
+        """Yield every exported event, oldest first."""
+        for segment in self.segments:
+            with open(self._segment_path(segment)) as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def export_incremental(url: str, out_dir: str = "history", network: str = "flare", first: int = PAGE_SIZE,
+                       workers: int = EXPORT_WORKERS) -> int:
+    """
+    Export the delegation events newer than the stored watermark into a new segment.
+
+    The first run exports the whole history; later runs only fetch events
+    after the last exported ``(blockNumber, id)``. Small segments are
+    compacted afterwards.
+
+    Returns:
+        Number of new events
+    """
+    store = HistoryStore(out_dir, network)
+    count = store.append(
+        lambda path, after: export_delegations_graphql(url, path, first=first, workers=workers, after=after)
+    )
+    store.compact()
+    print(f"{network}: {count} new events, {store.state['events']} in {len(store.segments)} segments")
+    return count
 
 
 def main(network: str = "flare") -> None:
+    logging.basicConfig(level=logging.INFO)
     url = os.getenv("FLARE_GRAPHQL_URL", DEFAULT_GRAPHQL_URL)
     if url.endswith("/graphiql"):
         url = url[: -len("graphiql")] + "graphql"
     print(f"Using GraphQL endpoint: {url}")
-    logs = fetch_all_delegations(url, network=network)
-    out_dir = os.path.join("history")
-    os.makedirs(out_dir, exist_ok=True)
-    path = os.path.join(out_dir, f"{network}_delegations.json")
-    with open(path, "w") as f:
-        json.dump(logs, f, indent=2)
-    print(f"Saved {len(logs)} logs to {path}")
+    try:
+        export_incremental(url, out_dir="history", network=network)
+    except Exception:
+        # The watermark only advances after a complete segment, so the next
+        # run picks up where this one stopped
+        logger.exception("GraphQL export failed; completed segments are kept")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    # Usage: python export_history.py [flare|songbird]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export new delegation events into history/<network>/.")
+    parser.add_argument("network", nargs="?", default="flare", choices=["flare", "songbird"],
+                        help="Network to export (default: flare)")
+    main(parser.parse_args().network)
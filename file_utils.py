@@ -0,0 +1,18 @@
+"""
+Small file helpers shared by the collectors, the snapshot cleaner and the
+history export.
+"""
+from __future__ import annotations
+
+import os
+import json
+import threading
+from typing import Any
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write ``data`` as JSON to ``path`` via a temporary file and rename."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
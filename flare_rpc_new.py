@@ -1,4 +1,3 @@
-import requests
 import json
 import os
 from typing import Dict, List, Any, Optional
@@ -26,8 +25,27 @@ VOTE_POWER_EVENT = "0xe7aa66356adbd5e839ef210626f6d8f6f72109c17fadf4c4f9ca82b315
 EPOCH_EVENT = "0x63db91b14b3d088c677f046180aefcea7a236649704d90ce810cde455d38d936"
 
 class FlareRPCError(Exception):
-    """Custom exception for RPC-related errors"""
-    pass
+    """Custom exception for RPC-related errors
+
+    ``code`` is the JSON-RPC error code and ``status_code`` the HTTP status,
+    when the node sent one; retry_policy uses them to tell rate limits and
+    transport faults from permanent errors.
+    """
+
+    def __init__(self, message: str, code: Optional[int] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+def _rpc_error(error: Any) -> FlareRPCError:
+    code = error.get("code") if isinstance(error, dict) else None
+    return FlareRPCError(f"RPC Error: {error}", code=code)
+
+
+def _network_error(e: Exception) -> FlareRPCError:
+    response = getattr(e, "response", None)
+    return FlareRPCError(f"Network error: {e}", status_code=getattr(response, "status_code", None))
 
 def get_provider_name(address: str) -> str:
     """
@@ -49,6 +67,8 @@ def get_provider_name(address: str) -> str:
 
 def make_rpc_call(network: str, method: str, params: List[Any] = None) -> str:
     """Make a JSON-RPC call to the Flare network via Ankr - updated signature"""
+    import requests  # deferred so CLI start-up does not load it
+
     if params is None:
         params = []
     
@@ -68,11 +88,11 @@ def make_rpc_call(network: str, method: str, params: List[Any] = None) -> str:
         result = response.json()
         
         if "error" in result:
-            raise FlareRPCError(f"RPC Error: {result['error']}")
+            raise _rpc_error(result["error"])
         
         return result.get("result", "")
     except requests.RequestException as e:
-        raise FlareRPCError(f"Network error: {e}")
+        raise _network_error(e)
 
 
 def get_contract_address(contract_name: str, network: str) -> Optional[str]:
@@ -145,6 +165,8 @@ def encode_string_param(text: str) -> str:
 
 def make_rpc_call_old(method: str, params: List[Any] = None, network: str = "flare") -> Dict[Any, Any]:
     """Make a JSON-RPC call to the Flare network via Ankr"""
+    import requests
+
     if params is None:
         params = []
     
@@ -164,11 +186,11 @@ def make_rpc_call_old(method: str, params: List[Any] = None, network: str = "fla
         result = response.json()
         
         if "error" in result:
-            raise FlareRPCError(f"RPC Error: {result['error']}")
+            raise _rpc_error(result["error"])
         
         return result
     except requests.RequestException as e:
-        raise FlareRPCError(f"Network error: {e}")
+        raise _network_error(e)
 
 def get_latest_block(network: str = "flare") -> int:
     """Get the latest block number"""
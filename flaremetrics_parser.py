@@ -0,0 +1,205 @@
+"""
+Parser for the flaremetrics.io provider table.
+
+Rows are extracted with the fastest available HTML backend (selectolax, then
+lxml, then BeautifulSoup's pure-Python ``html.parser``). Each cell's text is
+read exactly once and all patterns are compiled at import time; the provider
+dicts are identical whichever backend is used.
+"""
+from __future__ import annotations
+
+import os
+import re
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Preferred backend; "auto" picks the fastest one that is installed
+PARSER_BACKEND = os.getenv("FLAREMETRICS_PARSER", "auto")
+
+BACKEND_PREFERENCE = ("selectolax", "lxml", "bs4")
+
+_NUMBER_RE = re.compile(r"\d[\d,]*")
+_DECIMAL_RE = re.compile(r"\d+\.\d+")
+_NON_DECIMAL_RE = re.compile(r"[^0-9.]")
+_PERCENT_RE = re.compile(r"[0-9][0-9.,]*%")
+
+
+def extract_numbers(text):
+    """Extract integer sequences from text, preserving commas."""
+    return _NUMBER_RE.findall(text)
+
+
+def extract_decimal(text):
+    """Extract a floating-point number from text."""
+    m = _DECIMAL_RE.search(text)  # Match valid decimal numbers
+    if m:
+        return m.group(0)
+    # Fallback: remove non-digit and non-dot characters
+    cleaned = _NON_DECIMAL_RE.sub("", text)
+    # Ensure the cleaned value is a valid float
+    if cleaned.count('.') > 1 or cleaned == '.':  # Invalid if multiple dots or just a dot
+        return None
+    return cleaned
+
+
+def _percentages(text):
+    return [float(p[:-1].replace(',', '')) for p in _PERCENT_RE.findall(text)]
+
+
+def _split_vote_power(raw_vote):
+    """Return ``(vote_power, vote_power_locked)`` from the raw vote power cell."""
+    vote_nums = extract_numbers(raw_vote)
+    if len(vote_nums) >= 2:
+        # Already split, just clean commas and convert to int
+        first = vote_nums[0].replace(",", "")
+        second = vote_nums[1].replace(",", "")
+        return (int(first) if first else 0, int(second) if second else 0)
+    if len(vote_nums) == 1:
+        # Single number present. Check for doubled value pattern.
+        num = vote_nums[0].replace(",", "")
+        if num and len(num) % 2 == 0:
+            half = len(num) // 2
+            first, second = num[:half], num[half:]
+            if first == second:
+                return int(first), int(second)
+            return int(num), int(num)
+        value = int(num) if num else 0
+        return value, value
+    # Fallback: try to split the raw_vote string in half (legacy case)
+    vp = raw_vote.replace(",", "")
+    if vp and len(vp) % 2 == 0:
+        mid = len(vp) // 2
+        vp1, vp2 = vp[:mid], vp[mid:]
+        return (int(vp1) if vp1.isdigit() else 0, int(vp2) if vp2.isdigit() else 0)
+    return 0, 0
+
+
+def provider_from_cells(cells: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Build a provider dict from the stripped text of one table row.
+
+    Table columns: rank, Name, Vote Power, Vote Power %, 24h %, Reward Rate, Registered
+    """
+    if len(cells) < 7:
+        return None
+    rank, name, raw_vote, raw_vote_pct, raw_change_24h, raw_reward, registered = cells[:7]
+
+    vote_power, vote_power_locked = _split_vote_power(raw_vote)
+
+    pcts = _percentages(raw_vote_pct)
+    change_pcts = _percentages(raw_change_24h)
+    reward = extract_decimal(raw_reward)
+
+    return {
+        "rank": rank,
+        "name": name,
+        "vote_power": vote_power,
+        "vote_power_locked": vote_power_locked,
+        "vote_power_pct": pcts[0] if len(pcts) > 0 else 0.0,
+        "vote_power_pct_locked": pcts[1] if len(pcts) > 1 else 0.0,
+        "change_24h_pct": change_pcts[0] if change_pcts else 0.0,
+        "reward_rate": float(reward) if reward else 0.0,
+        "registered": registered,
+    }
+
+
+# --- Row extraction backends: HTML -> list of per-row cell texts ---
+
+def _rows_selectolax(html: str) -> List[List[str]]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    return [
+        [td.text(deep=True, separator="", strip=True) for td in row.css("td")]
+        for row in tree.css("table tbody tr")
+    ]
+
+
+def _rows_lxml(html: str) -> List[List[str]]:
+    import lxml.html
+
+    if not html.strip():
+        return []
+    doc = lxml.html.document_fromstring(html)
+    return [
+        ["".join(t.strip() for t in td.itertext()) for td in row.iter("td")]
+        for row in doc.iterfind(".//table//tbody//tr")
+    ]
+
+
+def _rows_bs4(html: str) -> List[List[str]]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        [td.get_text("", strip=True) for td in row.find_all("td")]
+        for row in soup.select("table tbody tr")
+    ]
+
+
+ROW_BACKENDS: Dict[str, Callable[[str], List[List[str]]]] = {
+    "selectolax": _rows_selectolax,
+    "lxml": _rows_lxml,
+    "bs4": _rows_bs4,
+}
+
+_BACKEND_MODULES = {
+    "selectolax": "selectolax.lexbor",
+    "lxml": "lxml.html",
+    "bs4": "bs4",
+}
+
+_resolved_backend: Optional[str] = None
+
+
+def available_backends() -> List[str]:
+    """Return the installed backends in order of preference."""
+    import importlib
+
+    found = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            importlib.import_module(_BACKEND_MODULES[name])
+        except Exception:
+            continue
+        found.append(name)
+    return found
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Return the backend to use for ``name`` (or the configured default)."""
+    global _resolved_backend
+    name = name or PARSER_BACKEND
+    if name != "auto":
+        if name not in ROW_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {name}")
+        return name
+    if _resolved_backend is None:
+        found = available_backends()
+        if not found:
+            raise ImportError("No HTML parser installed (selectolax, lxml or beautifulsoup4)")
+        _resolved_backend = found[0]
+        logger.info(f"Using {_resolved_backend} backend for flaremetrics parsing")
+    return _resolved_backend
+
+
+def parse_provider_table(html: str, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Parse the flaremetrics provider table.
+
+    Args:
+        html: Page source (rendered DOM or server-side HTML)
+        backend: 'selectolax', 'lxml', 'bs4' or None for the configured default
+
+    Returns:
+        List of provider dicts in table order
+    """
+    rows = ROW_BACKENDS[resolve_backend(backend)](html)
+    providers = []
+    for cells in rows:
+        provider = provider_from_cells(cells)
+        if provider is not None:
+            providers.append(provider)
+    return providers
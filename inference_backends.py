@@ -0,0 +1,193 @@
+"""
+Selectable text-generation backends for the query server.
+
+Every backend loads a transformers ``text-generation`` pipeline (so the
+batching worker and streaming code work unchanged) but differs in how the
+model runs on the CPU:
+
+* ``torch``      - eager PyTorch, float32 (the original behaviour)
+* ``torch-int8`` - PyTorch with dynamic int8 quantization of the linear layers
+* ``onnx``       - ONNX Runtime via ``optimum`` (the model is exported once and
+  cached under ``ONNX_CACHE_DIR``)
+
+Selection and tuning use ``INFERENCE_BACKEND``, ``INFERENCE_MODEL`` and
+``INFERENCE_THREADS`` (0 keeps the library default). transformers, torch and
+optimum are imported only when a backend is loaded.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import logging
+from typing import Any, Dict, Optional, Type
+
+from exceptions import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+DEFAULT_MODEL = os.getenv("INFERENCE_MODEL", "gpt2")
+DEFAULT_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(".cache", "onnx"))
+
+
+class InferenceBackend:
+    """
+    Base class: loads a text-generation pipeline for ``model``.
+
+    Args:
+        model: Hugging Face model id or local path
+        threads: Intra-op CPU threads; 0 keeps the library default
+    """
+
+    name = "base"
+
+    def __init__(self, model: str = DEFAULT_MODEL, threads: int = DEFAULT_THREADS):
+        self.model = model
+        self.threads = threads
+
+    def load(self) -> Any:
+        """Return a ready ``text-generation`` pipeline."""
+        raise NotImplementedError
+
+    def _set_torch_threads(self) -> None:
+        if self.threads > 0:
+            import torch
+            torch.set_num_threads(self.threads)
+
+    def _pipeline(self, model: Any, tokenizer: Any = None) -> Any:
+        from transformers import pipeline
+        return pipeline("text-generation", model=model, tokenizer=tokenizer)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(model={self.model!r}, threads={self.threads})"
+
+
+class TorchBackend(InferenceBackend):
+    """Eager PyTorch in float32."""
+
+    name = "torch"
+
+    def load(self) -> Any:
+        self._set_torch_threads()
+        return self._pipeline(self.model)
+
+
+def _conv1d_to_linear(model: Any) -> int:
+    """
+    Replace GPT-2 style ``Conv1D`` layers with equivalent ``nn.Linear`` ones.
+
+    ``quantize_dynamic`` only knows ``nn.Linear``; GPT-2's attention and MLP
+    projections are ``Conv1D`` (a linear layer with a transposed weight).
+    Returns the number of layers replaced.
+    """
+    import torch
+
+    replaced = 0
+    for parent in list(model.modules()):
+        for child_name, child in list(parent.named_children()):
+            if type(child).__name__ != "Conv1D":
+                continue
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                linear.bias.copy_(child.bias)
+            setattr(parent, child_name, linear)
+            replaced += 1
+    return replaced
+
+
+class TorchInt8Backend(InferenceBackend):
+    """PyTorch with dynamically quantized int8 linear layers."""
+
+    name = "torch-int8"
+
+    def load(self) -> Any:
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self._set_torch_threads()
+        model = AutoModelForCausalLM.from_pretrained(self.model)
+        model.eval()
+        converted = _conv1d_to_linear(model)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info(f"Quantized {self.model} to int8 ({converted} Conv1D layers converted)")
+        return self._pipeline(model, AutoTokenizer.from_pretrained(self.model))
+
+
+class OnnxBackend(InferenceBackend):
+    """
+    ONNX Runtime through ``optimum``.
+
+    The first load exports the model and saves it, with its tokenizer, under
+    ``cache_dir``; later loads read the saved export instead of exporting again.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model: str = DEFAULT_MODEL, threads: int = DEFAULT_THREADS, cache_dir: str = ONNX_CACHE_DIR):
+        super().__init__(model, threads)
+        self.cache_dir = cache_dir
+
+    @property
+    def export_path(self) -> str:
+        return os.path.join(self.cache_dir, self.model.strip("/").replace("/", "--"))
+
+    def load(self) -> Any:
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForCausalLM
+        except ImportError as e:
+            raise ConfigurationError(
+                "The onnx backend needs 'optimum[onnxruntime]' (pip install optimum[onnxruntime])"
+            ) from e
+        from transformers import AutoTokenizer
+
+        options = onnxruntime.SessionOptions()
+        if self.threads > 0:
+            options.intra_op_num_threads = self.threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        path = self.export_path
+        if os.path.isdir(path):
+            model = ORTModelForCausalLM.from_pretrained(path, export=False, session_options=options)
+            return self._pipeline(model, AutoTokenizer.from_pretrained(path))
+
+        logger.info(f"Exporting {self.model} to ONNX in {path}")
+        model = ORTModelForCausalLM.from_pretrained(self.model, export=True, session_options=options)
+        tokenizer = AutoTokenizer.from_pretrained(self.model)
+        # Save next to the final path and rename, so an interrupted export is never reused
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        model.save_pretrained(tmp_path)
+        tokenizer.save_pretrained(tmp_path)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process finished its export first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return self._pipeline(model, tokenizer)
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    backend.name: backend for backend in (TorchBackend, TorchInt8Backend, OnnxBackend)
+}
+
+
+def get_backend(name: Optional[str] = None, model: Optional[str] = None, threads: Optional[int] = None) -> InferenceBackend:
+    """
+    Return the configured backend.
+
+    Raises:
+        ConfigurationError: For an unknown backend name
+    """
+    name = name or DEFAULT_BACKEND
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ConfigurationError(
+            f"Unknown inference backend '{name}' (choose from {', '.join(BACKENDS)})"
+        )
+    return backend_class(
+        model=model or DEFAULT_MODEL,
+        threads=DEFAULT_THREADS if threads is None else threads,
+    )
@@ -0,0 +1,272 @@
+"""
+Micro-batching worker for text generation.
+
+Requests are queued and a single background thread drains the queue: it
+waits for the first prompt, keeps collecting for up to ``max_wait`` seconds
+(or until ``max_batch`` prompts are queued) and runs them through the model
+as one padded batch. Each caller holds a future for its own prompt. A full
+queue sheds load immediately instead of letting requests pile up.
+"""
+from __future__ import annotations
+
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from exceptions import InferenceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "8"))
+MAX_WAIT = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10")) / 1000  # seconds
+QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+REQUEST_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "30"))  # seconds
+
+
+def pipeline_batch(text_gen: Any, prompts: List[str]) -> List[str]:
+    """
+    Run ``prompts`` through a transformers text-generation pipeline.
+
+    A single prompt is passed as-is (no padding); several are passed as a
+    list with ``batch_size`` so the pipeline pads them into one forward pass.
+
+    Returns:
+        The generated text (prompt included) for each prompt, in order
+    """
+    if len(prompts) == 1:
+        outputs = [text_gen(prompts[0])]
+    else:
+        outputs = text_gen(prompts, batch_size=len(prompts))
+    texts = []
+    for output in outputs:
+        # Pipelines return one list of candidates per prompt
+        if isinstance(output, list):
+            output = output[0]
+        texts.append(output["generated_text"])
+    return texts
+
+
+def stream_pipeline(
+    text_gen: Any,
+    prompt: str,
+    timeout: float = REQUEST_TIMEOUT,
+    on_finish: Optional[Callable[[], None]] = None,
+) -> Iterator[str]:
+    """
+    Yield the generated continuation of ``prompt`` piece by piece.
+
+    Uses transformers' ``TextIteratorStreamer`` with generation running on a
+    helper thread. Pipelines that cannot stream (no tokenizer, or an older
+    transformers) yield the whole continuation as one piece.
+
+    If the iterator is closed early (the client went away) or fails (the
+    streamer timed out), generation stops at the next token. ``on_finish`` is
+    called once generation is over, which may be after the iterator is
+    closed, so callers can hold resources until the model is really idle.
+    """
+    finish = on_finish or (lambda: None)
+    try:
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+    except ImportError:
+        TextIteratorStreamer = None
+    tokenizer = getattr(text_gen, "tokenizer", None)
+    if TextIteratorStreamer is None or tokenizer is None:
+        try:
+            yield pipeline_batch(text_gen, [prompt])[0][len(prompt):]
+        finally:
+            finish()
+        return
+
+    stop = threading.Event()
+
+    class StopWhenClosed(StoppingCriteria):
+        def __call__(self, input_ids: Any, scores: Any, **kwargs: Any) -> bool:
+            return stop.is_set()
+
+    try:
+        streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+    except Exception:
+        finish()
+        raise
+    errors: List[Exception] = []
+
+    def generate() -> None:
+        try:
+            text_gen(prompt, streamer=streamer, stopping_criteria=StoppingCriteriaList([StopWhenClosed()]))
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+        finally:
+            finish()
+
+    thread = threading.Thread(target=generate, name="inference-stream", daemon=True)
+    thread.start()
+    try:
+        for piece in streamer:
+            if piece:
+                yield piece
+    finally:
+        stop.set()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+class LatencyTracker:
+    """Rolling latency samples (seconds) summarised in milliseconds."""
+
+    def __init__(self, samples: int = 200):
+        self._samples: "deque[float]" = deque(maxlen=samples)
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self.count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        }
+
+
+def prepare_for_batching(text_gen: Any) -> Any:
+    """Give the pipeline's tokenizer a pad token and left padding (GPT-2 has neither)."""
+    tokenizer = getattr(text_gen, "tokenizer", None)
+    if tokenizer is not None:
+        if getattr(tokenizer, "pad_token", None) is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # Decoder-only models must be padded on the left to continue the prompt
+        tokenizer.padding_side = "left"
+    return text_gen
+
+
+class InferenceWorker:
+    """
+    Collect prompts into batches and run them on a background thread.
+
+    Args:
+        run_batch: ``prompts -> generated texts`` for one batch
+        max_batch: Largest batch run at once
+        max_wait: Seconds to keep collecting after the first prompt arrives
+        queue_size: Pending prompts accepted before requests are shed
+        timeout: Default seconds a caller waits for its result
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str]], List[str]],
+        max_batch: int = MAX_BATCH,
+        max_wait: float = MAX_WAIT,
+        queue_size: int = QUEUE_SIZE,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.completed = 0
+        self.shed = 0
+
+    def start(self) -> None:
+        """Start the worker thread if it is not running."""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "completed": self.completed,
+            "shed": self.shed,
+            "mean_batch": round(self.completed / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def submit(self, prompt: str) -> Future:
+        """
+        Queue ``prompt`` and return a future for its generated text.
+
+        Raises:
+            InferenceOverloadedError: If the queue is full
+        """
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((prompt, future))
+        except queue.Full:
+            self.shed += 1
+            raise InferenceOverloadedError(f"Inference queue full ({self._queue.maxsize} pending)")
+        return future
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Generate text for ``prompt``, waiting at most ``timeout`` seconds.
+
+        Raises:
+            InferenceOverloadedError: If the queue is full
+            TimeoutError: If no result arrived in time; a prompt that has not
+                started yet is dropped from its batch
+        """
+        future = self.submit(prompt)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError("Inference request timed out")
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        """Block for the first request, then gather more until the batch window closes."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # Drop requests whose callers already gave up
+        return [(prompt, future) for prompt, future in batch if future.set_running_or_notify_cancel()]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            prompts = [prompt for prompt, _ in batch]
+            try:
+                results = self.run_batch(prompts)
+                if len(results) != len(prompts):
+                    raise RuntimeError(f"Model returned {len(results)} results for {len(prompts)} prompts")
+            except Exception as e:
+                logger.error(f"Inference batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.completed += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,135 @@
+"""
+Condition-based page readiness for scraped tables.
+
+Instead of sleeping a fixed amount of time after ``driver.get`` we poll the
+number of rows in the rendered table and consider the page ready once that
+count is non-zero and has stopped changing for a few consecutive polls.
+"""
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+READY_TIMEOUT = float(os.getenv("SNAPSHOT_READY_TIMEOUT", "30"))  # seconds
+READY_POLL_INTERVAL = float(os.getenv("SNAPSHOT_READY_POLL", "0.25"))  # seconds
+READY_STABLE_POLLS = int(os.getenv("SNAPSHOT_READY_STABLE_POLLS", "3"))
+
+TABLE_ROW_SELECTOR = "table tbody tr"
+
+_ROW_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+
+@dataclass
+class ReadinessResult:
+    """Outcome of waiting for a table to finish rendering."""
+    ready: bool
+    rows: int
+    elapsed: float
+    polls: int
+
+
+def count_rows(driver: Any, selector: str = TABLE_ROW_SELECTOR) -> int:
+    """Return the number of elements matching ``selector`` in the current page."""
+    count = driver.execute_script(_ROW_COUNT_SCRIPT, selector)
+    try:
+        return int(count or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def wait_for_table_rows(
+    driver: Any,
+    selector: str = TABLE_ROW_SELECTOR,
+    timeout: float = READY_TIMEOUT,
+    poll_interval: float = READY_POLL_INTERVAL,
+    stable_polls: int = READY_STABLE_POLLS,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> ReadinessResult:
+    """
+    Wait until the row count for ``selector`` is non-zero and stable.
+
+    Args:
+        driver: WebDriver instance with the target page already requested
+        selector: CSS selector of the rows to count
+        timeout: Maximum time to wait in seconds
+        poll_interval: Delay between row count checks in seconds
+        stable_polls: Number of consecutive identical non-zero counts required
+
+    Returns:
+        ReadinessResult describing whether the table settled and how long it took
+    """
+    start = clock()
+    last_count = -1
+    stable = 0
+    polls = 0
+
+    while True:
+        count = count_rows(driver, selector)
+        polls += 1
+        elapsed = clock() - start
+
+        if count > 0 and count == last_count:
+            stable += 1
+        else:
+            stable = 1 if count > 0 else 0
+        last_count = count
+
+        if stable >= stable_polls:
+            return ReadinessResult(ready=True, rows=count, elapsed=elapsed, polls=polls)
+
+        if elapsed >= timeout:
+            # A partially rendered but non-empty table is still usable
+            return ReadinessResult(ready=count > 0, rows=count, elapsed=elapsed, polls=polls)
+
+        sleep(min(poll_interval, max(timeout - elapsed, 0)))
+
+
+class ReadinessMetrics:
+    """Thread-safe record of time-to-ready samples per network."""
+
+    def __init__(self, max_samples: int = 100):
+        self.max_samples = max_samples
+        self._samples: Dict[str, List[ReadinessResult]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, network: str, result: ReadinessResult) -> None:
+        """Store a readiness sample for ``network``."""
+        with self._lock:
+            samples = self._samples.setdefault(network, [])
+            samples.append(result)
+            del samples[:-self.max_samples]
+        logger.info(
+            f"{network} table ready={result.ready} rows={result.rows} "
+            f"after {result.elapsed:.2f}s ({result.polls} polls)"
+        )
+
+    def last(self, network: str) -> Optional[ReadinessResult]:
+        """Return the most recent sample for ``network`` if any."""
+        with self._lock:
+            samples = self._samples.get(network)
+            return samples[-1] if samples else None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, timeout count, mean and max time-to-ready per network."""
+        with self._lock:
+            out = {}
+            for network, samples in self._samples.items():
+                times = [s.elapsed for s in samples if s.ready]
+                out[network] = {
+                    "samples": len(samples),
+                    "not_ready": len(samples) - len(times),
+                    "mean_seconds": sum(times) / len(times) if times else 0.0,
+                    "max_seconds": max(times) if times else 0.0,
+                }
+            return out
+
+
+# Shared registry used by the scrapers
+readiness_metrics = ReadinessMetrics()
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import glob
-import json
 import os
+import re
+import json
+import time
+import hashlib
+import datetime
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 try:
     from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -18,11 +24,23 @@ except Exception:  # pragma: no cover - slowapi optional for tests
     RateLimitExceeded = Exception
     def _rate_limit_exceeded_handler(request, exc):
         raise HTTPException(status_code=429, detail="Rate limit exceeded")
-from transformers import pipeline
 from pydantic import BaseModel, ValidationError, validator
 
 from schemas import QueryRequest, sanitize_file_path
-from exceptions import ConfigurationError, FileOperationError, WebScrapingError
+from exceptions import ConfigurationError, FileOperationError, WebScrapingError, InferenceOverloadedError
+from inference_worker import (
+    InferenceWorker,
+    LatencyTracker,
+    pipeline_batch,
+    prepare_for_batching,
+    stream_pipeline,
+)
+from answer_cache import AnswerCache
+from inference_backends import get_backend
+from snapshot_repository import SNAPSHOT_DIRS, SnapshotRepository
+from snapshot_index import SnapshotIndex, pack_context
+from snapshot_aggregates import SnapshotAggregates, provider_key
+from epoch_calendar import EpochCalendar
 
 class Question(BaseModel):
     """Backward compatible schema used in tests."""
@@ -42,6 +60,8 @@ logger = logging.getLogger(__name__)
 
 # Rate limiting (disabled if slowapi not installed)
 app = FastAPI()
+GZIP_MINIMUM_SIZE = 1024  # bytes; smaller bodies are sent uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
 if Limiter is not None:
     limiter = Limiter(key_func=get_remote_address)
     app.state.limiter = limiter
@@ -56,60 +76,146 @@ else:
         limit = staticmethod(_dummy_limit)
     limiter = _DummyLimiter()
 
-# Load a lightweight generation model
-try:
-    text_gen = pipeline("text-generation", model="gpt2")
-    logger.info("Text generation model loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading text-generation model: {e}")
-    text_gen = None
+# The generation model and snapshot data are loaded on first use so that
+# importing this module (and starting the server) stays fast.
+text_gen = None
+_text_gen_error = None
+_load_lock = threading.Lock()
+
+# Snapshots are re-read in the background as new files land; each request
+# works on whichever view was current when it started.
+repository = SnapshotRepository([sanitize_file_path(d) for d in SNAPSHOT_DIRS])
+# Derived from the latest view by _on_publish; requests never rebuild them
+_index: SnapshotIndex | None = None
+_aggregates: SnapshotAggregates | None = None
+_derived_lock = threading.RLock()
+
+API_CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", "60"))  # seconds
+API_CACHE_ENTRIES = 1024
+# Encoded REST responses for one view version: (version, {key: (body, etag)})
+_responses: Tuple[int, Dict[tuple, Tuple[bytes, str]]] = (0, {})
+_ETAG_RE = re.compile(r'\*|(?:W/)?"[^"]*"')
+
+
+def get_text_gen():
+    """Return the text-generation pipeline, loading it on first call.
+
+    The backend (torch, torch-int8, onnx), model and thread count come from
+    ``INFERENCE_BACKEND``, ``INFERENCE_MODEL`` and ``INFERENCE_THREADS``.
+    """
+    global text_gen, _text_gen_error
+    if text_gen is None and _text_gen_error is None:
+        with _load_lock:
+            if text_gen is None and _text_gen_error is None:
+                try:
+                    backend = get_backend()
+                    text_gen = prepare_for_batching(backend.load())
+                    logger.info(f"Text generation model loaded successfully ({backend!r})")
+                except Exception as e:
+                    logger.error(f"Error loading text-generation model: {e}")
+                    _text_gen_error = e
+    return text_gen
+
+
+# Concurrent questions are batched into one forward pass by a single worker
+inference = InferenceWorker(lambda prompts: pipeline_batch(get_text_gen(), prompts))
+# Answers are reused until they expire or new snapshots arrive
+answer_cache = AnswerCache()
+# Streaming generations bypass the batching worker, so bound them separately
+STREAM_CONCURRENCY = int(os.getenv("STREAM_CONCURRENCY", "2"))
+_stream_slots = threading.BoundedSemaphore(STREAM_CONCURRENCY)
+first_token_latency = LatencyTracker()
 
 
 def load_snapshots_safely() -> List[Dict[str, Any]]:
-    """Load snapshot data with proper error handling and path validation."""
-    snapshots = []
-    
+    """Return the currently published snapshots, loading them on first call."""
     try:
-        # Use path validation to prevent directory traversal
-        docs_path = sanitize_file_path("docs/daily_snapshots")
-        pattern = os.path.join(docs_path, "*.json")
-        
-        for path in sorted(glob.glob(pattern)):
-            filename = os.path.basename(path)
-            
-            # Skip manifest files
-            if filename == "manifest.json":
-                continue
-                
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    snapshots.append(data)
-                    
-            except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                logger.error(f"Error loading snapshot file {path}: {e}")
-                raise FileOperationError(f"Failed to load snapshot file", file_path=path)
-            except Exception as e:
-                logger.error(f"Unexpected error loading {path}: {e}")
-                
+        return repository.view().snapshots
     except Exception as e:
         logger.error(f"Error loading snapshots: {e}")
         raise FileOperationError("Failed to load snapshot data")
-    
-    logger.info(f"Loaded {len(snapshots)} snapshot files")
-    return snapshots
 
 
-# Load snapshots on startup
-try:
-    snapshots = load_snapshots_safely()
-    # Keep context short to ensure fast inference
-    CONTEXT = json.dumps(snapshots)[:2000]
-    logger.info(f"Context prepared with {len(CONTEXT)} characters")
-except Exception as e:
-    logger.error(f"Failed to load snapshots on startup: {e}")
-    CONTEXT = "No snapshot data available"
-    snapshots = []
+def _build_derived(view) -> None:
+    """Index ``view`` and swap the new index and aggregates in together."""
+    global _index, _aggregates
+    calendar = EpochCalendar.load()
+    index = SnapshotIndex(view, calendar)
+    aggregates = SnapshotAggregates(view, calendar)
+    _index, _aggregates = index, aggregates
+    logger.info(f"Indexed {len(index)} provider rows from {len(view)} snapshots")
+
+
+def _ensure_derived() -> None:
+    """Build the derived data once if no view has been published yet."""
+    # Outside the lock: the first load publishes, which builds via _on_publish
+    view = repository.view()
+    with _derived_lock:
+        if _index is None or _aggregates is None:
+            _build_derived(view)
+
+
+def get_index() -> SnapshotIndex:
+    """
+    Return the retrieval index of the latest indexed snapshot view.
+
+    New views are indexed by the publish callback; until it finishes,
+    requests keep using the previous index instead of waiting for a rebuild.
+    """
+    if _index is None:
+        _ensure_derived()
+    return _index
+
+
+def get_aggregates() -> SnapshotAggregates:
+    """Return the REST aggregates of the latest indexed snapshot view."""
+    if _aggregates is None:
+        _ensure_derived()
+    return _aggregates
+
+
+def _on_publish(view) -> None:
+    """Rebuild derived data as soon as new snapshots are ingested."""
+    with _derived_lock:
+        _build_derived(view)
+    # Answers are keyed on the index version, so only now are they stale
+    answer_cache.clear()
+
+
+repository.subscribe(_on_publish)
+
+
+def get_context(question: str = "", limit: int = 2000) -> str:
+    """Return the snapshot rows most relevant to ``question`` as a compact table."""
+    try:
+        index = get_index()
+    except Exception as e:
+        logger.error(f"Failed to load snapshots: {e}")
+        return "No snapshot data available"
+    if not len(index):
+        return "No snapshot data available"
+    return pack_context(index.search(question), limit)
+
+
+@app.on_event("startup")
+def _warm_up() -> None:
+    """Load the model and data in the background and start watching for new files."""
+    threading.Thread(target=lambda: (get_text_gen(), repository.start(), get_index()), daemon=True).start()
+
+
+@app.on_event("shutdown")
+def _shut_down() -> None:
+    repository.stop()
+    inference.stop()
+
+
+def build_prompt(q: QueryRequest) -> str:
+    """Construct the model prompt from the sanitized question and its context."""
+    return (
+        "Answer this question about the FTSO dataset:\n" +
+        get_context(q.query, q.context_limit or 2000) +
+        f"\nQuestion: {q.query}\nAnswer:"
+    )
 
 
 @app.post("/query")
@@ -131,6 +237,13 @@ def query(q: QueryRequest | Question, request: Request = None):
     if isinstance(q, Question):
         q = q.to_query_request()
 
+    # The data version is part of the key, so answers about old data never match
+    cache_key = answer_cache.key(q.query, get_index().version, q.context_limit)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return {"answer": cached, "cached": True}
+
+    text_gen = get_text_gen()
     if not text_gen:
         logger.error("Query attempted but text generation model not available")
         raise HTTPException(
@@ -139,24 +252,31 @@ def query(q: QueryRequest | Question, request: Request = None):
         )
 
     try:
-        # Construct prompt with sanitized input
-        prompt = (
-            "Answer this question about the FTSO dataset:\n" + 
-            CONTEXT[:q.context_limit] +
-            f"\nQuestion: {q.query}\nAnswer:"
-        )
-        
-        # Generate response with limits
-        result = text_gen(prompt)
-        
-        generated = result[0]["generated_text"]
+        prompt = build_prompt(q)
+
+        # Queued for the batching worker; waits at most INFERENCE_TIMEOUT seconds
+        started = time.perf_counter()
+        generated = inference.generate(prompt)
         answer = generated[len(prompt):].strip()
+        answer_cache.put(cache_key, answer, cost=time.perf_counter() - started)
         
         # Log successful query (without sensitive data)
         logger.info(f"Query processed successfully, response length: {len(answer)}")
         
         return {"answer": answer}
         
+    except InferenceOverloadedError as e:
+        logger.warning(f"Query shed: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending questions, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    except TimeoutError:
+        logger.warning("Query timed out waiting for the model")
+        raise HTTPException(status_code=504, detail="Timed out generating an answer")
+
     except ValidationError as e:
         logger.warning(f"Validation error in query: {e}")
         raise HTTPException(status_code=400, detail="Invalid query format")
@@ -168,6 +288,204 @@ def query(q: QueryRequest | Question, request: Request = None):
             detail="Internal server error processing query"
         )
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/query/stream")
+@limiter.limit("10/minute")
+def query_stream(q: QueryRequest | Question, request: Request = None):
+    """
+    Stream the answer as Server-Sent Events.
+
+    Emits ``token`` events with text pieces as they are generated, then a
+    ``done`` event with the full answer (or an ``error`` event).
+
+    Raises:
+        HTTPException: 503 if the model is unavailable or too many streams run
+    """
+    if isinstance(q, Question):
+        q = q.to_query_request()
+    return _stream_answer(q)
+
+
+@app.get("/query/stream")
+@limiter.limit("10/minute")
+def query_stream_get(question: str, context_limit: int = 2000, request: Request = None):
+    """``EventSource``-friendly variant of :func:`query_stream`."""
+    try:
+        q = QueryRequest(query=question, context_limit=context_limit)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid query format")
+    return _stream_answer(q)
+
+
+def _stream_answer(q: QueryRequest) -> StreamingResponse:
+    cache_key = answer_cache.key(q.query, get_index().version, q.context_limit)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        events = iter([_sse("token", {"token": cached}), _sse("done", {"answer": cached, "cached": True})])
+        return _event_stream(events)
+
+    text_gen = get_text_gen()
+    if not text_gen:
+        logger.error("Query attempted but text generation model not available")
+        raise HTTPException(status_code=503, detail="Text generation service unavailable")
+    if not _stream_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many streaming questions, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    def events():
+        started = time.perf_counter()
+        pieces: List[str] = []
+        stream = None
+        try:
+            # The pipeline releases the slot once generation has stopped, which
+            # may be after this generator is closed by a disconnecting client
+            stream = stream_pipeline(text_gen, build_prompt(q), on_finish=_stream_slots.release)
+            for piece in stream:
+                if not pieces:
+                    first_token_latency.record(time.perf_counter() - started)
+                pieces.append(piece)
+                yield _sse("token", {"token": piece})
+            answer = "".join(pieces).strip()
+            answer_cache.put(cache_key, answer, cost=time.perf_counter() - started)
+            logger.info(f"Streamed query processed successfully, response length: {len(answer)}")
+            yield _sse("done", {"answer": answer})
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            yield _sse("error", {"detail": "Internal server error processing query"})
+        finally:
+            if stream is None:
+                _stream_slots.release()
+            else:
+                stream.close()  # stops generation if the client went away mid-answer
+
+    return _event_stream(events())
+
+
+def _event_stream(events) -> StreamingResponse:
+    # Buffering proxies would hold tokens back until the answer is complete
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events, media_type="text/event-stream", headers=headers)
+
+
+@app.get("/metrics")
+def metrics():
+    """Answer cache, inference worker and snapshot data statistics."""
+    return {
+        "answer_cache": answer_cache.stats(),
+        "inference": inference.stats(),
+        "stream_first_token": first_token_latency.stats(),
+        "snapshots": {"version": repository.version},
+    }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` with every tag listed in ``If-None-Match``."""
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in _ETAG_RE.findall(if_none_match):
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def _cached_json(request: Optional[Request], key: tuple, build: Callable[[SnapshotAggregates], Any]) -> Response:
+    """
+    Serve ``build(aggregates)`` as JSON with a weak ETag.
+
+    The encoded body is cached until the snapshot view changes, so repeated
+    reads cost a dictionary lookup; a matching ``If-None-Match`` gets a 304.
+    The tag is weak because the gzip and identity encodings of a body share it.
+    """
+    global _responses
+    aggregates = get_aggregates()
+    version, entries = _responses
+    if version != aggregates.version or len(entries) >= API_CACHE_ENTRIES:
+        entries = {}
+        _responses = (aggregates.version, entries)
+    entry = entries.get(key)
+    if entry is None:
+        payload = build(aggregates)
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        entry = (body, f'W/"{hashlib.sha1(body).hexdigest()}"')
+        entries[key] = entry
+
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={API_CACHE_MAX_AGE}"}
+    if request is not None and _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept-Encoding"})
+    if len(body) < GZIP_MINIMUM_SIZE:
+        # GZipMiddleware adds the Vary header itself to bodies it may compress
+        headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _require(value, detail: str):
+    if not value:
+        raise HTTPException(status_code=404, detail=detail)
+    return value
+
+
+@app.get("/snapshots/latest")
+def latest_snapshot(request: Request, network: str = "flare"):
+    """Newest snapshot of ``network``."""
+    return _cached_json(request, ("latest", network), lambda agg: _require(
+        agg.latest(network), f"No snapshots for network '{network}'"
+    ))
+
+
+@app.get("/providers/{name}/series")
+def provider_series(
+    name: str,
+    request: Request,
+    network: Optional[str] = None,
+    days: Optional[int] = Query(None, ge=1, le=3650),
+):
+    """Vote power, rank and reward rate of one provider over time."""
+    def build(agg: SnapshotAggregates):
+        series = _require(agg.provider_series(name, network, days), f"Unknown provider '{name}'")
+        return {"name": agg.names.get(provider_key(name), name), "series": series}
+    return _cached_json(request, ("series", provider_key(name), network, days), build)
+
+
+@app.get("/epochs/{epoch}")
+def epoch_snapshots(epoch: int, request: Request, network: Optional[str] = None):
+    """Snapshots taken at the start of reward epoch ``epoch``."""
+    def build(agg: SnapshotAggregates):
+        snapshots = agg.epoch(epoch)
+        if network:
+            snapshots = {network: snapshots[network]} if network in snapshots else {}
+        return {"epoch": epoch, "snapshots": _require(snapshots, f"No snapshots for epoch {epoch}")}
+    return _cached_json(request, ("epoch", epoch, network), build)
+
+
+@app.get("/rankings")
+def rankings(
+    request: Request,
+    at: Optional[datetime.date] = None,
+    network: str = "flare",
+    limit: int = Query(25, ge=1, le=500),
+):
+    """Provider ranking of the newest snapshot on or before ``at`` (default: latest)."""
+    def build(agg: SnapshotAggregates):
+        snapshot = agg.at(network, at.isoformat()) if at else agg.latest(network)
+        _require(snapshot, f"No snapshots for network '{network}'")
+        providers = sorted(snapshot["providers"], key=_rank)[:limit]
+        return {"network": network, "date": snapshot["date"], "epoch": snapshot["epoch"], "providers": providers}
+    return _cached_json(request, ("rankings", at, network, limit), build)
+
+
+def _rank(provider: Dict[str, Any]) -> float:
+    try:
+        return int(provider.get("rank"))
+    except (TypeError, ValueError):
+        return float("inf")
+
+
 app.mount("/", StaticFiles(directory="docs", html=True), name="docs")
 
 
@@ -0,0 +1,196 @@
+"""
+Retry policy with exponential backoff, jitter and a deadline budget.
+
+Failures are classified (driver crash, empty table, HTTP error, RPC error)
+so callers can decide which ones are worth retrying, and transient faults
+are retried within seconds instead of after a fixed ten-minute delay. RPC
+errors the node answered with (other than rate limits) are permanent.
+"""
+from __future__ import annotations
+
+import os
+import time
+import random
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
+
+from exceptions import (
+    ConfigurationError,
+    EmptyResultError,
+    RPCError,
+    WebDriverError,
+    WebScrapingError,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = float(os.getenv("SNAPSHOT_RETRY_BASE_DELAY", "2"))  # seconds
+# SNAPSHOT_RETRY_DELAY used to be the fixed delay; it now caps the backoff
+RETRY_MAX_DELAY = float(
+    os.getenv("SNAPSHOT_RETRY_MAX_DELAY", os.getenv("SNAPSHOT_RETRY_DELAY", "120"))
+)
+RETRY_DEADLINE = float(os.getenv("SNAPSHOT_RETRY_DEADLINE", "1800"))  # seconds
+
+# Error classes
+DRIVER_CRASH = "driver_crash"
+EMPTY_TABLE = "empty_table"
+HTTP_ERROR = "http_error"
+RPC_ERROR = "rpc_error"
+RPC_PERMANENT = "rpc_permanent"
+CONFIG_ERROR = "config_error"
+UNKNOWN = "unknown"
+
+DEFAULT_RETRYABLE = frozenset({DRIVER_CRASH, EMPTY_TABLE, HTTP_ERROR, RPC_ERROR, UNKNOWN})
+
+# HTTP statuses that indicate a permanent client error
+_PERMANENT_HTTP_STATUSES = frozenset({400, 401, 403, 404, 405, 410, 422})
+
+# JSON-RPC error codes worth retrying: "limit exceeded" (EIP-1474). Any other
+# code is an answer from the node (bad params, reverted call, unknown method)
+# that a retry would only repeat.
+RATE_LIMIT_RPC_CODES = frozenset({-32005})
+
+# Extra exception types registered by modules that define their own errors
+_registered: Dict[Type[BaseException], str] = {}
+
+
+def register_error_class(exc_type: Type[BaseException], error_class: str) -> None:
+    """Map ``exc_type`` (and subclasses) to ``error_class`` for classification."""
+    _registered[exc_type] = error_class
+
+
+def _http_status(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status
+
+
+def _rpc_error_class(exc: BaseException) -> str:
+    """
+    Retry RPC failures only when they are transport faults or rate limits.
+
+    Errors without a JSON-RPC code or HTTP status (dropped connections,
+    timeouts) and HTTP 429/5xx responses are retryable; JSON-RPC errors are
+    retried only for the codes in ``RATE_LIMIT_RPC_CODES``.
+    """
+    code = getattr(exc, "code", None)
+    if code is not None:
+        return RPC_ERROR if code in RATE_LIMIT_RPC_CODES else RPC_PERMANENT
+    status = _http_status(exc)
+    if status is not None and status != 429 and status < 500:
+        return RPC_PERMANENT
+    return RPC_ERROR
+
+
+def classify_error(exc: BaseException) -> str:
+    """Return the error class for ``exc``."""
+    error_class = _classify(exc)
+    return _rpc_error_class(exc) if error_class == RPC_ERROR else error_class
+
+
+def _classify(exc: BaseException) -> str:
+    for exc_type, error_class in _registered.items():
+        if isinstance(exc, exc_type):
+            return error_class
+    if isinstance(exc, ConfigurationError):
+        return CONFIG_ERROR
+    if isinstance(exc, EmptyResultError):
+        return EMPTY_TABLE
+    if isinstance(exc, WebDriverError):
+        return DRIVER_CRASH
+    if isinstance(exc, WebScrapingError):
+        return HTTP_ERROR
+    if isinstance(exc, RPCError):
+        return RPC_ERROR
+    # Third-party exceptions are matched by name to avoid importing their packages
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if "WebDriverException" in names:
+        return DRIVER_CRASH
+    if "RequestException" in names or isinstance(exc, (ConnectionError, TimeoutError)):
+        return HTTP_ERROR
+    return UNKNOWN
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter, bounded by attempts and a deadline.
+
+    The delay before retry ``n`` (1-based) is
+    ``min(max_delay, base_delay * multiplier ** (n - 1))`` reduced by a random
+    fraction of up to ``jitter``, so concurrent workers do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 6,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        deadline: Optional[float] = RETRY_DEADLINE,
+        retry_on: Iterable[str] = DEFAULT_RETRYABLE,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.deadline = deadline
+        self.retry_on = frozenset(retry_on)
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+
+    def delay_for(self, retry: int) -> float:
+        """Return the jittered delay before retry number ``retry`` (1-based)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return delay * (1.0 - self.jitter * self._rng())
+
+    def is_retryable(self, exc: BaseException) -> Tuple[bool, str]:
+        """Return whether ``exc`` should be retried and its error class."""
+        error_class = classify_error(exc)
+        if error_class not in self.retry_on:
+            return False, error_class
+        if error_class == HTTP_ERROR and _http_status(exc) in _PERMANENT_HTTP_STATUSES:
+            return False, error_class
+        return True, error_class
+
+    def call(self, func: Callable[..., Any], *args: Any, description: str = "", **kwargs: Any) -> Any:
+        """
+        Call ``func`` until it succeeds or the policy gives up.
+
+        Raises:
+            The last exception raised by ``func`` once attempts, deadline or
+            retryability are exhausted.
+        """
+        label = description or getattr(func, "__name__", "operation")
+        start = self._clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                retryable, error_class = self.is_retryable(exc)
+                if not retryable:
+                    logger.error(f"{label} failed with non-retryable {error_class}: {exc}")
+                    raise
+                if attempt >= self.max_attempts:
+                    logger.error(f"{label} failed after {attempt} attempts ({error_class}): {exc}")
+                    raise
+
+                delay = self.delay_for(attempt)
+                if self.deadline is not None and self._clock() - start + delay > self.deadline:
+                    logger.error(f"{label} retry deadline of {self.deadline:.0f}s exhausted ({error_class}): {exc}")
+                    raise
+
+                logger.warning(
+                    f"{label} attempt {attempt} failed ({error_class}): {exc}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                self._sleep(delay)
@@ -11,8 +11,18 @@ import re
 _PATTERN_KEY = "pattern" if parse_version(pydantic.version.VERSION).major >= 2 else "regex"
 
 
-class ProviderData(BaseModel):
-    """Schema for FTSO provider data."""
+_TAG_RE = re.compile(r'<\/?.*?>')
+_NAME_UNSAFE_RE = re.compile(r'[<>"\']')
+
+
+class TrustedProviderData(BaseModel):
+    """
+    Provider schema with field constraints only.
+
+    Used for trusted sources (on-chain RPC data and archives we wrote
+    ourselves) where the name sanitization of :class:`ProviderData` is not
+    needed.
+    """
     name: str = Field(..., min_length=1, max_length=100)
     vote_power: float = Field(..., ge=0.0, le=100.0)
 
@@ -26,15 +36,18 @@ class ProviderData(BaseModel):
         None, **{_PATTERN_KEY: r'^0x[a-fA-F0-9]{40}$'}
     )
 
-    
+
+class ProviderData(TrustedProviderData):
+    """Schema for FTSO provider data."""
+
     @validator('name')
     def validate_name(cls, v):
         """Sanitize provider name."""
         sanitized = v.strip()
         # Remove script tags and common XSS patterns
-        sanitized = re.sub(r'<\/?.*?>', '', sanitized)
+        sanitized = _TAG_RE.sub('', sanitized)
         sanitized = sanitized.replace('alert', '')
-        sanitized = re.sub(r'[<>"\']', '', sanitized)
+        sanitized = _NAME_UNSAFE_RE.sub('', sanitized)
         if not sanitized:
             raise ValueError('Provider name cannot be empty after sanitization')
         return sanitized
@@ -68,6 +81,7 @@ class SnapshotData(BaseModel):
     epoch: Optional[int] = Field(None, ge=0)
     providers: List[ProviderData] = Field(..., min_items=1)
     total_vote_power: Optional[float] = Field(None, ge=0.0)
+    source: Optional[str] = Field(None, max_length=32)
     
     @validator('providers')
     def validate_providers(cls, v):
@@ -83,6 +97,68 @@ class SnapshotData(BaseModel):
         return v
 
 
+class TrustedSnapshotData(SnapshotData):
+    """Snapshot schema for trusted sources; provider names are not sanitized."""
+    providers: List[TrustedProviderData] = Field(..., min_items=1)
+
+
+class LegacyProviderData(BaseModel):
+    """Provider row of an early current vote power file (percentages only)."""
+    name: str = Field(..., min_length=1, max_length=100)
+    vote_power_pct: Optional[float] = Field(None, ge=0.0, le=100.0)
+    # A few files stored the percentage under ``vote_power``
+    vote_power: Optional[float] = Field(None, ge=0.0, le=100.0)
+
+
+class LegacySnapshotData(BaseModel):
+    """
+    Schema for the current vote power files written before the RPC collector.
+
+    They carry an ISO timestamp (``2025-06-27T15:27:44.235398Z``), usually no
+    ``network`` key, and ``vote_power_pct`` per provider. A few collection
+    runs saved an empty provider list.
+    """
+    timestamp: str = Field(
+        ..., **{_PATTERN_KEY: r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z$'}
+    )
+    network: Optional[str] = Field(None, **{_PATTERN_KEY: r'^(flare|songbird)$'})
+    providers: List[LegacyProviderData]
+
+
+class DailyProviderData(BaseModel):
+    """Schema for one provider row of a daily flaremetrics snapshot."""
+    rank: str = Field(..., max_length=8)
+    name: str = Field(..., min_length=1, max_length=100)
+    vote_power: int = Field(..., ge=0)
+    vote_power_locked: int = Field(..., ge=0)
+    vote_power_pct: float = Field(..., ge=0.0, le=100.0)
+    vote_power_pct_locked: Optional[float] = Field(..., ge=0.0, le=100.0)
+    change_24h_pct: float
+    reward_rate: Optional[float] = Field(..., ge=0.0)
+    registered: str = Field(..., max_length=16)
+
+    @validator('vote_power_pct', 'vote_power_pct_locked', 'change_24h_pct', pre=True)
+    def strip_percent_sign(cls, v):
+        """Early daily snapshots stored percentages as strings such as ``"3.59%"``."""
+        if isinstance(v, str):
+            return v.strip().rstrip('%') or None
+        return v
+
+    @validator('reward_rate', pre=True)
+    def missing_reward_rate(cls, v):
+        """The scraped table shows ``.`` (or ``-``) for providers without a reward rate."""
+        if isinstance(v, str) and v.strip() in ('', '.', '-'):
+            return None
+        return v
+
+
+class DailySnapshotData(BaseModel):
+    """Schema for a daily snapshot file (``daily_snapshots/YYYY-MM/*.json``)."""
+    date: str = Field(..., **{_PATTERN_KEY: r'^\d{4}-\d{2}-\d{2}$'})
+    providers: List[DailyProviderData]
+    source: Optional[str] = Field(None, max_length=32)
+
+
 class QueryRequest(BaseModel):
     """Schema for LLM query requests."""
     query: str = Field(..., min_length=1, max_length=1000)
@@ -100,12 +176,13 @@ class QueryRequest(BaseModel):
         return sanitized
 
 
-def validate_snapshot_data(data: Dict[str, Any]) -> SnapshotData:
+def validate_snapshot_data(data: Dict[str, Any], trusted: bool = False) -> SnapshotData:
     """
     Validate raw scraped data against schema.
     
     Args:
         data: Raw scraped data dictionary
+        trusted: Skip provider name sanitization (on-chain RPC data)
         
     Returns:
         Validated SnapshotData instance
@@ -113,6 +190,8 @@ def validate_snapshot_data(data: Dict[str, Any]) -> SnapshotData:
     Raises:
         ValidationError: If data doesn't match schema
     """
+    if trusted:
+        return TrustedSnapshotData(**data)
     return SnapshotData(**data)
 
 
@@ -0,0 +1,239 @@
+"""
+Scraping strategies for the flaremetrics.io provider table.
+
+The cheapest strategy is tried first: a plain HTTP request for the page's
+underlying data (a JSON endpoint when configured, otherwise the server-side
+rendered HTML). Headless Chrome is only started when that yields nothing.
+"""
+from __future__ import annotations
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, List, Optional, Sequence
+
+import snapshot
+from exceptions import EmptyResultError, WebScrapingError
+
+if TYPE_CHECKING:  # requests is imported on first use to keep start-up fast
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON/XHR endpoint, e.g. "https://flaremetrics.io/api/providers?network={network}"
+FLAREMETRICS_JSON_URL: Optional[str] = os.getenv("FLAREMETRICS_JSON_URL")
+HTTP_TIMEOUT = float(os.getenv("FLAREMETRICS_HTTP_TIMEOUT", "15"))
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) flare-ftso-snapshot",
+    "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+}
+
+# Keys accepted from JSON payloads, mapped onto the scraped provider dict
+_JSON_KEYS = {
+    "rank": ("rank",),
+    "name": ("name", "providerName"),
+    "vote_power": ("vote_power", "votePower"),
+    "vote_power_locked": ("vote_power_locked", "votePowerLocked"),
+    "vote_power_pct": ("vote_power_pct", "votePowerPercentage", "votePowerPct"),
+    "vote_power_pct_locked": ("vote_power_pct_locked", "votePowerPercentageLocked"),
+    "change_24h_pct": ("change_24h_pct", "change24h"),
+    "reward_rate": ("reward_rate", "rewardRate"),
+    "registered": ("registered",),
+}
+
+
+@dataclass
+class ScrapeResult:
+    """Providers returned by a scrape and the strategy that produced them."""
+    network: str
+    providers: List[Dict[str, Any]]
+    strategy: str
+    elapsed: float
+    failures: Dict[str, str] = field(default_factory=dict)
+
+
+class ScrapeBackend:
+    """Base class for a provider table scraping strategy."""
+
+    name = "base"
+
+    def fetch(self, network: str) -> List[Dict[str, Any]]:
+        """Return the provider rows for ``network``; empty list when unavailable."""
+        raise NotImplementedError
+
+
+class HttpScrapeBackend(ScrapeBackend):
+    """Fetch provider data over plain HTTP without a browser."""
+
+    name = "http"
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = HTTP_TIMEOUT,
+        json_url: Optional[str] = FLAREMETRICS_JSON_URL,
+    ):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.session.headers.update(_HEADERS)
+        self.timeout = timeout
+        self.json_url = json_url
+
+    def fetch(self, network: str) -> List[Dict[str, Any]]:
+        import requests
+
+        if self.json_url:
+            try:
+                providers = self._fetch_json(network)
+                if providers:
+                    return providers
+            except (requests.RequestException, ValueError) as e:
+                logger.info(f"JSON endpoint unavailable for {network}: {e}")
+        return self._fetch_html(network)
+
+    def _fetch_json(self, network: str) -> List[Dict[str, Any]]:
+        url = self.json_url.format(network=network)
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        payload = resp.json()
+        if isinstance(payload, dict):
+            payload = payload.get("providers") or payload.get("data") or []
+        return [_provider_from_json(item) for item in payload if isinstance(item, dict)]
+
+    def _fetch_html(self, network: str) -> List[Dict[str, Any]]:
+        url = snapshot.flaremetrics_url(network)
+        resp = self.session.get(url, timeout=self.timeout)
+        if resp.status_code >= 400:
+            raise WebScrapingError(f"HTTP {resp.status_code} for {url}", url=url, status_code=resp.status_code)
+        return snapshot.parse_flaremetrics_html(resp.text)
+
+
+class SeleniumScrapeBackend(ScrapeBackend):
+    """Render the page in headless Chrome and parse the resulting table."""
+
+    name = "selenium"
+
+    def __init__(self, driver_factory: Optional[Callable[[], ContextManager[Any]]] = None):
+        self.driver_factory = driver_factory
+
+    def fetch(self, network: str) -> List[Dict[str, Any]]:
+        factory = self.driver_factory
+        if factory is None:
+            from webdriver_manager import get_webdriver
+            factory = get_webdriver
+        with factory() as driver:
+            return snapshot.scrape_flaremetrics(driver, network)
+
+
+def default_backends(driver_factory: Optional[Callable[[], ContextManager[Any]]] = None) -> List[ScrapeBackend]:
+    """Return the standard strategy chain: HTTP first, Selenium as fallback."""
+    return [HttpScrapeBackend(), SeleniumScrapeBackend(driver_factory)]
+
+
+class ScrapeHistory:
+    """Thread-safe record of which strategy served each scrape, per network."""
+
+    def __init__(self, max_entries: int = 100):
+        self.max_entries = max_entries
+        self._results: Dict[str, List[ScrapeResult]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, result: ScrapeResult) -> None:
+        with self._lock:
+            results = self._results.setdefault(result.network, [])
+            results.append(result)
+            del results[:-self.max_entries]
+
+    def last(self, network: str) -> Optional[ScrapeResult]:
+        with self._lock:
+            results = self._results.get(network)
+            return results[-1] if results else None
+
+    def strategy_counts(self) -> Dict[str, Dict[str, int]]:
+        """Return how many runs each strategy served, per network."""
+        with self._lock:
+            counts: Dict[str, Dict[str, int]] = {}
+            for network, results in self._results.items():
+                for r in results:
+                    counts.setdefault(network, {}).setdefault(r.strategy, 0)
+                    counts[network][r.strategy] += 1
+            return counts
+
+
+scrape_history = ScrapeHistory()
+
+
+def scrape_providers(network: str, backends: Optional[Sequence[ScrapeBackend]] = None) -> ScrapeResult:
+    """
+    Scrape providers for ``network`` using the first strategy that returns rows.
+
+    Args:
+        network: 'flare' or 'songbird'
+        backends: Strategies to try in order (defaults to :func:`default_backends`)
+
+    Returns:
+        ScrapeResult with the providers and the strategy that served them
+
+    Raises:
+        EmptyResultError: If every strategy returned an empty table
+        WebScrapingError: If every strategy failed
+    """
+    if backends is None:
+        backends = default_backends()
+
+    start = time.monotonic()
+    failures: Dict[str, str] = {}
+    for backend in backends:
+        try:
+            providers = backend.fetch(network)
+        except Exception as e:
+            failures[backend.name] = str(e)
+            logger.warning(f"{backend.name} strategy failed for {network}: {e}")
+            continue
+        if providers:
+            result = ScrapeResult(
+                network=network,
+                providers=providers,
+                strategy=backend.name,
+                elapsed=time.monotonic() - start,
+                failures=failures,
+            )
+            scrape_history.record(result)
+            logger.info(
+                f"Scraped {len(providers)} {network} providers via {backend.name} "
+                f"in {result.elapsed:.2f}s"
+            )
+            return result
+        failures[backend.name] = "no rows"
+        logger.info(f"{backend.name} strategy returned no rows for {network}")
+
+    detail = ", ".join(f"{k}: {v}" for k, v in failures.items())
+    if all(v == "no rows" for v in failures.values()):
+        raise EmptyResultError(f"No provider rows for {network} ({detail})")
+    raise WebScrapingError(f"All scraping strategies failed for {network} ({detail})")
+
+
+def _provider_from_json(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a JSON provider record onto the scraped provider dict layout."""
+    out: Dict[str, Any] = {}
+    for key, aliases in _JSON_KEYS.items():
+        for alias in aliases:
+            if alias in item:
+                out[key] = item[alias]
+                break
+    out.setdefault("rank", "")
+    out.setdefault("name", "")
+    out.setdefault("vote_power", 0)
+    out.setdefault("vote_power_locked", out["vote_power"])
+    out.setdefault("vote_power_pct", 0.0)
+    out.setdefault("vote_power_pct_locked", 0.0)
+    out.setdefault("change_24h_pct", 0.0)
+    out.setdefault("reward_rate", 0.0)
+    out.setdefault("registered", "")
+    out["rank"] = str(out["rank"])
+    return out
@@ -0,0 +1,125 @@
+"""
+Precomputed views of the snapshot archive for the REST endpoints.
+
+Aggregates are built once per published :class:`SnapshotView` (i.e. on
+ingest), so a request is a dictionary lookup plus, at most once per data
+version, a JSON encoding. Provider names are matched case-insensitively.
+"""
+from __future__ import annotations
+
+import bisect
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from epoch_calendar import EpochCalendar
+from snapshot_index import snapshot_epoch
+from snapshot_repository import SnapshotFile, SnapshotView
+
+SERIES_FIELDS = ("rank", "vote_power", "vote_power_pct", "reward_rate", "registered")
+
+
+def provider_key(name: str) -> str:
+    """Normalised provider name used for lookups."""
+    return " ".join(name.split()).lower()
+
+
+class SnapshotAggregates:
+    """
+    Per-provider series, latest snapshots and epoch/date lookups for one view.
+
+    Args:
+        view: Snapshots to aggregate
+        calendar: Used to label snapshots with their reward epoch
+    """
+
+    def __init__(self, view: SnapshotView, calendar: Optional[EpochCalendar] = None):
+        self.version = view.version
+        # network -> provider key -> [point, ...] ordered by date
+        self.series: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        self.names: Dict[str, str] = {}  # provider key -> display name
+        # network -> dates and snapshots in date order
+        self.dates: Dict[str, List[str]] = defaultdict(list)
+        self.snapshots: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.epochs: Dict[int, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+
+        for snapshot in sorted(view, key=lambda f: (f.date, f.path)):
+            self._add(snapshot, calendar)
+
+    def _add(self, snapshot: SnapshotFile, calendar: Optional[EpochCalendar]) -> None:
+        date = snapshot.date
+        epoch = snapshot_epoch(calendar, date) if calendar else None
+        providers = [p for p in snapshot.data.get("providers", []) if isinstance(p, dict)]
+        summary = {"network": snapshot.network, "date": date, "epoch": epoch, "providers": providers}
+
+        network = snapshot.network
+        if self.dates[network] and self.dates[network][-1] == date:
+            # Two files for the same day: the later path wins
+            self.snapshots[network][-1] = summary
+        else:
+            self.dates[network].append(date)
+            self.snapshots[network].append(summary)
+        if epoch is not None:
+            self.epochs[epoch][network] = summary
+
+        for provider in providers:
+            name = str(provider.get("name", ""))
+            if not name:
+                continue
+            key = provider_key(name)
+            self.names.setdefault(key, name)
+            point = {"date": date, "epoch": epoch}
+            point.update((field, provider.get(field)) for field in SERIES_FIELDS if field in provider)
+            points = self.series[network][key]
+            if points and points[-1]["date"] == date:
+                points[-1] = point
+            else:
+                points.append(point)
+
+    @property
+    def networks(self) -> List[str]:
+        return sorted(self.dates)
+
+    def latest(self, network: str) -> Optional[Dict[str, Any]]:
+        """Return the newest snapshot of ``network``."""
+        snapshots = self.snapshots.get(network)
+        return snapshots[-1] if snapshots else None
+
+    def at(self, network: str, when: str) -> Optional[Dict[str, Any]]:
+        """Return the newest snapshot of ``network`` taken on or before ``when``."""
+        dates = self.dates.get(network, [])
+        # Dates are ISO strings; "~" sorts after any time-of-day suffix
+        index = bisect.bisect_right(dates, when + "~") - 1
+        return self.snapshots[network][index] if index >= 0 else None
+
+    def epoch(self, epoch: int) -> Dict[str, Dict[str, Any]]:
+        """Return the snapshot of each network taken for ``epoch``."""
+        return self.epochs.get(epoch, {})
+
+    def provider_series(
+        self, name: str, network: Optional[str] = None, days: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the history of provider ``name`` per network.
+
+        Args:
+            name: Provider display name (case-insensitive)
+            network: Restrict to one network
+            days: Only points within this many days of the newest snapshot
+
+        Returns:
+            ``{network: [point, ...]}``; empty if the provider is unknown
+        """
+        key = provider_key(name)
+        networks = [network] if network else self.networks
+        result = {}
+        for net in networks:
+            points = self.series.get(net, {}).get(key)
+            if not points:
+                continue
+            if days is not None and self.dates.get(net):
+                newest = datetime.date.fromisoformat(self.dates[net][-1][:10])
+                cutoff = (newest - datetime.timedelta(days=days)).isoformat()
+                points = points[bisect.bisect_left([p["date"] for p in points], cutoff):]
+            result[net] = points
+        return result
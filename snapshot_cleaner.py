@@ -0,0 +1,233 @@
+"""
+Incremental removal of snapshots that do not fall on an epoch start date.
+
+A small state file records the schedule used for the last run, a digest of
+the file names in every directory and the files that were already classified
+as relevant. Later runs only classify files in directories whose listing
+changed and only files not seen before; the whole tree is re-examined when
+the schedule changes. Manifest entries are checked on disk only when the state
+does not already vouch for them.
+
+The state depends only on file names, never on modification times, so it stays
+valid on a fresh checkout. It is kept under ``CLEAN_STATE_DIR`` (``.cache/``
+by default), outside the snapshot and published trees.
+"""
+from __future__ import annotations
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from epoch_calendar import EpochCalendar
+from file_utils import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = os.getenv("CLEAN_STATE_DIR", os.path.join(".cache", "clean_state"))
+STATE_VERSION = 2
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def default_state_path(snapshot_dir: str) -> str:
+    """State file used for ``snapshot_dir`` when none is given."""
+    name = re.sub(r"[^\w.-]+", "_", os.path.normpath(snapshot_dir).strip(os.sep)) or "root"
+    return os.path.join(STATE_DIR, f"{name}.json")
+
+
+class CleanState:
+    """Persistent record of what the cleaner has already examined."""
+
+    def __init__(self, schedule: str = "", dirs: Optional[Dict[str, str]] = None, kept: Iterable[str] = ()):
+        self.schedule = schedule
+        self.dirs: Dict[str, str] = dict(dirs or {})
+        self.kept: Set[str] = set(kept)
+
+    @classmethod
+    def load(cls, path: str) -> "CleanState":
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                return cls()
+            return cls(data.get("schedule", ""), data.get("dirs"), data.get("kept", ()))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_json_atomic(path, {
+            "version": STATE_VERSION,
+            "schedule": self.schedule,
+            "dirs": dict(sorted(self.dirs.items())),
+            "kept": sorted(self.kept),
+        })
+
+
+def _listing_digest(names: Iterable[str]) -> str:
+    return hashlib.sha1("\n".join(sorted(names)).encode()).hexdigest()
+
+
+def _changed_dirs(
+    snapshot_dir: str, state: CleanState, full: bool
+) -> Tuple[Dict[str, str], Dict[str, Set[str]]]:
+    """
+    Return the listing digest of every directory and the file names of the
+    directories whose listing changed since the state was saved.
+    """
+    digests: Dict[str, str] = {}
+    changed: Dict[str, Set[str]] = {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        path = os.path.join(snapshot_dir, rel) if rel else snapshot_dir
+        names: Set[str] = set()
+        for entry in os.scandir(path):
+            if entry.is_dir():
+                stack.append(os.path.join(rel, entry.name) if rel else entry.name)
+            elif entry.is_file():
+                names.add(entry.name)
+        digests[rel] = _listing_digest(names)
+        if full or state.dirs.get(rel) != digests[rel]:
+            changed[rel] = names
+    return digests, changed
+
+
+def clean_snapshot_dir(
+    calendar: EpochCalendar,
+    snapshot_dir: str = "daily_snapshots",
+    docs_dir: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+    network: Optional[str] = None,
+    state_path: Optional[str] = None,
+    verbose: bool = False,
+) -> List[str]:
+    """
+    Delete snapshots that aren't on an epoch start date and update docs/manifest.
+
+    Args:
+        calendar: Epoch calendar deciding which dates are relevant
+        snapshot_dir: Directory holding ``*_YYYY-MM-DD.json`` snapshots
+        docs_dir: Mirror directory whose copies are deleted too
+        manifest_path: Manifest listing files of ``docs_dir`` per network
+        network: Manifest key to prune
+        state_path: Where to keep the incremental state (see
+            :func:`default_state_path`)
+        verbose: Also report snapshots that are kept
+
+    Returns:
+        Relative paths of the snapshots that were deleted
+    """
+    if not os.path.exists(snapshot_dir):
+        print(f"Snapshot directory '{snapshot_dir}' does not exist.")
+        return []
+
+    if docs_dir is None:
+        docs_dir = os.path.join("docs", "daily_snapshots")
+    if manifest_path is None:
+        manifest_path = os.path.join(docs_dir, "manifest.json")
+    if state_path is None:
+        state_path = default_state_path(snapshot_dir)
+
+    state = CleanState.load(state_path)
+    fingerprint = calendar.fingerprint()
+    full = state.schedule != fingerprint
+    if full:
+        state = CleanState(fingerprint)
+
+    digests, changed = _changed_dirs(snapshot_dir, state, full)
+    # Directories that vanished take their kept files with them
+    state.kept = {k for k in state.kept if os.path.dirname(k) in digests}
+
+    deleted: List[str] = []
+    examined = 0
+    for rel_dir, names in changed.items():
+        path = os.path.join(snapshot_dir, rel_dir) if rel_dir else snapshot_dir
+        prefix = rel_dir + os.sep if rel_dir else ""
+        # Forget kept files that disappeared from this directory
+        state.kept = {
+            k for k in state.kept
+            if os.path.dirname(k) != rel_dir or os.path.basename(k) in names
+        }
+        for filename in sorted(names):
+            if filename == "manifest.json" or not filename.endswith(".json"):
+                continue
+            if not _DATE_RE.search(filename):
+                continue
+            rel_path = prefix + filename
+            if rel_path in state.kept:
+                continue
+            examined += 1
+            snapshot_date = filename.split("_")[-1].replace(".json", "")
+            try:
+                if calendar.is_start_date(snapshot_date):
+                    state.kept.add(rel_path)
+                    if verbose:
+                        print(f"Snapshot is relevant: {filename}")
+                    continue
+                file_path = os.path.join(path, filename)
+                os.remove(file_path)
+                print(f"Deleted irrelevant snapshot: {file_path}")
+                deleted.append(rel_path)
+
+                doc_file = os.path.join(docs_dir, rel_path)
+                if os.path.exists(doc_file):
+                    os.remove(doc_file)
+            except Exception as e:
+                print(f"Error processing file '{filename}': {e}")
+
+    _update_manifest(manifest_path, docs_dir, network, deleted, state.kept)
+
+    # Deleting files changed the listings recorded above
+    for rel_dir in {os.path.dirname(p) for p in deleted}:
+        gone = {os.path.basename(p) for p in deleted if os.path.dirname(p) == rel_dir}
+        digests[rel_dir] = _listing_digest(changed[rel_dir] - gone)
+    state.dirs = digests
+    try:
+        state.save(state_path)
+    except OSError as e:
+        logger.warning(f"Could not save cleaner state {state_path}: {e}")
+
+    logger.info(
+        f"Cleaned {snapshot_dir}: {len(changed)} of {len(digests)} directories changed, "
+        f"{examined} new files examined, {len(deleted)} deleted ({'full' if full else 'incremental'})"
+    )
+    return deleted
+
+
+def _update_manifest(
+    manifest_path: str,
+    docs_dir: str,
+    network: Optional[str],
+    deleted: List[str],
+    kept: Set[str],
+) -> None:
+    """Drop deleted and missing files from the manifest, touching disk sparingly."""
+    manifest = {"flare": [], "songbird": []}
+    exists = os.path.exists(manifest_path)
+    if exists:
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except Exception:
+            pass
+
+    changed = not exists
+    if network:
+        removed = set(deleted)
+        entries = manifest.get(network, [])
+        # Entries for snapshots the state knows are kept are not stat'ed
+        pruned = [
+            entry for entry in entries
+            if entry not in removed
+            and (entry in kept or os.path.exists(os.path.join(docs_dir, entry)))
+        ]
+        if pruned != entries:
+            manifest[network] = pruned
+            changed = True
+
+    if changed:
+        write_json_atomic(manifest_path, manifest)
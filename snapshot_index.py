@@ -0,0 +1,215 @@
+"""
+Retrieval over snapshot rows for the LLM query endpoint.
+
+Every provider entry of every snapshot becomes a row. An inverted index maps
+tokens (provider name words, network, date, month, year and ``epoch:N``) to
+row ids, so a question only touches the rows that share terms with it. The
+selected rows are packed into a compact pipe-separated table that fits the
+character budget, instead of sending the first characters of the raw JSON.
+
+Questions that name no date or epoch are answered from the latest snapshot
+of each network; questions that name no provider get the top-ranked rows.
+"""
+from __future__ import annotations
+
+import re
+import math
+import datetime
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from epoch_calendar import EpochCalendar, parse_timestamp
+from snapshot_repository import SnapshotView
+
+NETWORKS = ("flare", "songbird")
+COLUMNS = (
+    "rank", "name", "vote_power", "vote_power_pct", "reward_rate",
+    "fee", "availability", "registered",
+)
+
+_TOKEN_RE = re.compile(r"\d{4}-\d{2}-\d{2}|\d{4}-\d{2}|[a-z0-9]+(?:[.'][a-z0-9]+)*")
+_DATE_TOKEN_RE = re.compile(r"\d{4}(?:-\d{2}){0,2}")
+_EPOCH_RE = re.compile(r"\bepoch\s*#?\s*(\d+)")
+_STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it its me "
+    "of on or show tell than that the their this to was what when which who "
+    "with provider providers vote power ftso data dataset snapshot".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word, date and month tokens of ``text`` without stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _name_tokens(name: str) -> Set[str]:
+    """Tokens of a provider name, with dotted names also split ("flare.space")."""
+    tokens = set(tokenize(name))
+    for token in list(tokens):
+        tokens.update(part for part in re.split(r"[.']", token) if part)
+    return tokens
+
+
+@dataclass(frozen=True)
+class Row:
+    """One provider entry of one snapshot."""
+    snapshot: int  # position of the snapshot in the view
+    network: str
+    date: str
+    epoch: Optional[int]
+    provider: Dict[str, Any]
+
+    @property
+    def rank(self) -> int:
+        try:
+            return int(self.provider.get("rank", 0))
+        except (TypeError, ValueError):
+            return 0
+
+
+def snapshot_epoch(calendar: EpochCalendar, date: str) -> Optional[int]:
+    """Epoch started on (or running at) the snapshot ``date``."""
+    when = parse_timestamp(date)
+    if when is None:
+        return None
+    if len(date) == 10:
+        # Daily snapshots are dated by the day the epoch started
+        when += datetime.timedelta(days=1, seconds=-1)
+    return calendar.epoch_at(when)
+
+
+class SnapshotIndex:
+    """
+    Inverted index over the rows of one :class:`SnapshotView`.
+
+    Args:
+        view: Snapshots to index
+        calendar: Used to label snapshots with their reward epoch
+    """
+
+    def __init__(self, view: SnapshotView, calendar: Optional[EpochCalendar] = None):
+        self.version = view.version
+        self.rows: List[Row] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        # Row ids per snapshot, and the latest snapshot per network
+        self.snapshot_rows: Dict[int, List[int]] = defaultdict(list)
+        self.latest: Dict[str, int] = {}
+        latest_dates: Dict[str, str] = {}
+
+        for position, snapshot in enumerate(view):
+            date = snapshot.date
+            epoch = snapshot_epoch(calendar, date) if calendar else None
+            snapshot_tokens = {snapshot.network, date[:10], date[:7], date[:4]}
+            if epoch is not None:
+                snapshot_tokens.add(f"epoch:{epoch}")
+            if date >= latest_dates.get(snapshot.network, ""):
+                latest_dates[snapshot.network] = date
+                self.latest[snapshot.network] = position
+
+            for provider in snapshot.data.get("providers", []):
+                if not isinstance(provider, dict):
+                    continue
+                row_id = len(self.rows)
+                self.rows.append(Row(position, snapshot.network, date, epoch, provider))
+                self.snapshot_rows[position].append(row_id)
+                for token in snapshot_tokens:
+                    self.postings[token].add(row_id)
+                for token in _name_tokens(str(provider.get("name", ""))):
+                    self.postings[f"name:{token}"].add(row_id)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _idf(self, key: str) -> float:
+        return math.log(1 + len(self.rows) / (1 + len(self.postings.get(key, ()))))
+
+    def search(self, question: str, limit: int = 50) -> List[Row]:
+        """
+        Return up to ``limit`` rows relevant to ``question``, best first.
+
+        Network, date, month, year and epoch terms restrict which snapshots
+        are searched; the remaining terms are matched against provider names
+        and scored by inverse document frequency.
+        """
+        text = question.lower()
+        tokens = tokenize(text)
+        scope_terms = [
+            [t for t in tokens if t in NETWORKS],
+            [f"epoch:{n}" for n in _EPOCH_RE.findall(text)],
+            [t for t in tokens if _DATE_TOKEN_RE.fullmatch(t) and t in self.postings],
+        ]
+        # Network names double as provider name words ("Flare Dienst"); treat them as scope only
+        name_terms = [
+            f"name:{t}" for t in tokens if t not in NETWORKS and f"name:{t}" in self.postings
+        ]
+
+        # Narrow the candidate snapshots: every scope kind that is present must match
+        candidates: Optional[Set[int]] = None
+        for terms in scope_terms:
+            if not terms:
+                continue
+            matched = set().union(*(self.postings.get(t, set()) for t in terms))
+            candidates = matched if candidates is None else candidates & matched
+        if not any(scope_terms[1:]):
+            # No date or epoch in the question: answer from the latest data
+            networks = scope_terms[0] or list(self.latest)
+            latest = set()
+            for network in networks:
+                if network in self.latest:
+                    latest.update(self.snapshot_rows[self.latest[network]])
+            candidates = latest if candidates is None else candidates & latest
+        if candidates is None:
+            candidates = set(range(len(self.rows)))
+
+        if name_terms:
+            scores: Dict[int, float] = defaultdict(float)
+            for term in name_terms:
+                weight = self._idf(term)
+                for row_id in self.postings[term] & candidates:
+                    scores[row_id] += weight
+            if scores:
+                return self._top(scores, lambda r: (-scores[r], self.rows[r].rank or math.inf), limit)
+
+        return self._top(candidates, lambda r: self.rows[r].rank or math.inf, limit)
+
+    def _top(self, row_ids: Iterable[int], key, limit: int) -> List[Row]:
+        """Sort ``row_ids`` by ``key``, newest snapshot first among equals."""
+        newest_first = sorted(row_ids, key=lambda r: self.rows[r].date, reverse=True)
+        return [self.rows[r] for r in sorted(newest_first, key=key)[:limit]]
+
+
+def pack_context(rows: Iterable[Row], budget: int) -> str:
+    """
+    Format ``rows`` as a pipe-separated table of at most ``budget`` characters.
+
+    Only columns present in the selected rows are emitted. Rows that do not
+    fit are dropped whole rather than truncated.
+    """
+    rows = list(rows)
+    if not rows:
+        return "No matching snapshot data"
+    columns = [c for c in COLUMNS if any(c in row.provider for row in rows)]
+    with_epoch = any(row.epoch is not None for row in rows)
+    header = ["network", "date"] + (["epoch"] if with_epoch else []) + columns
+    lines = ["|".join(header)]
+    used = len(lines[0])
+    for row in rows:
+        values = [row.network, row.date[:10]]
+        if with_epoch:
+            values.append("" if row.epoch is None else str(row.epoch))
+        values.extend(_cell(row.provider.get(c)) for c in columns)
+        line = "|".join(values)
+        if used + 1 + len(line) > budget:
+            break
+        lines.append(line)
+        used += 1 + len(line)
+    return "\n".join(lines)[:budget]
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("|", "/")
@@ -0,0 +1,201 @@
+"""
+In-memory snapshot store for the query server.
+
+Snapshots are loaded on first use rather than at import time. A background
+watcher polls the data directories' modification times and ingests only new
+or changed files. Each reload builds a fresh :class:`SnapshotView` and
+publishes it with a single reference swap, so readers always see a
+complete, consistent view and never wait for a reload in progress.
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIRS = tuple(
+    d.strip() for d in os.getenv("QUERY_SNAPSHOT_DIRS", "docs/daily_snapshots").split(",") if d.strip()
+)
+POLL_INTERVAL = float(os.getenv("SNAPSHOT_POLL_INTERVAL", "30"))  # seconds
+
+
+@dataclass(frozen=True)
+class SnapshotFile:
+    """One loaded snapshot file."""
+    path: str  # relative to its data directory, e.g. 2025-06/flare_snapshot_2025-06-01.json
+    network: str  # filename prefix (flare, songbird)
+    data: Dict[str, Any]
+
+    @property
+    def date(self) -> str:
+        """Snapshot date (or timestamp) from the file contents."""
+        return str(self.data.get("date") or self.data.get("timestamp") or "")
+
+
+@dataclass(frozen=True)
+class SnapshotView:
+    """
+    Immutable set of snapshots published by the repository.
+
+    ``version`` increases with every published change, so it can be used as
+    a cache key for anything derived from the data. The snapshot dicts are
+    shared between views and must be treated as read-only.
+    """
+    files: Tuple[SnapshotFile, ...] = ()
+    version: int = 0
+    loaded_at: float = 0.0
+
+    @property
+    def snapshots(self) -> List[Dict[str, Any]]:
+        return [f.data for f in self.files]
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __iter__(self) -> Iterator[SnapshotFile]:
+        return iter(self.files)
+
+
+def _iter_json_files(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield ``(path, stat)`` for snapshot JSON files below ``root``."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f"Cannot list snapshot directory {directory}: {e}")
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                stack.append(entry.path)
+            elif entry.name.endswith(".json") and entry.name != "manifest.json":
+                yield entry.path, entry.stat()
+
+
+class SnapshotRepository:
+    """
+    Lazily loaded, hot-reloadable snapshot store.
+
+    Args:
+        directories: Data directories, searched recursively (monthly subfolders
+            included)
+        poll_interval: Seconds between modification checks of the watcher
+    """
+
+    def __init__(self, directories: Sequence[str] = SNAPSHOT_DIRS, poll_interval: float = POLL_INTERVAL):
+        self.directories = tuple(directories)
+        self.poll_interval = poll_interval
+        self._view: Optional[SnapshotView] = None
+        self._loaded: Dict[str, Tuple[Tuple[int, int], SnapshotFile]] = {}
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._subscribers: List[Callable[[SnapshotView], Any]] = []
+
+    def view(self) -> SnapshotView:
+        """Return the current view, loading the data on first call."""
+        view = self._view
+        if view is None:
+            self.refresh()
+            view = self._view
+        return view
+
+    def subscribe(self, callback: Callable[[SnapshotView], Any]) -> None:
+        """Call ``callback(view)`` after each new view is published (on ingest)."""
+        self._subscribers.append(callback)
+
+    @property
+    def version(self) -> int:
+        view = self._view
+        return view.version if view is not None else 0
+
+    def refresh(self) -> bool:
+        """
+        Ingest new, changed and removed files; return True if a view was published.
+
+        Files whose size and mtime are unchanged are not read again. Refreshes
+        are serialised, but readers keep using the previous view meanwhile.
+        """
+        with self._refresh_lock:
+            seen: Dict[str, Tuple[int, int]] = {}
+            added: Dict[str, Tuple[Tuple[int, int], SnapshotFile]] = {}
+            for directory in self.directories:
+                for path, stat in _iter_json_files(directory):
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    seen[path] = signature
+                    previous = self._loaded.get(path)
+                    if previous is not None and previous[0] == signature:
+                        continue
+                    loaded = self._load_file(directory, path)
+                    if loaded is not None:
+                        added[path] = (signature, loaded)
+
+            removed = [path for path in self._loaded if path not in seen]
+            if self._view is not None and not added and not removed:
+                return False
+
+            for path in removed:
+                del self._loaded[path]
+            self._loaded.update(added)
+            files = tuple(entry for _, entry in sorted(
+                self._loaded.values(), key=lambda item: (item[1].date, item[1].network, item[1].path)
+            ))
+            self._view = SnapshotView(files, self.version + 1, time.time())
+            logger.info(
+                f"Snapshot view v{self._view.version}: {len(files)} files "
+                f"({len(added)} loaded, {len(removed)} removed)"
+            )
+            view = self._view
+        for callback in self._subscribers:
+            try:
+                callback(view)
+            except Exception as e:
+                logger.error(f"Snapshot subscriber failed: {e}")
+        return True
+
+    @staticmethod
+    def _load_file(directory: str, path: str) -> Optional[SnapshotFile]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # A file that is still being written is picked up on the next poll
+            logger.error(f"Error loading snapshot file {path}: {e}")
+            return None
+        if not isinstance(data, dict):
+            logger.error(f"Unexpected snapshot format in {path}")
+            return None
+        rel_path = os.path.relpath(path, directory)
+        network = os.path.basename(path).split("_", 1)[0]
+        return SnapshotFile(rel_path, network, data)
+
+    # --- Watching ---
+
+    def watch(self) -> None:
+        """Poll for changes until :meth:`stop` is called."""
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Snapshot refresh failed: {e}")
+
+    def start(self) -> None:
+        """Load the data and start the background watcher (idempotent)."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self.view()
+        self._watcher = threading.Thread(target=self.watch, name="snapshot-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
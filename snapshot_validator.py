@@ -0,0 +1,262 @@
+"""
+Bulk validation of snapshot archives.
+
+Schemas are compiled into pydantic ``TypeAdapter`` objects once per process
+and files are validated straight from their raw bytes (no intermediate
+``json.load``). Large archives are split into chunks and validated in a
+process pool; results are streamed back as chunks finish and collected into
+a machine-readable report.
+
+Usage:
+    python snapshot_validator.py [paths ...] [--workers N] [--trusted] [--json report.json]
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from pydantic import ValidationError
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pragma: no cover - pydantic v1
+    TypeAdapter = None
+
+import schemas
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = ("daily_snapshots", "current_vote_power", "historical_snapshots")
+CHUNK_SIZE = int(os.getenv("VALIDATOR_CHUNK_SIZE", "200"))  # files per worker task
+
+# Snapshot kinds, detected from top-level keys
+CURRENT = "current"  # timestamp/network/providers (current vote power, historical)
+LEGACY = "legacy"    # ISO timestamp/providers with vote_power_pct (early current vote power)
+DAILY = "daily"      # date/providers (daily flaremetrics snapshot)
+
+_MODELS = {
+    (CURRENT, False): schemas.SnapshotData,
+    (CURRENT, True): schemas.TrustedSnapshotData,
+    (LEGACY, False): schemas.LegacySnapshotData,
+    (LEGACY, True): schemas.LegacySnapshotData,
+    (DAILY, False): schemas.DailySnapshotData,
+    (DAILY, True): schemas.DailySnapshotData,
+}
+
+_TIMESTAMP_RE = re.compile(rb'"timestamp"\s*:\s*"([^"]*)"')
+
+# Compiled validators, built on first use in each (worker) process
+_adapters: Dict[tuple, Any] = {}
+
+
+@dataclass
+class FileResult:
+    """Validation outcome for one file."""
+    path: str
+    kind: Optional[str]
+    ok: bool
+    providers: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    empty: bool = False
+
+
+@dataclass
+class ValidationReport:
+    """Summary of a bulk validation run."""
+    files: int = 0
+    valid: int = 0
+    invalid: int = 0
+    empty: int = 0
+    providers: int = 0
+    elapsed: float = 0.0
+    trusted: bool = False
+    failures: List[FileResult] = field(default_factory=list)
+    empty_files: List[str] = field(default_factory=list)
+
+    def add(self, result: FileResult) -> None:
+        self.files += 1
+        self.providers += result.providers
+        if result.empty:
+            # Left behind by interrupted early collection runs; nothing to validate
+            self.empty += 1
+            self.empty_files.append(result.path)
+        elif result.ok:
+            self.valid += 1
+        else:
+            self.invalid += 1
+            self.failures.append(result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def get_adapter(kind: str, trusted: bool = False):
+    """Return the compiled validator for ``kind`` (cached per process)."""
+    key = (kind, trusted)
+    adapter = _adapters.get(key)
+    if adapter is None:
+        model = _MODELS[key]
+        adapter = TypeAdapter(model) if TypeAdapter is not None else model
+        _adapters[key] = adapter
+    return adapter
+
+
+def detect_kind(raw: bytes) -> Optional[str]:
+    """Guess the snapshot kind from the first top-level keys in ``raw``."""
+    head = raw[:256]
+    match = _TIMESTAMP_RE.search(head)
+    if match:
+        # Early files used ISO timestamps (with colons) and had no network key
+        if b":" in match.group(1) or b'"network"' not in head:
+            return LEGACY
+        return CURRENT
+    if b'"date"' in head:
+        return DAILY
+    return None
+
+
+def _error_list(exc: Exception) -> List[Dict[str, Any]]:
+    if isinstance(exc, ValidationError):
+        return [
+            {"loc": ".".join(str(part) for part in err.get("loc", ())), "msg": err.get("msg", "")}
+            for err in exc.errors()
+        ]
+    return [{"loc": "", "msg": str(exc)}]
+
+
+def validate_bytes(raw: bytes, path: str = "", trusted: bool = False) -> FileResult:
+    """Validate one snapshot given its raw JSON bytes."""
+    if not raw.strip():
+        return FileResult(path, None, False, empty=True)
+    kind = detect_kind(raw)
+    if kind is None:
+        return FileResult(path, None, False, errors=[{"loc": "", "msg": "unrecognised snapshot format"}])
+    adapter = get_adapter(kind, trusted)
+    try:
+        if TypeAdapter is not None:
+            snapshot = adapter.validate_json(raw)
+        else:  # pragma: no cover - pydantic v1
+            snapshot = adapter.parse_raw(raw)
+    except Exception as e:
+        return FileResult(path, kind, False, errors=_error_list(e))
+    return FileResult(path, kind, True, providers=len(snapshot.providers))
+
+
+def validate_file(path: str, trusted: bool = False) -> FileResult:
+    """Validate the snapshot stored at ``path``."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        return FileResult(path, None, False, errors=[{"loc": "", "msg": str(e)}])
+    return validate_bytes(raw, path, trusted)
+
+
+def _validate_chunk(paths: Sequence[str], trusted: bool) -> List[FileResult]:
+    return [validate_file(path, trusted) for path in paths]
+
+
+def iter_snapshot_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield snapshot JSON files under ``paths`` (files or directories)."""
+    for root in paths:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, _, files in os.walk(root):
+            for filename in sorted(files):
+                # Skip the manifest and hidden bookkeeping files such as the cleaner state
+                if filename.endswith(".json") and filename != "manifest.json" and not filename.startswith("."):
+                    yield os.path.join(dirpath, filename)
+
+
+def iter_validate(
+    files: Sequence[str],
+    workers: Optional[int] = None,
+    trusted: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[FileResult]:
+    """
+    Validate ``files`` and yield results as they become available.
+
+    Args:
+        files: Snapshot paths
+        workers: Worker processes; 1 validates in-process, None uses all CPUs
+        trusted: Use the fast path without provider name sanitization
+        chunk_size: Files per worker task
+
+    Yields:
+        A :class:`FileResult` per file, in completion order
+    """
+    chunk_size = max(1, chunk_size)
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(chunks))
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _validate_chunk(chunk, trusted)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_validate_chunk, chunk, trusted) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def validate_archive(
+    paths: Iterable[str] = DEFAULT_PATHS,
+    workers: Optional[int] = None,
+    trusted: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> ValidationReport:
+    """Validate every snapshot under ``paths`` and return a report."""
+    start = time.perf_counter()
+    files = list(iter_snapshot_files(paths))
+    report = ValidationReport(trusted=trusted)
+    for result in iter_validate(files, workers=workers, trusted=trusted, chunk_size=chunk_size):
+        report.add(result)
+    report.failures.sort(key=lambda r: r.path)
+    report.empty_files.sort()
+    report.elapsed = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate snapshot archives against the data schemas.")
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_PATHS), help="Files or directories")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--trusted", action="store_true", help="Skip provider name sanitization")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    report = validate_archive(args.paths, workers=args.workers, trusted=args.trusted)
+
+    if args.json == "-":
+        json.dump(report.to_dict(), sys.stdout, indent=2)
+        print()
+    else:
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report.to_dict(), f, indent=2)
+        for path in report.empty_files:
+            print(f"EMPTY {path}")
+        for failure in report.failures:
+            first = failure.errors[0] if failure.errors else {"loc": "", "msg": ""}
+            print(f"INVALID {failure.path}: {first['loc']} {first['msg']}".rstrip())
+        print(
+            f"{report.files} files, {report.valid} valid, {report.invalid} invalid, "
+            f"{report.empty} empty, {report.providers} providers in {report.elapsed:.2f}s"
+        )
+    return 1 if report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
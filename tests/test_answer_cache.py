@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from answer_cache import AnswerCache, normalize_question
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_questions_share_an_entry():
+    assert normalize_question("Who has the MOST vote power?") == normalize_question("who has  the most vote-power")
+    cache = AnswerCache()
+    cache.put(cache.key("Who has the most vote power?", 1), "Bifrost", cost=2.0)
+    assert cache.get(cache.key("  who has the most vote power ", 1)) == "Bifrost"
+    # A new data version never matches earlier answers
+    assert cache.get(cache.key("who has the most vote power", 2)) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_seconds"]) == (1, 1, 2.0)
+
+
+def test_different_questions_do_not_collide():
+    questions = [
+        "Which providers are on flare?",
+        "Who has the most vote power on flare?",
+        "How many providers are on flare?",
+    ]
+    assert len({normalize_question(q) for q in questions}) == len(questions)
+    assert normalize_question("How many providers are on flare?") == "how many providers are on flare"
+
+
+def test_lru_eviction_and_ttl_expiry():
+    clock = Clock()
+    cache = AnswerCache(max_entries=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 1
@@ -0,0 +1,89 @@
+import os
+import sys
+import gzip
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from build_bundles import build_bundle, build_bundles
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+def _tree(tmp_path):
+    daily = tmp_path / "daily"
+    current = tmp_path / "current"
+    _write(daily / "2025-05" / "flare_snapshot_2025-05-01.json", {
+        "date": "2025-05-01",
+        "providers": [
+            {"rank": "1", "name": "Alpha", "vote_power": 100, "reward_rate": 0.05},
+            {"rank": "2", "name": "Beta", "vote_power": 50, "reward_rate": 0.04},
+        ],
+    })
+    _write(daily / "2025-05" / "flare_snapshot_2025-05-05.json", {
+        "date": "2025-05-05",
+        "providers": [
+            {"rank": "1", "name": "Gamma", "vote_power": 300, "reward_rate": 0.06},
+            {"rank": "2", "name": "Beta", "vote_power": 80, "reward_rate": 0.04},
+        ],
+    })
+    _write(daily / "manifest.json", {"flare": [
+        "2025-05/flare_snapshot_2025-05-05.json",
+        "2025-05/flare_snapshot_2025-05-01.json",
+        "2025-05/flare_snapshot_2025-04-28.json",  # missing on disk
+    ], "songbird": []})
+    for stamp, pct in (("2025-05-05T10-00-00Z", 1.5), ("2025-05-05T11-00-00Z", 2.5)):
+        _write(current / "2025-05" / f"flare_vp_{stamp}.json", {
+            "timestamp": stamp,
+            "providers": [{"name": "Delta", "vote_power_pct": pct}, {"name": "Beta", "vote_power_pct": 1.0}],
+        })
+    return str(daily), str(current)
+
+
+def test_bundle_is_dictionary_encoded_and_columnar(tmp_path):
+    daily, current = _tree(tmp_path)
+    bundle = build_bundle("flare", daily, current, current_files=1)
+
+    assert bundle["providers"] == ["Alpha", "Beta", "Gamma", "Delta"]
+    section = bundle["daily"]
+    assert section["dates"] == ["2025-05-01", "2025-05-05"]
+    assert section["rows"] == [[0, 1], [2, 1]]
+    assert section["columns"]["vote_power"] == [[100, 50, None, None], [None, 80, 300, None]]
+    assert section["latest"] == [2, 1]
+
+    # Only the newest current file is kept
+    assert bundle["current"]["timestamps"] == ["2025-05-05T11-00-00Z"]
+    assert bundle["current"]["columns"]["vote_power_pct"] == [[None, 1.0, None, 2.5]]
+    assert bundle["current"]["latest"] == [3, 1]
+
+
+def test_bundle_rows_reconstruct_snapshots(tmp_path):
+    daily, current = _tree(tmp_path)
+    bundle = build_bundle("flare", daily, current)
+    section = bundle["daily"]
+    fields = list(section["columns"])
+    rebuilt = [
+        {name: value for name, value in
+         [("name", bundle["providers"][i])] + [(f, section["columns"][f][t][i]) for f in fields]}
+        for t, row in enumerate(section["rows"]) for i in row
+    ]
+    with open(os.path.join(daily, "2025-05", "flare_snapshot_2025-05-05.json")) as f:
+        original = json.load(f)["providers"]
+    assert rebuilt[2:] == original
+
+
+def test_build_bundles_writes_gzip_and_skips_unchanged(tmp_path):
+    daily, current = _tree(tmp_path)
+    out = tmp_path / "bundles"
+
+    assert build_bundles(("flare", "songbird"), daily, current, str(out)) == ["flare", "songbird"]
+    raw = (out / "flare.json").read_bytes()
+    assert json.loads(gzip.decompress((out / "flare.json.gz").read_bytes())) == json.loads(raw)
+    assert json.loads((out / "songbird.json").read_text())["daily"]["dates"] == []
+
+    mtime = os.stat(out / "flare.json.gz").st_mtime_ns
+    assert build_bundles(("flare", "songbird"), daily, current, str(out)) == []
+    assert os.stat(out / "flare.json.gz").st_mtime_ns == mtime
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import textwrap
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collection_runner import run_networks
+
+
+def test_networks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=2)
+
+    def collect(net):
+        # Both networks must be in flight at the same time to pass the barrier
+        barrier.wait()
+        return net.upper()
+
+    outcomes = run_networks(["flare", "songbird"], collect, timeout=5)
+    assert outcomes["flare"].ok and outcomes["flare"].result == "FLARE"
+    assert outcomes["songbird"].ok and outcomes["songbird"].result == "SONGBIRD"
+
+
+def test_failures_and_timeouts_are_isolated():
+    release = threading.Event()
+
+    def collect(net):
+        if net == "flare":
+            raise RuntimeError("rpc down")
+        if net == "songbird":
+            release.wait(2)
+            return "late"
+        return "ok"
+
+    start = time.monotonic()
+    outcomes = run_networks(["flare", "songbird", "coston"], collect, timeout=0.2)
+    release.set()
+    assert time.monotonic() - start < 1.5
+    assert list(outcomes) == ["flare", "songbird", "coston"]
+    assert outcomes["flare"].error == "rpc down"
+    assert outcomes["songbird"].error == "timeout"
+    assert outcomes["coston"].ok
+
+
+def test_on_timeout_stops_hung_network():
+    stopped = threading.Event()
+    finished = threading.Event()
+
+    def collect(net):
+        # Stands in for a WebDriver call that only fails once its browser is quit
+        stopped.wait(10)
+        finished.set()
+        raise RuntimeError("browser quit")
+
+    outcomes = run_networks(["flare"], collect, timeout=0.1, on_timeout=stopped.set)
+    assert outcomes["flare"].error == "timeout"
+    assert finished.wait(2)
+
+
+def test_hung_network_does_not_block_interpreter_exit():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    script = textwrap.dedent(f"""
+        import sys, threading
+        sys.path.insert(0, {root!r})
+        from collection_runner import run_networks
+        outcomes = run_networks(["flare"], lambda net: threading.Event().wait(), timeout=0.1)
+        print(outcomes["flare"].error)
+    """)
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=20)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "timeout"
+    assert time.monotonic() - start < 15
@@ -0,0 +1,90 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Stub selenium and bs4 modules so snapshot import works
+selenium = types.ModuleType("selenium")
+webdriver = types.ModuleType("selenium.webdriver")
+chrome = types.ModuleType("selenium.webdriver.chrome")
+options_module = types.ModuleType("selenium.webdriver.chrome.options")
+options_module.Options = object
+service_module = types.ModuleType("selenium.webdriver.chrome.service")
+service_module.Service = object
+
+selenium.webdriver = webdriver
+webdriver.chrome = chrome
+chrome.options = options_module
+chrome.service = service_module
+
+sys.modules.setdefault("selenium", selenium)
+sys.modules.setdefault("selenium.webdriver", webdriver)
+sys.modules.setdefault("selenium.webdriver.chrome", chrome)
+sys.modules.setdefault("selenium.webdriver.chrome.options", options_module)
+sys.modules.setdefault("selenium.webdriver.chrome.service", service_module)
+
+bs4_module = types.ModuleType("bs4")
+bs4_module.BeautifulSoup = object
+sys.modules.setdefault("bs4", bs4_module)
+
+
+import datetime
+
+from collector_daemon import CollectorScheduler, SNAPSHOT, VOTE_POWER
+from epoch_calendar import EpochCalendar
+
+T0 = datetime.datetime(2025, 6, 1, 12, 3, 0)
+STARTS = [
+    datetime.datetime(2025, 5, 29, 0, 0),
+    datetime.datetime(2025, 6, 1, 12, 0),
+    datetime.datetime(2025, 6, 5, 0, 0),
+    datetime.datetime(2025, 6, 8, 12, 0),
+]
+CALENDAR = EpochCalendar.from_datetimes(STARTS)
+
+
+def kinds(jobs):
+    return [job.kind for job in jobs]
+
+
+def test_first_tick_samples_and_captures_missing_snapshot():
+    sched = CollectorScheduler(CALENDAR, interval=600, now=T0)
+    jobs = sched.due(T0)
+    assert kinds(jobs) == [SNAPSHOT, VOTE_POWER]
+    assert jobs[0].slot == STARTS[1]
+    # Next sample aligned to the ten-minute grid
+    assert sched.next_sample == datetime.datetime(2025, 6, 1, 12, 10)
+
+
+def test_existing_snapshot_not_recaptured():
+    sched = CollectorScheduler(CALENDAR, interval=600, now=T0, snapshot_done=lambda start: True)
+    assert kinds(sched.due(T0)) == [VOTE_POWER]
+    assert sched.next_due() == datetime.datetime(2025, 6, 1, 12, 10)
+
+
+def test_missed_samples_are_coalesced():
+    sched = CollectorScheduler(CALENDAR, interval=600, now=T0, snapshot_done=lambda start: True)
+    sched.due(T0)
+    jobs = sched.due(datetime.datetime(2025, 6, 1, 12, 45))
+    assert kinds(jobs) == [VOTE_POWER]
+    assert jobs[0].missed == 3
+    assert sched.due(datetime.datetime(2025, 6, 1, 12, 46)) == []
+    assert sched.next_sample == datetime.datetime(2025, 6, 1, 12, 50)
+
+
+def test_missed_epochs_caught_up_once():
+    sched = CollectorScheduler(CALENDAR, interval=600, now=T0, snapshot_done=lambda start: True)
+    sched.due(T0)
+    later = datetime.datetime(2025, 6, 9, 0, 0)
+    jobs = [job for job in sched.due(later) if job.kind == SNAPSHOT]
+    assert len(jobs) == 1
+    assert jobs[0].slot == STARTS[3]
+    assert jobs[0].missed == 1
+    assert [job for job in sched.due(later) if job.kind == SNAPSHOT] == []
+
+
+def test_next_due_prefers_epoch_start():
+    sched = CollectorScheduler(CALENDAR, interval=3600 * 24 * 7, now=T0, snapshot_done=lambda start: True)
+    sched.due(T0)
+    assert sched.next_due() == STARTS[2]
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from agents.data_analysis import AnomalyDetector, analyze_history, load_history, rolling_stats
+
+
+def _snapshot(day, providers):
+    return {
+        "date": f"2025-06-{day:02d}",
+        "providers": [
+            {"rank": str(rank), "name": name, "vote_power": vp, "reward_rate": rr}
+            for rank, (name, vp, rr) in enumerate(providers, start=1)
+        ],
+    }
+
+
+def _history():
+    snapshots = []
+    for day in range(1, 7):
+        snapshots.append(_snapshot(day, [
+            ("Alpha", 1000 + day, 0.05),
+            ("Beta", 800 + (day % 2) * 4, 0.05),
+        ] + [(f"P{i}", 500 - i, 0.04) for i in range(12)]))
+    # Beta's vote power collapses and it falls to the bottom of the ranking
+    snapshots.append(_snapshot(7, [("Alpha", 1007, 0.05)] + [(f"P{i}", 500 - i, 0.04) for i in range(12)]
+                               + [("Beta", 100, 0.12)]))
+    return snapshots
+
+
+def test_rolling_stats_use_previous_window_only():
+    values = np.array([[1.0], [3.0], [np.nan], [5.0]])
+    mean, std, count = rolling_stats(values, window=2)
+    assert np.isnan(mean[0, 0]) and count[0, 0] == 0
+    assert mean[2, 0] == 2.0 and std[2, 0] == 1.0
+    assert mean[3, 0] == 3.0 and count[3, 0] == 1  # NaN row is skipped
+
+
+def test_history_flags_collapse_rank_jump_and_drift():
+    results = analyze_history(_history(), window=4, z_threshold=3, rank_jump=10, drift_threshold=0.5)
+    assert [(r["provider"], r["status"]) for r in results] == [("Beta", "Vote power collapse")]
+    beta = results[0]
+    assert beta["rank_jump"] == 12
+    assert beta["reward_rate_drift"] > 1
+    assert beta["date"] == "2025-06-07"
+
+
+def test_incremental_detector_matches_vectorized_history():
+    snapshots = _history()
+    detector = AnomalyDetector(window=4)
+    incremental = detector.update_all(snapshots)
+    batch = analyze_history(snapshots, window=4, latest_only=False)
+    key = lambda r: (r["date"], r["provider"], r["status"])
+    assert sorted(map(key, incremental)) == sorted(map(key, batch))
+    for a, b in zip(sorted(incremental, key=key), sorted(batch, key=key)):
+        assert a["zscore"] == b["zscore"] or abs(a["zscore"] - b["zscore"]) < 1e-6
+
+
+def test_constant_history_has_zero_std_after_many_updates():
+    # Large values whose squares would cancel badly in plain running sums
+    snapshots = [_snapshot(1 + day % 28, [("Alpha", 1670578513.37, 0.05)]) for day in range(200)]
+    snapshots.append(_snapshot(28, [("Alpha", 1670578514.37, 0.05)]))
+    detector = AnomalyDetector(window=8)
+    incremental = detector.update_all(snapshots)
+    assert [r["zscore"] for r in incremental] == [np.inf]
+    assert [r["zscore"] for r in analyze_history(snapshots, window=8)] == [np.inf]
+
+
+def test_load_history_reads_network_files_in_date_order(tmp_path):
+    files = {
+        "2025-06/flare_snapshot_2025-06-02.json": {"date": "2025-06-02", "providers": []},
+        "2025-04/flare_ftso_snapshot_2025-04-24.json": {"timestamp": "2025-04-24T10:00:00Z", "providers": []},
+        "2025-06/flare_snapshot_2025-06-01.json": {"date": "2025-06-01", "providers": []},
+        "2025-06/songbird_snapshot_2025-06-01.json": {"date": "2025-05-01", "providers": []},
+    }
+    for name, data in files.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(json.dumps(data))
+    (tmp_path / "2025-06" / "flare_snapshot_2025-06-03.json").write_text("")
+
+    history = load_history("flare", str(tmp_path))
+    assert [s.get("date") or s["timestamp"][:10] for s in history] == ["2025-04-24", "2025-06-01", "2025-06-02"]
@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from epoch_calendar import EPOCH_CADENCE, EpochCalendar
+
+SCHEDULE = [
+    {"Epoch Number": 1, "Start (UTC)": "2025-04-03 19:10:00", "End (UTC)": "2025-04-07 07:10:00"},
+    {"Epoch Number": 2, "Start (UTC)": "2025-04-07 07:10:00", "End (UTC)": "2025-04-10 19:10:00"},
+    {"Epoch Number": 3, "Start (UTC)": "2025-04-10 19:10:00", "End (UTC)": "2025-04-14 07:10:00"},
+]
+
+
+def dt(*args):
+    return datetime.datetime(*args)
+
+
+def test_lookups_within_schedule():
+    cal = EpochCalendar.from_schedule(SCHEDULE)
+    assert cal.epoch_at(dt(2025, 4, 3, 19, 9)) is None
+    assert cal.epoch_at(dt(2025, 4, 3, 19, 10)) == 1
+    assert cal.epoch_at(dt(2025, 4, 8)) == 2
+    assert cal.latest_start(dt(2025, 4, 8)) == dt(2025, 4, 7, 7, 10)
+    assert cal.next_start(dt(2025, 4, 7, 7, 10)) == dt(2025, 4, 10, 19, 10)
+    assert cal.start_of(3) == dt(2025, 4, 10, 19, 10)
+
+
+def test_start_dates():
+    cal = EpochCalendar.from_schedule(SCHEDULE)
+    assert "2025-04-07" in cal
+    assert datetime.date(2025, 4, 10) in cal
+    assert "2025-04-08" not in cal
+    # No extrapolation unless requested
+    assert "2025-04-17" not in cal
+    assert cal.next_start(dt(2025, 4, 11)) is None
+
+
+def test_extrapolates_on_cadence():
+    cal = EpochCalendar.from_schedule(SCHEDULE, extrapolate=True)
+    assert cal.next_start(dt(2025, 4, 11)) == dt(2025, 4, 14, 7, 10)
+    assert "2025-04-17" in cal
+    assert cal.epoch_at(dt(2025, 4, 17, 19, 10)) == 5
+    assert cal.start_of(5) == dt(2025, 4, 17, 19, 10)
+    far = dt(2030, 1, 1)
+    start = cal.latest_start(far)
+    assert start <= far < start + datetime.timedelta(seconds=EPOCH_CADENCE)
+    assert cal.is_start_date(start.date())
+
+
+def test_near_start_window():
+    cal = EpochCalendar.from_schedule(SCHEDULE)
+    window = datetime.timedelta(minutes=30)
+    assert cal.is_near_start(dt(2025, 4, 7, 6, 45), window)
+    assert cal.is_near_start(dt(2025, 4, 7, 7, 40), window)
+    assert not cal.is_near_start(dt(2025, 4, 7, 8, 0), window)
+
+
+def test_starts_between():
+    cal = EpochCalendar.from_schedule(SCHEDULE, extrapolate=True)
+    assert cal.starts_between(dt(2025, 4, 7, 7, 10), dt(2025, 4, 14, 7, 10)) == [
+        dt(2025, 4, 7, 7, 10), dt(2025, 4, 10, 19, 10), dt(2025, 4, 14, 7, 10),
+    ]
+
+
+def test_load_is_cached_and_extrapolates(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps(SCHEDULE))
+    cal = EpochCalendar.load(str(path))
+    assert cal is EpochCalendar.load(str(path))
+    assert cal.extrapolate
+    assert len(EpochCalendar.load(str(tmp_path / "missing.json"))) == 0
@@ -1,9 +1,10 @@
+import os
 import sys
 import types
 import json
 import pytest
 
-# Create a stub requests module so export_history imports it
+# Stub requests module; export_history imports it when it sends a query
 requests = types.ModuleType("requests")
 class DummyJSONDecodeError(Exception):
     pass
@@ -14,75 +15,177 @@ class DummyHTTPError(Exception):
 exceptions_module.HTTPError = DummyHTTPError
 requests.exceptions = exceptions_module
 requests.post = lambda *a, **k: None
-requests.get = lambda *a, **k: None
-sys.modules.setdefault("requests", requests)
-sys.modules.setdefault("requests.exceptions", exceptions_module)
 
 import export_history
 
+
+@pytest.fixture(autouse=True)
+def stub_requests(monkeypatch):
+    monkeypatch.setitem(sys.modules, "requests", requests)
+    monkeypatch.setitem(sys.modules, "requests.exceptions", exceptions_module)
+
 class DummyResponse:
     def __init__(self, text="bad", status_code=200):
         self.text = text
         self.status_code = status_code
     def raise_for_status(self):
         if self.status_code >= 400:
-            raise export_history.requests.exceptions.HTTPError()
+            raise DummyHTTPError()
     def json(self):
         if self.text.startswith("{"):
             return json.loads(self.text)
         raise DummyJSONDecodeError("bad")
 
 
-def test_fetch_all_delegations_bad_json_scrape(monkeypatch):
-    def fake_post(url, json=None, timeout=0):
-        return DummyResponse("<html>error</html>")
-
-    html = (
-        "<table><tbody><tr><td>a</td><td>b</td><td>1</td><td>2</td><td>h</td></tr></tbody></table>"
-    )
-
-    monkeypatch.setattr(export_history.requests, "post", fake_post)
-    monkeypatch.setattr(export_history.requests, "get", lambda url, timeout=0: DummyResponse(html))
-
-    result = export_history.fetch_all_delegations("http://example.com", network="flare")
-
-    assert result == [
-        {
-            "delegator": "a",
-            "delegatee": "b",
-            "amount": "1",
-            "blockNumber": "2",
-            "transactionHash": "h",
-        }
+def _graphql_response(events):
+    return DummyResponse(json.dumps({"data": {"delegationChangedEvents": events}}))
+
+
+class FakeGraphQL:
+    """Serves delegationChangedEvents from ``events`` for the keyset and edge queries."""
+
+    def __init__(self, events):
+        self.events = sorted(events, key=lambda e: (int(e["blockNumber"]), e["id"]))
+        self.posts = []
+
+    def __call__(self, url, json=None, timeout=0):
+        variables = json["variables"]
+        self.posts.append(variables)
+        assert "skip" not in variables
+        if "direction" in variables:
+            ordered = self.events if variables["direction"] == "asc" else self.events[::-1]
+            data = ordered[:1]
+        else:
+            block, last_id = int(variables["block"]), variables["id"]
+            start, end = int(variables["start"]), int(variables["end"])
+            data = [
+                e for e in self.events
+                if start <= int(e["blockNumber"]) < end
+                and (int(e["blockNumber"]), e["id"]) > (block, last_id)
+            ][: variables["first"]]
+        return _graphql_response(data)
+
+
+def _events(count):
+    # Several events share a block so pages end in the middle of one
+    return [
+        {"id": f"0x{i:06x}", "delegator": f"d{i}", "delegatee": "p", "amount": str(i),
+         "blockNumber": str(100 + i // 7), "transactionHash": f"h{i}"}
+        for i in range(count)
     ]
 
 
-def test_graphql_404_triggers_scrape(monkeypatch):
-    calls = []
-
-    def fake_post(url, json=None, timeout=0):
-        calls.append(url)
-        return DummyResponse("not found", status_code=404)
-
-    html = "<table><tbody></tbody></table>"
-
-    monkeypatch.setattr(export_history.requests, "post", fake_post)
-    monkeypatch.setattr(export_history.requests, "get", lambda url, timeout=0: DummyResponse(html))
-
-    result = export_history.fetch_all_delegations("http://example.com/graphql", first=1, network="flare")
-    assert result == []
-    assert calls == ["http://example.com/graphql"]
-
+def test_keyset_pagination_returns_every_event_once(monkeypatch):
+    events = _events(53)
+    server = FakeGraphQL(events)
+    monkeypatch.setattr(requests, "post", server)
 
-def test_scrape_failure_raises_error(monkeypatch):
-    def fake_post(url, json=None, timeout=0):
-        return DummyResponse("bad html")
+    result = list(export_history.iter_delegations_graphql("http://example.com/graphql", first=5))
 
-    def fake_get(url, timeout=0):
-        raise export_history.requests.exceptions.HTTPError()
+    assert result == server.events
+    assert len(server.posts) == 11  # ten full pages and a short one
+    assert (server.posts[1]["block"], server.posts[1]["id"]) == ("100", "0x000004")
 
-    monkeypatch.setattr(export_history.requests, "post", fake_post)
-    monkeypatch.setattr(export_history.requests, "get", fake_get)
 
-    with pytest.raises(export_history.requests.exceptions.HTTPError):
-        export_history.fetch_all_delegations("http://example.com", network="flare")
+def test_block_ranges_are_disjoint_and_cover_the_span():
+    ranges = export_history.block_ranges(10, 109, 4)
+    assert ranges == [(10, 35), (35, 60), (60, 85), (85, 110)]
+    assert export_history.block_ranges(5, 6, 8) == [(5, 6), (6, 7)]
+
+
+def test_export_streams_ranges_to_jsonl_in_block_order(monkeypatch, tmp_path):
+    events = _events(200)
+    server = FakeGraphQL(events)
+    monkeypatch.setattr(requests, "post", server)
+    path = tmp_path / "flare_delegations.jsonl"
+
+    count = export_history.export_delegations_graphql("http://example.com/graphql", str(path), first=8, workers=3)
+
+    lines = path.read_text().splitlines()
+    assert count == len(lines) == 200
+    assert [json.loads(line) for line in lines] == server.events
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["flare_delegations.jsonl"]
+
+
+def test_export_without_events_writes_empty_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(requests, "post", FakeGraphQL([]))
+    path = tmp_path / "flare_delegations.jsonl"
+    assert export_history.export_delegations_graphql("http://example.com/graphql", str(path)) == 0
+    assert path.read_text() == ""
+
+
+def test_incremental_export_fetches_only_new_events(monkeypatch, tmp_path):
+    events = _events(120)
+    server = FakeGraphQL(events[:80])
+    monkeypatch.setattr(requests, "post", server)
+    url = "http://example.com/graphql"
+
+    assert export_history.export_incremental(url, str(tmp_path), "flare", first=10, workers=2) == 80
+    store = export_history.HistoryStore(str(tmp_path), "flare")
+    assert store.watermark == (111, "0x00004f")
+
+    server.events = FakeGraphQL(events).events
+    server.posts.clear()
+    assert export_history.export_incremental(url, str(tmp_path), "flare", first=10, workers=2) == 40
+    # Every page request continues after the watermark
+    pages = [p for p in server.posts if "block" in p]
+    assert all((int(p["block"]), p["id"]) >= (111, "0x00004f") for p in pages)
+    assert sum(1 for p in pages if p["id"] == "0x00004f") == 1
+
+    assert export_history.export_incremental(url, str(tmp_path), "flare", first=10) == 0
+    store = export_history.HistoryStore(str(tmp_path), "flare")
+    assert [s["events"] for s in store.segments] == [80, 40]
+    assert list(store) == server.events
+    assert store.state["events"] == 120
+
+
+def test_failed_export_keeps_watermark_and_cleans_up(monkeypatch, tmp_path):
+    events = _events(30)
+    server = FakeGraphQL(events[:10])
+    monkeypatch.setattr(requests, "post", server)
+    url = "http://example.com/graphql"
+    export_history.export_incremental(url, str(tmp_path), "flare", first=5)
+
+    def failing(url, json=None, timeout=0):
+        if "block" in json["variables"] and int(json["variables"]["block"]) > 102:
+            return DummyResponse("<html>down</html>")
+        return FakeGraphQL(events)(url, json=json, timeout=timeout)
+
+    monkeypatch.setattr(requests, "post", failing)
+    with pytest.raises(RuntimeError):
+        export_history.export_incremental(url, str(tmp_path), "flare", first=5, workers=1)
+    store = export_history.HistoryStore(str(tmp_path), "flare")
+    assert store.watermark == (101, "0x000009")
+
+    monkeypatch.setattr(requests, "post", FakeGraphQL(events))
+    assert export_history.export_incremental(url, str(tmp_path), "flare", first=5) == 20
+    store = export_history.HistoryStore(str(tmp_path), "flare")
+    assert list(store) == FakeGraphQL(events).events
+    assert sorted(os.listdir(tmp_path / "flare")) == ["000001.jsonl", "000002.jsonl", "state.json"]
+
+
+def test_compaction_merges_small_trailing_segments(monkeypatch, tmp_path):
+    events = _events(60)
+    server = FakeGraphQL([])
+    monkeypatch.setattr(requests, "post", server)
+    for size in (40, 45, 50, 55, 60):
+        server.events = FakeGraphQL(events[:size]).events
+        export_history.export_incremental("http://example.com/graphql", str(tmp_path), "flare", first=7)
+
+    store = export_history.HistoryStore(str(tmp_path), "flare")
+    assert not store.compact(max_segments=4, segment_events=30)
+    assert store.compact(max_segments=3, segment_events=30)
+    assert [s["events"] for s in store.segments] == [40, 20]
+    assert list(store) == FakeGraphQL(events).events
+    assert len(os.listdir(tmp_path / "flare")) == 3
+
+
+def test_main_exits_non_zero_when_export_fails(monkeypatch, caplog):
+    def fail(*args, **kwargs):
+        raise RuntimeError("graphql down")
+
+    monkeypatch.setattr(export_history, "export_incremental", fail)
+    with pytest.raises(SystemExit) as exc:
+        export_history.main()
+    assert exc.value.code == 1
+    assert "GraphQL export failed" in caplog.text
@@ -0,0 +1,14 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from file_utils import write_json_atomic
+
+
+def test_write_json_atomic(tmp_path):
+    path = tmp_path / "manifest.json"
+    write_json_atomic(str(path), {"flare": ["a.json"]})
+    assert json.loads(path.read_text()) == {"flare": ["a.json"]}
+    assert [p.name for p in tmp_path.iterdir()] == ["manifest.json"]
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flaremetrics_parser import parse_provider_table, provider_from_cells, resolve_backend
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "flaremetrics_table.html")
+
+EXPECTED = [
+    {
+        "rank": "1", "name": "Bifrost Wallet",
+        "vote_power": 1670578513, "vote_power_locked": 1670578513,
+        "vote_power_pct": 3.5, "vote_power_pct_locked": 3.49,
+        "change_24h_pct": 0.03, "reward_rate": 0.0261, "registered": "Yes",
+    },
+    {
+        "rank": "2", "name": "Flare.Space",
+        "vote_power": 1398763930, "vote_power_locked": 1398763930,
+        "vote_power_pct": 2.93, "vote_power_pct_locked": 2.92,
+        "change_24h_pct": 0.16, "reward_rate": 0.0409, "registered": "Yes",
+    },
+    {
+        "rank": "3", "name": "AlphaOracle",
+        "vote_power": 1204101063, "vote_power_locked": 1204101063,
+        "vote_power_pct": 2.52, "vote_power_pct_locked": 0.0,
+        "change_24h_pct": 1234.5, "reward_rate": 0.0, "registered": "No",
+    },
+]
+
+
+def _backend_or_skip(name):
+    if name == "bs4":
+        bs4 = pytest.importorskip("bs4")
+        if getattr(bs4, "BeautifulSoup", object) is object:
+            pytest.skip("bs4 is stubbed")
+    elif name == "lxml":
+        pytest.importorskip("lxml.html")
+    else:
+        pytest.importorskip("selectolax.lexbor")
+    return name
+
+
+@pytest.mark.parametrize("backend", ["selectolax", "lxml", "bs4"])
+def test_backends_produce_identical_rows(backend):
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    assert parse_provider_table(html, _backend_or_skip(backend)) == EXPECTED
+
+
+def test_provider_from_cells_doubled_vote_power():
+    cells = ["4", "X", "123123", "1%", "0%", "1.5", "Yes"]
+    provider = provider_from_cells(cells)
+    assert provider["vote_power"] == 123
+    assert provider["vote_power_locked"] == 123
+    assert provider["reward_rate"] == 1.5
+
+
+def test_provider_from_cells_short_row():
+    assert provider_from_cells(["1", "X"]) is None
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend("regex")
@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from exceptions import ConfigurationError
+from inference_backends import BACKENDS, TorchInt8Backend, get_backend
+
+
+def test_backend_registry_and_configuration():
+    assert set(BACKENDS) == {"torch", "torch-int8", "onnx"}
+    backend = get_backend("torch-int8", model="distilgpt2", threads=2)
+    assert isinstance(backend, TorchInt8Backend)
+    assert (backend.model, backend.threads) == ("distilgpt2", 2)
+
+
+def test_unknown_backend_is_a_configuration_error():
+    with pytest.raises(ConfigurationError, match="torch-int8"):
+        get_backend("tensorrt")
+
+
+def test_onnx_export_is_cached_and_reused(tmp_path, monkeypatch):
+    import types
+
+    from inference_backends import OnnxBackend
+
+    loads = []
+
+    class FakeModel:
+        def save_pretrained(self, path):
+            os.makedirs(path, exist_ok=True)
+            open(os.path.join(path, "model.onnx"), "w").close()
+
+    class FakeORTModel:
+        @staticmethod
+        def from_pretrained(name, export, session_options):
+            loads.append((name, export))
+            return FakeModel()
+
+    class FakeTokenizer:
+        @staticmethod
+        def from_pretrained(name):
+            return FakeTokenizer()
+
+        def save_pretrained(self, path):
+            open(os.path.join(path, "tokenizer.json"), "w").close()
+
+    onnxruntime = types.SimpleNamespace(
+        SessionOptions=types.SimpleNamespace,
+        GraphOptimizationLevel=types.SimpleNamespace(ORT_ENABLE_ALL=99),
+    )
+    monkeypatch.setitem(sys.modules, "onnxruntime", onnxruntime)
+    monkeypatch.setitem(sys.modules, "optimum", types.ModuleType("optimum"))
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", types.SimpleNamespace(ORTModelForCausalLM=FakeORTModel))
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(AutoTokenizer=FakeTokenizer))
+    monkeypatch.setattr(OnnxBackend, "_pipeline", lambda self, model, tokenizer=None: (model, tokenizer))
+
+    backend = OnnxBackend(model="org/tiny-gpt2", cache_dir=str(tmp_path))
+    backend.load()
+    backend.load()
+    export_path = str(tmp_path / "org--tiny-gpt2")
+    assert loads == [("org/tiny-gpt2", True), (export_path, False)]
+    assert sorted(os.listdir(export_path)) == ["model.onnx", "tokenizer.json"]
@@ -0,0 +1,180 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from exceptions import InferenceOverloadedError
+from inference_worker import InferenceWorker, pipeline_batch
+
+
+def test_concurrent_prompts_share_a_batch():
+    batches = []
+
+    def run_batch(prompts):
+        batches.append(list(prompts))
+        return [p + "!" for p in prompts]
+
+    worker = InferenceWorker(run_batch, max_batch=8, max_wait=0.2)
+    results = {}
+    barrier = threading.Barrier(4)
+
+    def ask(i):
+        barrier.wait()
+        results[i] = worker.generate(f"q{i}", timeout=5)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    worker.stop()
+
+    assert results == {i: f"q{i}!" for i in range(4)}
+    assert len(batches) == 1 and sorted(batches[0]) == ["q0", "q1", "q2", "q3"]
+
+
+def test_full_queue_sheds_and_timeouts_are_reported():
+    release = threading.Event()
+
+    def slow_batch(prompts):
+        release.wait(5)
+        return prompts
+
+    worker = InferenceWorker(slow_batch, max_batch=1, max_wait=0, queue_size=1)
+    first = worker.submit("a")
+    deadline = time.monotonic() + 5
+    while not first.running() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    queued = worker.submit("b")
+    with pytest.raises(InferenceOverloadedError):
+        worker.submit("c")
+    assert worker.shed == 1
+
+    release.set()
+    assert first.result(timeout=5) == "a"
+    assert queued.result(timeout=5) == "b"
+    worker.stop()
+
+
+def test_timed_out_request_is_dropped_from_its_batch():
+    release = threading.Event()
+    batches = []
+
+    def slow_batch(prompts):
+        batches.append(list(prompts))
+        release.wait(5)
+        return prompts
+
+    worker = InferenceWorker(slow_batch, max_batch=1, max_wait=0)
+    first = worker.submit("a")
+    with pytest.raises(TimeoutError):
+        worker.generate("b", timeout=0.05)
+    release.set()
+    assert first.result(timeout=5) == "a"
+    worker.submit("c").result(timeout=5)
+    assert batches == [["a"], ["c"]]
+    worker.stop()
+
+
+def test_batch_errors_reach_every_caller():
+    worker = InferenceWorker(lambda prompts: 1 / 0, max_wait=0)
+    with pytest.raises(ZeroDivisionError):
+        worker.generate("x", timeout=5)
+    worker.stop()
+
+
+def test_pipeline_batch_handles_single_and_batched_output():
+    single = lambda prompt: [{"generated_text": prompt + " a"}]
+    assert pipeline_batch(single, ["p"]) == ["p a"]
+
+    calls = []
+
+    def batched(prompts, batch_size=None):
+        calls.append(batch_size)
+        return [[{"generated_text": p + " b"}] for p in prompts]
+
+    assert pipeline_batch(batched, ["x", "y"]) == ["x b", "y b"]
+    assert calls == [2]
+
+
+class FakeStreamer:
+    def __init__(self, tokenizer, **kwargs):
+        import queue
+
+        self.pieces = queue.Queue()
+
+    def put_text(self, text):
+        self.pieces.put(text)
+
+    def end(self):
+        self.pieces.put(None)
+
+    def __iter__(self):
+        while True:
+            piece = self.pieces.get(timeout=5)
+            if piece is None:
+                return
+            yield piece
+
+
+def _fake_transformers(monkeypatch):
+    fake_transformers = type(sys)("transformers")
+    fake_transformers.TextIteratorStreamer = FakeStreamer
+    fake_transformers.StoppingCriteria = object
+    fake_transformers.StoppingCriteriaList = list
+    monkeypatch.setitem(sys.modules, "transformers", fake_transformers)
+
+
+def test_stream_pipeline_yields_pieces_as_generated(monkeypatch):
+    import inference_worker
+
+    _fake_transformers(monkeypatch)
+
+    class FakePipeline:
+        tokenizer = object()
+
+        def __call__(self, prompt, streamer=None, stopping_criteria=None):
+            for word in ("Bifrost", " leads", ""):
+                streamer.put_text(word)
+            streamer.end()
+
+    finished = []
+    pieces = inference_worker.stream_pipeline(FakePipeline(), "p", on_finish=lambda: finished.append(True))
+    assert list(pieces) == ["Bifrost", " leads"]
+    assert finished == [True]
+
+    # Pipelines without a tokenizer answer in one piece
+    single = lambda prompt: [{"generated_text": prompt + " all at once"}]
+    assert list(inference_worker.stream_pipeline(single, "p")) == [" all at once"]
+
+
+def test_closing_the_stream_stops_generation(monkeypatch):
+    import inference_worker
+
+    _fake_transformers(monkeypatch)
+    generated = []
+
+    class EndlessPipeline:
+        tokenizer = object()
+
+        def __call__(self, prompt, streamer=None, stopping_criteria=None):
+            while not any(criteria(None, None) for criteria in stopping_criteria):
+                generated.append("token")
+                streamer.put_text("token ")
+                time.sleep(0.001)
+            streamer.end()
+
+    finished = threading.Event()
+    stream = inference_worker.stream_pipeline(EndlessPipeline(), "p", on_finish=finished.set)
+    assert next(stream) == "token "
+    stream.close()
+
+    assert finished.wait(5)
+    count = len(generated)
+    time.sleep(0.05)
+    assert len(generated) == count
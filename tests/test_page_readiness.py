@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from page_readiness import wait_for_table_rows, ReadinessMetrics, ReadinessResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDriver:
+    """Returns a scripted sequence of row counts, repeating the last one."""
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+
+    def execute_script(self, script, selector):
+        if len(self.counts) > 1:
+            return self.counts.pop(0)
+        return self.counts[0]
+
+
+def test_waits_until_row_count_is_stable():
+    clock = FakeClock()
+    driver = FakeDriver([0, 0, 10, 40, 80, 80, 80])
+    result = wait_for_table_rows(
+        driver, timeout=10, poll_interval=0.5, stable_polls=3,
+        clock=clock, sleep=clock.sleep,
+    )
+    assert result.ready
+    assert result.rows == 80
+    assert result.polls == 7
+    assert result.elapsed == 3.0
+
+
+def test_times_out_on_empty_table():
+    clock = FakeClock()
+    result = wait_for_table_rows(
+        FakeDriver([0]), timeout=2, poll_interval=0.5,
+        clock=clock, sleep=clock.sleep,
+    )
+    assert not result.ready
+    assert result.rows == 0
+    assert result.elapsed == 2.0
+
+
+def test_timeout_with_partial_rows_is_usable():
+    clock = FakeClock()
+    driver = FakeDriver([1, 2, 3, 4, 5, 6, 7, 8])
+    result = wait_for_table_rows(
+        driver, timeout=1, poll_interval=0.5, clock=clock, sleep=clock.sleep,
+    )
+    assert result.ready
+    assert result.rows > 0
+
+
+def test_metrics_summary_per_network():
+    metrics = ReadinessMetrics(max_samples=2)
+    metrics.record("flare", ReadinessResult(True, 80, 1.0, 4))
+    metrics.record("flare", ReadinessResult(True, 80, 3.0, 9))
+    metrics.record("flare", ReadinessResult(False, 0, 30.0, 120))
+    metrics.record("songbird", ReadinessResult(True, 60, 2.0, 5))
+
+    summary = metrics.summary()
+    assert summary["flare"]["samples"] == 2
+    assert summary["flare"]["not_ready"] == 1
+    assert summary["flare"]["max_seconds"] == 3.0
+    assert summary["songbird"]["mean_seconds"] == 2.0
+    assert metrics.last("flare").rows == 0
@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+transformers = types.ModuleType('transformers')
+transformers.pipeline = lambda *args, **kwargs: (
+    lambda prompt, max_length=None, num_return_sequences=None: [
+        {"generated_text": prompt + " stub"}
+    ]
+)
+sys.modules.setdefault('transformers', transformers)
+
+import pytest
+from fastapi.testclient import TestClient
+
+import query_server
+from snapshot_repository import SnapshotRepository
+
+
+def _write(path, date, providers):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"date": date, "providers": providers}))
+
+
+def _provider(rank, name, vote_power):
+    return {"rank": str(rank), "name": name, "vote_power": vote_power, "reward_rate": 0.05}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-01.json", "2025-06-01",
+           [_provider(1, "Bifrost Wallet", 100), _provider(2, "NORTSO", 90)])
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-05.json", "2025-06-05",
+           [_provider(1, "NORTSO", 120), _provider(2, "Bifrost Wallet", 110)])
+    repo = SnapshotRepository([str(tmp_path)])
+    repo.subscribe(query_server._on_publish)
+    monkeypatch.setattr(query_server, "repository", repo)
+    monkeypatch.setattr(query_server, "_index", None)
+    monkeypatch.setattr(query_server, "_aggregates", None)
+    monkeypatch.setattr(query_server, "_responses", (0, {}))
+    return TestClient(query_server.app), tmp_path, repo
+
+
+def test_latest_snapshot_and_etag(client):
+    http, _, _ = client
+    res = http.get("/snapshots/latest", params={"network": "flare"})
+    assert res.status_code == 200
+    assert res.json()["date"] == "2025-06-05"
+    assert res.headers["cache-control"].startswith("public, max-age=")
+    etag = res.headers["etag"]
+
+    cached = http.get("/snapshots/latest", params={"network": "flare"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    assert http.get("/snapshots/latest", params={"network": "songbird"}).status_code == 404
+
+
+def test_provider_series_and_rankings(client):
+    http, _, _ = client
+    series = http.get("/providers/bifrost wallet/series").json()
+    assert series["name"] == "Bifrost Wallet"
+    assert [(p["date"], p["vote_power"]) for p in series["series"]["flare"]] == [
+        ("2025-06-01", 100), ("2025-06-05", 110)
+    ]
+    recent = http.get("/providers/Bifrost Wallet/series", params={"days": 2}).json()
+    assert [p["date"] for p in recent["series"]["flare"]] == ["2025-06-05"]
+    assert http.get("/providers/Nobody/series").status_code == 404
+
+    ranking = http.get("/rankings", params={"at": "2025-06-03", "limit": 1}).json()
+    assert ranking["date"] == "2025-06-01"
+    assert [p["name"] for p in ranking["providers"]] == ["Bifrost Wallet"]
+    assert http.get("/rankings", params={"at": "2025-05-01"}).status_code == 404
+
+
+def test_new_data_changes_etag(client):
+    http, tmp_path, repo = client
+    first = http.get("/snapshots/latest").headers["etag"]
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-08.json", "2025-06-08",
+           [_provider(1, "NORTSO", 130)])
+    repo.refresh()
+    res = http.get("/snapshots/latest", headers={"If-None-Match": first})
+    assert res.status_code == 200
+    assert res.json()["date"] == "2025-06-08"
+
+
+def test_large_responses_are_gzipped(client):
+    http, tmp_path, repo = client
+    providers = [_provider(i, f"Provider {i}", 1000 - i) for i in range(1, 101)]
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-08.json", "2025-06-08", providers)
+    repo.refresh()
+    res = http.get("/rankings", params={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert res.headers.get("content-encoding") == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert len(res.json()["providers"]) == 100
+
+    # Both encodings carry the same weak tag and revalidate each other
+    plain = http.get("/rankings", params={"limit": 100}, headers={"Accept-Encoding": "identity"})
+    assert plain.headers.get("content-encoding") is None
+    assert plain.headers["etag"] == res.headers["etag"]
+    again = http.get("/rankings", params={"limit": 100}, headers={"If-None-Match": res.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_if_none_match_lists_and_wildcards(client):
+    http, _, _ = client
+    res = http.get("/snapshots/latest")
+    etag = res.headers["etag"]
+    assert etag.startswith('W/"')
+    assert res.headers["vary"] == "Accept-Encoding"
+    opaque = etag[2:]
+
+    def status(if_none_match):
+        return http.get("/snapshots/latest", headers={"If-None-Match": if_none_match}).status_code
+
+    assert status(f'"other", {opaque}') == 304  # strong form of the same tag, in a list
+    assert status(f'W/"other" , {etag}') == 304
+    assert status("*") == 304
+    assert status(f'"{opaque[1:-1]}0"') == 200
+    assert status(opaque[:-2] + '"') == 200  # a prefix of the tag is not a match
+
+
+def test_requests_keep_serving_the_previous_view_until_it_is_indexed(client, monkeypatch):
+    http, tmp_path, repo = client
+    assert http.get("/snapshots/latest").json()["date"] == "2025-06-05"
+
+    # Publish a view whose rebuild has not run yet: requests must not build it inline
+    build = query_server._build_derived
+    built = []
+    monkeypatch.setattr(query_server, "_build_derived", lambda view: built.append(view.version))
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-08.json", "2025-06-08",
+           [_provider(1, "NORTSO", 130)])
+    repo._subscribers.clear()
+    repo.refresh()
+    assert http.get("/snapshots/latest").json()["date"] == "2025-06-05"
+    assert built == []
+
+    # The publish callback swaps the new data in
+    monkeypatch.setattr(query_server, "_build_derived", build)
+    query_server._on_publish(repo.view())
+    assert http.get("/snapshots/latest").json()["date"] == "2025-06-08"
@@ -24,3 +24,38 @@ def test_query_function():
     assert 'answer' in result
     assert 'stub' in result['answer']
 
+
+
+def test_repeated_question_is_served_from_cache(monkeypatch):
+    import query_server
+
+    monkeypatch.setattr(query_server, "answer_cache", query_server.AnswerCache())
+    first = query(Question(question='Who has the most vote power?'))
+    second = query(Question(question='who has the most vote power'))
+    assert second == {"answer": first["answer"], "cached": True}
+    assert query_server.metrics()["answer_cache"]["hits"] == 1
+
+
+def test_query_stream_emits_server_sent_events(monkeypatch):
+    import json
+    from fastapi.testclient import TestClient
+
+    import query_server
+
+    monkeypatch.setattr(query_server, "answer_cache", query_server.AnswerCache())
+    client = TestClient(app)
+
+    res = client.get('/query/stream', params={'question': 'top providers'})
+    assert res.status_code == 200
+    assert res.headers['content-type'].startswith('text/event-stream')
+    events = [block.split('\n') for block in res.text.strip().split('\n\n')]
+    assert [lines[0] for lines in events] == ['event: token', 'event: done']
+    done = json.loads(events[-1][1][len('data: '):])
+    assert done['answer'].endswith('stub')
+
+    # The answer is now cached and replayed without the model
+    again = client.post('/query/stream', json={'query': 'top providers'})
+    assert '"cached": true' in again.text
+    assert query_server.metrics()['stream_first_token']['count'] >= 1
+    # Every streaming slot was handed back
+    assert query_server._stream_slots._value == query_server.STREAM_CONCURRENCY
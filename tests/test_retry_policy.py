@@ -0,0 +1,145 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from retry_policy import (
+    RetryPolicy,
+    classify_error,
+    register_error_class,
+    DRIVER_CRASH,
+    EMPTY_TABLE,
+    HTTP_ERROR,
+    RPC_ERROR,
+    RPC_PERMANENT,
+    CONFIG_ERROR,
+    UNKNOWN,
+)
+from exceptions import (
+    ConfigurationError,
+    EmptyResultError,
+    WebDriverError,
+    WebScrapingError,
+    RPCError,
+)
+from flare_rpc_new import FlareRPCError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _policy(clock, **kwargs):
+    kwargs.setdefault("rng", lambda: 0.0)
+    return RetryPolicy(sleep=clock.sleep, clock=clock, **kwargs)
+
+
+class Flaky:
+    def __init__(self, errors, result="ok"):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def test_classify_error():
+    class WebDriverException(Exception):
+        pass
+
+    assert classify_error(EmptyResultError("empty")) == EMPTY_TABLE
+    assert classify_error(WebDriverError("crash")) == DRIVER_CRASH
+    assert classify_error(WebDriverException("selenium")) == DRIVER_CRASH
+    assert classify_error(WebScrapingError("503", status_code=503)) == HTTP_ERROR
+    assert classify_error(RPCError("rpc")) == RPC_ERROR
+    assert classify_error(ConfigurationError("bad")) == CONFIG_ERROR
+    assert classify_error(ValueError("?")) == UNKNOWN
+
+
+def test_registered_error_class():
+    class CustomRPCError(Exception):
+        pass
+
+    register_error_class(CustomRPCError, RPC_ERROR)
+    assert classify_error(CustomRPCError()) == RPC_ERROR
+
+
+def test_rpc_errors_are_classified_by_code():
+    register_error_class(FlareRPCError, RPC_ERROR)
+    # Transport faults and rate limits
+    assert classify_error(FlareRPCError("Network error: reset")) == RPC_ERROR
+    assert classify_error(FlareRPCError("Network error: 503", status_code=503)) == RPC_ERROR
+    assert classify_error(FlareRPCError("Network error: 429", status_code=429)) == RPC_ERROR
+    assert classify_error(FlareRPCError("RPC Error: limit exceeded", code=-32005)) == RPC_ERROR
+    # Answers from the node that a retry would repeat
+    assert classify_error(FlareRPCError("RPC Error: invalid params", code=-32602)) == RPC_PERMANENT
+    assert classify_error(FlareRPCError("RPC Error: reverted", code=3)) == RPC_PERMANENT
+    assert classify_error(FlareRPCError("Network error: 401", status_code=401)) == RPC_PERMANENT
+
+    clock = FakeClock()
+    func = Flaky([FlareRPCError("RPC Error: method not found", code=-32601)])
+    with pytest.raises(FlareRPCError):
+        _policy(clock).call(func)
+    assert func.calls == 1
+    func = Flaky([FlareRPCError("RPC Error: limit exceeded", code=-32005)])
+    assert _policy(clock).call(func) == "ok"
+
+
+def test_exponential_backoff_until_success():
+    clock = FakeClock()
+    func = Flaky([EmptyResultError("a"), EmptyResultError("b"), EmptyResultError("c")])
+    policy = _policy(clock, max_attempts=5, base_delay=2, max_delay=5)
+    assert policy.call(func) == "ok"
+    assert func.calls == 4
+    assert clock.sleeps == [2, 4, 5]
+
+
+def test_jitter_reduces_delay():
+    policy = RetryPolicy(base_delay=10, max_delay=100, jitter=0.5, rng=lambda: 1.0)
+    assert policy.delay_for(1) == 5.0
+    assert policy.delay_for(2) == 10.0
+
+
+def test_gives_up_after_max_attempts():
+    clock = FakeClock()
+    func = Flaky([WebDriverError("x")] * 3)
+    with pytest.raises(WebDriverError):
+        _policy(clock, max_attempts=3, base_delay=1).call(func)
+    assert func.calls == 3
+
+
+def test_non_retryable_errors_fail_fast():
+    clock = FakeClock()
+    func = Flaky([WebScrapingError("gone", status_code=404)])
+    with pytest.raises(WebScrapingError):
+        _policy(clock).call(func)
+    assert func.calls == 1
+
+    func = Flaky([ValueError("bug")])
+    with pytest.raises(ValueError):
+        _policy(clock, retry_on={DRIVER_CRASH}).call(func)
+    assert clock.sleeps == []
+
+
+def test_deadline_budget_stops_retries():
+    clock = FakeClock()
+    func = Flaky([RPCError("down")] * 10)
+    with pytest.raises(RPCError):
+        _policy(clock, max_attempts=10, base_delay=4, max_delay=60, deadline=10).call(func)
+    # 4 + 8 would exceed the 10 second budget
+    assert clock.sleeps == [4]
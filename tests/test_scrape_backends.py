@@ -0,0 +1,155 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Stub selenium and bs4 modules so snapshot import works
+selenium = types.ModuleType("selenium")
+webdriver = types.ModuleType("selenium.webdriver")
+chrome = types.ModuleType("selenium.webdriver.chrome")
+options_module = types.ModuleType("selenium.webdriver.chrome.options")
+options_module.Options = object
+service_module = types.ModuleType("selenium.webdriver.chrome.service")
+service_module.Service = object
+
+selenium.webdriver = webdriver
+webdriver.chrome = chrome
+chrome.options = options_module
+chrome.service = service_module
+
+sys.modules.setdefault("selenium", selenium)
+sys.modules.setdefault("selenium.webdriver", webdriver)
+sys.modules.setdefault("selenium.webdriver.chrome", chrome)
+sys.modules.setdefault("selenium.webdriver.chrome.options", options_module)
+sys.modules.setdefault("selenium.webdriver.chrome.service", service_module)
+
+bs4_module = types.ModuleType("bs4")
+bs4_module.BeautifulSoup = object
+sys.modules.setdefault("bs4", bs4_module)
+
+import scrape_backends
+from scrape_backends import (
+    ScrapeBackend,
+    HttpScrapeBackend,
+    scrape_providers,
+    scrape_history,
+)
+from exceptions import WebScrapingError
+
+
+class StaticBackend(ScrapeBackend):
+    def __init__(self, name, rows=None, error=None):
+        self.name = name
+        self.rows = rows or []
+        self.error = error
+        self.calls = 0
+
+    def fetch(self, network):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.rows
+
+
+def test_http_strategy_serves_without_fallback():
+    http = StaticBackend("http", rows=[{"name": "A"}])
+    browser = StaticBackend("selenium", rows=[{"name": "B"}])
+    result = scrape_providers("flare", [http, browser])
+    assert result.strategy == "http"
+    assert result.providers == [{"name": "A"}]
+    assert browser.calls == 0
+    assert scrape_history.last("flare").strategy == "http"
+
+
+def test_falls_back_when_http_fails_or_is_empty():
+    failing = StaticBackend("http", error=RuntimeError("boom"))
+    empty = StaticBackend("json")
+    browser = StaticBackend("selenium", rows=[{"name": "B"}])
+    result = scrape_providers("songbird", [failing, empty, browser])
+    assert result.strategy == "selenium"
+    assert result.failures == {"http": "boom", "json": "no rows"}
+
+
+def test_all_strategies_failing_raises():
+    with pytest.raises(WebScrapingError):
+        scrape_providers("flare", [StaticBackend("http"), StaticBackend("selenium")])
+
+
+class FakeResponse:
+    def __init__(self, text="", payload=None, status_code=200):
+        self.text = text
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code}")
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.headers = {}
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return self.responses[url]
+
+
+def test_http_backend_uses_json_endpoint(monkeypatch):
+    session = FakeSession({
+        "https://api.test/flare": FakeResponse(payload={
+            "providers": [{"rank": 1, "name": "A", "votePower": 10, "rewardRate": 0.5}]
+        }),
+    })
+    backend = HttpScrapeBackend(session=session, json_url="https://api.test/{network}")
+    rows = backend.fetch("flare")
+    assert rows[0]["name"] == "A"
+    assert rows[0]["rank"] == "1"
+    assert rows[0]["vote_power"] == 10
+    assert rows[0]["vote_power_locked"] == 10
+    assert rows[0]["reward_rate"] == 0.5
+
+
+def test_http_backend_parses_server_rendered_html(monkeypatch):
+    session = FakeSession({
+        "https://flaremetrics.io/songbird": FakeResponse(text="<table></table>"),
+    })
+    monkeypatch.setattr(
+        scrape_backends.snapshot, "parse_flaremetrics_html",
+        lambda html: [{"name": "parsed", "html": html}],
+    )
+    backend = HttpScrapeBackend(session=session, json_url=None)
+    assert backend.fetch("songbird") == [{"name": "parsed", "html": "<table></table>"}]
+
+
+def test_http_backend_http_error_is_scraping_error():
+    session = FakeSession({
+        "https://flaremetrics.io/": FakeResponse(status_code=503),
+    })
+    backend = HttpScrapeBackend(session=session, json_url=None)
+    with pytest.raises(WebScrapingError):
+        backend.fetch("flare")
+
+
+def test_failed_scrape_is_saved_without_an_earlier_strategy(monkeypatch):
+    from retry_policy import RetryPolicy
+
+    snapshot = scrape_backends.snapshot
+    scrape_providers("flare", [StaticBackend("http", rows=[{"name": "A"}])])
+    failing = [StaticBackend("http"), StaticBackend("selenium")]
+    assert snapshot.scrape_with_retries("flare", policy=RetryPolicy(max_attempts=1), backends=failing) is None
+
+    saved = []
+    monkeypatch.setattr(snapshot, "scrape_with_retries", lambda network, backends=None: None)
+    monkeypatch.setattr(snapshot, "save_snapshot", lambda data, network, source=None: saved.append((data, source)))
+    monkeypatch.setattr(snapshot, "clean_snapshots", lambda schedule, network: None)
+    snapshot.capture_snapshot(None, "flare")
+    assert saved == [([], None)]
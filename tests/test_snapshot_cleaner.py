@@ -0,0 +1,143 @@
+import os
+import sys
+import json
+import shutil
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import snapshot_cleaner
+from epoch_calendar import EpochCalendar
+from snapshot_cleaner import clean_snapshot_dir, default_state_path
+
+CALENDAR = EpochCalendar.from_datetimes([datetime.datetime(2023, 1, 1, 7, 10)])
+
+
+def _tree(tmp_path):
+    snap_dir = tmp_path / "snaps"
+    docs_dir = tmp_path / "docs"
+    (snap_dir / "2023-01").mkdir(parents=True)
+    (docs_dir / "2023-01").mkdir(parents=True)
+    for name in ("flare_snapshot_2023-01-01.json", "flare_snapshot_2023-01-03.json"):
+        (snap_dir / "2023-01" / name).write_text("{}")
+        (docs_dir / "2023-01" / name).write_text("{}")
+    manifest = docs_dir / "manifest.json"
+    manifest.write_text(json.dumps({
+        "flare": [
+            os.path.join("2023-01", "flare_snapshot_2023-01-01.json"),
+            os.path.join("2023-01", "flare_snapshot_2023-01-03.json"),
+            os.path.join("2023-01", "flare_snapshot_2022-12-28.json"),  # missing on disk
+        ],
+        "songbird": [],
+    }))
+    return snap_dir, docs_dir, manifest
+
+
+def _clean(snap_dir, docs_dir, manifest, calendar=CALENDAR):
+    return clean_snapshot_dir(
+        calendar,
+        snapshot_dir=str(snap_dir),
+        docs_dir=str(docs_dir),
+        manifest_path=str(manifest),
+        network="flare",
+        state_path=str(snap_dir.parent / "state" / "clean.json"),
+    )
+
+
+def _count_classified(monkeypatch):
+    calls = []
+    original = EpochCalendar.is_start_date
+
+    def counting(self, day):
+        calls.append(day)
+        return original(self, day)
+
+    monkeypatch.setattr(EpochCalendar, "is_start_date", counting)
+    return calls
+
+
+def test_first_run_deletes_and_prunes_manifest(tmp_path):
+    snap_dir, docs_dir, manifest = _tree(tmp_path)
+
+    deleted = _clean(snap_dir, docs_dir, manifest)
+
+    stale = os.path.join("2023-01", "flare_snapshot_2023-01-03.json")
+    assert deleted == [stale]
+    assert not (snap_dir / stale).exists()
+    assert not (docs_dir / stale).exists()
+    assert json.loads(manifest.read_text())["flare"] == [
+        os.path.join("2023-01", "flare_snapshot_2023-01-01.json")
+    ]
+    state = json.loads((tmp_path / "state" / "clean.json").read_text())
+    assert state["kept"] == [os.path.join("2023-01", "flare_snapshot_2023-01-01.json")]
+
+
+def test_second_run_examines_nothing(tmp_path, monkeypatch):
+    snap_dir, docs_dir, manifest = _tree(tmp_path)
+    _clean(snap_dir, docs_dir, manifest)
+
+    calls = _count_classified(monkeypatch)
+    scanned = []
+    original_scandir = os.scandir
+    monkeypatch.setattr(
+        snapshot_cleaner.os, "scandir", lambda path: scanned.append(path) or original_scandir(path)
+    )
+    before = manifest.stat().st_mtime_ns
+
+    assert _clean(snap_dir, docs_dir, manifest) == []
+    assert calls == []
+    # Every directory is listed once; none is re-examined
+    assert scanned == [str(snap_dir), os.path.join(str(snap_dir), "2023-01")]
+    assert manifest.stat().st_mtime_ns == before
+
+
+def test_state_survives_a_fresh_checkout(tmp_path, monkeypatch):
+    snap_dir, docs_dir, manifest = _tree(tmp_path)
+    _clean(snap_dir, docs_dir, manifest)
+    assert sorted(os.listdir(snap_dir)) == ["2023-01"]
+    assert sorted(os.listdir(docs_dir)) == ["2023-01", "manifest.json"]
+
+    # A checkout recreates every file and directory with new mtimes
+    fresh = tmp_path / "checkout"
+    for name in ("snaps", "docs", "state"):
+        shutil.copytree(tmp_path / name, fresh / name)
+    state = (fresh / "state" / "clean.json").read_text()
+    calls = _count_classified(monkeypatch)
+
+    assert _clean(fresh / "snaps", fresh / "docs", fresh / "docs" / "manifest.json") == []
+    assert calls == []
+    assert (fresh / "state" / "clean.json").read_text() == state
+
+
+def test_default_state_lives_outside_the_snapshot_tree(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot_cleaner, "STATE_DIR", str(tmp_path / "cache"))
+    path = default_state_path(os.path.join("docs", "daily_snapshots"))
+    assert path == str(tmp_path / "cache" / "docs_daily_snapshots.json")
+    assert default_state_path("daily_snapshots") != path
+
+
+def test_new_file_is_classified(tmp_path, monkeypatch):
+    snap_dir, docs_dir, manifest = _tree(tmp_path)
+    _clean(snap_dir, docs_dir, manifest)
+
+    (snap_dir / "2023-01" / "flare_snapshot_2023-01-05.json").write_text("{}")
+    calls = _count_classified(monkeypatch)
+
+    deleted = _clean(snap_dir, docs_dir, manifest)
+
+    assert calls == ["2023-01-05"]
+    assert deleted == [os.path.join("2023-01", "flare_snapshot_2023-01-05.json")]
+
+
+def test_schedule_change_forces_full_rescan(tmp_path, monkeypatch):
+    snap_dir, docs_dir, manifest = _tree(tmp_path)
+    _clean(snap_dir, docs_dir, manifest)
+
+    calls = _count_classified(monkeypatch)
+    other = EpochCalendar.from_datetimes([datetime.datetime(2023, 1, 4, 7, 10)])
+
+    deleted = _clean(snap_dir, docs_dir, manifest, calendar=other)
+
+    assert calls == ["2023-01-01"]
+    assert deleted == [os.path.join("2023-01", "flare_snapshot_2023-01-01.json")]
+    assert json.loads(manifest.read_text())["flare"] == []
@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from agents.snapshot_fetcher import (
+    ChainedSnapshotSource,
+    LocalSnapshotSource,
+    RemoteSnapshotSource,
+    fetch_snapshot,
+)
+from exceptions import NetworkError
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeServer:
+    def __init__(self, data, etag='"v1"'):
+        self.data = data
+        self.etag = etag
+        self.calls = []
+
+    def __call__(self, url, headers=None, timeout=None):
+        self.calls.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.data, {"ETag": self.etag, "Last-Modified": "Mon, 02 Jun 2025 00:00:00 GMT"})
+
+
+def test_local_source_prefers_manifest_newest_entry(tmp_path):
+    (tmp_path / "2025-06").mkdir()
+    for day in ("01", "05"):
+        (tmp_path / "2025-06" / f"flare_snapshot_2025-06-{day}.json").write_text(json.dumps({"date": day}))
+    (tmp_path / "manifest.json").write_text(json.dumps({"flare": [
+        "2025-06/flare_snapshot_2025-06-05.json", "2025-06/flare_snapshot_2025-06-01.json",
+    ]}))
+    assert LocalSnapshotSource("flare", [str(tmp_path)]).get() == {"date": "05"}
+    # Without a manifest the directory listing is used
+    (tmp_path / "manifest.json").unlink()
+    assert LocalSnapshotSource("flare", [str(tmp_path)]).get() == {"date": "05"}
+    assert LocalSnapshotSource("songbird", [str(tmp_path)]).get() is None
+
+
+def test_remote_source_revalidates_with_conditional_get(tmp_path):
+    server = FakeServer({"providers": []})
+    source = RemoteSnapshotSource("https://example/snapshot.json", cache_dir=str(tmp_path), max_age=0, http_get=server)
+
+    assert source.get() == {"providers": []}
+    assert source.get() == {"providers": []}
+    assert server.calls[0] == {}
+    assert server.calls[1]["If-None-Match"] == '"v1"'
+    assert server.calls[1]["If-Modified-Since"] == "Mon, 02 Jun 2025 00:00:00 GMT"
+
+    # A fresh cache needs no request at all
+    fresh = RemoteSnapshotSource("https://example/snapshot.json", cache_dir=str(tmp_path), max_age=60, http_get=server)
+    assert fresh.get() == {"providers": []}
+    assert fresh.requests_made == 0
+
+
+def test_remote_failure_falls_back_to_cache(tmp_path):
+    server = FakeServer({"providers": [1]})
+    RemoteSnapshotSource("u", cache_dir=str(tmp_path), max_age=0, http_get=server).get()
+
+    def offline(url, headers=None, timeout=None):
+        raise OSError("network down")
+
+    assert RemoteSnapshotSource("u", cache_dir=str(tmp_path), max_age=0, http_get=offline).get() == {"providers": [1]}
+    with pytest.raises(NetworkError):
+        RemoteSnapshotSource("other", cache_dir=str(tmp_path), max_age=0, http_get=offline).get()
+
+
+def test_fetch_snapshot_is_local_first(tmp_path):
+    (tmp_path / "flare_snapshot_2025-06-01.json").write_text(json.dumps({"date": "local"}))
+    server = FakeServer({"date": "remote"})
+    source = ChainedSnapshotSource([
+        LocalSnapshotSource("flare", [str(tmp_path)]),
+        RemoteSnapshotSource("u", cache_dir=str(tmp_path / "cache"), http_get=server),
+    ])
+    assert fetch_snapshot(source=source) == {"date": "local"}
+    assert server.calls == []
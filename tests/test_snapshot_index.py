@@ -0,0 +1,81 @@
+import os
+import sys
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from epoch_calendar import EpochCalendar
+from snapshot_index import SnapshotIndex, pack_context, snapshot_epoch, tokenize
+from snapshot_repository import SnapshotFile, SnapshotView
+
+CALENDAR = EpochCalendar.from_datetimes(
+    [datetime.datetime(2025, 6, 1, 12), datetime.datetime(2025, 6, 5, 0)], first_epoch=10
+)
+
+
+def _provider(rank, name, vote_power):
+    return {"rank": str(rank), "name": name, "vote_power": vote_power, "reward_rate": 0.05}
+
+
+def _view():
+    providers = [_provider(1, "Bifrost Wallet", 100), _provider(2, "Flare.Space", 90), _provider(3, "NORTSO", 80)]
+    files = [
+        SnapshotFile("flare_snapshot_2025-06-01.json", "flare", {"date": "2025-06-01", "providers": providers}),
+        SnapshotFile("flare_snapshot_2025-06-05.json", "flare", {"date": "2025-06-05", "providers": providers[:2]}),
+        SnapshotFile("songbird_snapshot_2025-06-05.json", "songbird",
+                     {"date": "2025-06-05", "providers": [_provider(1, "NORTSO", 50)]}),
+    ]
+    return SnapshotView(tuple(files), version=3)
+
+
+def test_tokenize_keeps_dates_and_drops_stopwords():
+    assert tokenize("What is the vote power of Flare.Space on 2025-06-05?") == ["flare.space", "2025-06-05"]
+
+
+def test_snapshot_epoch_parses_dash_separated_timestamps():
+    # Current vote power files store timestamps like this one
+    assert snapshot_epoch(CALENDAR, "2025-06-03T04-03-17Z") == 10
+    assert snapshot_epoch(CALENDAR, "2025-06-03T04:03:17.280970Z") == 10
+    assert snapshot_epoch(CALENDAR, "2025-06-05T00-00-01Z") == 11
+    assert snapshot_epoch(CALENDAR, "2025-06-01") == 10
+    assert snapshot_epoch(CALENDAR, "yesterday") is None
+
+
+def test_dash_timestamp_snapshots_get_epoch_terms():
+    current = SnapshotFile("flare_vp_2025-06-05T10-00-00Z.json", "flare", {
+        "timestamp": "2025-06-05T10-00-00Z", "providers": [_provider(1, "NORTSO", 80)],
+    })
+    index = SnapshotIndex(SnapshotView((current,), version=1), CALENDAR)
+    rows = index.search("NORTSO in epoch 11")
+    assert [row.epoch for row in rows] == [11]
+
+
+def test_defaults_to_latest_snapshot_per_network():
+    index = SnapshotIndex(_view(), CALENDAR)
+    rows = index.search("top providers")
+    assert {(r.network, r.date) for r in rows} == {("flare", "2025-06-05"), ("songbird", "2025-06-05")}
+    assert [r.rank for r in rows] == [1, 1, 2]
+
+
+def test_provider_name_and_scope_terms():
+    index = SnapshotIndex(_view(), CALENDAR)
+
+    rows = index.search("How much does NORTSO have on songbird?")
+    assert [(r.network, r.provider["name"]) for r in rows] == [("songbird", "NORTSO")]
+
+    rows = index.search("flare space in epoch 10")
+    assert [(r.date, r.epoch, r.provider["name"]) for r in rows] == [("2025-06-01", 10, "Flare.Space")]
+
+    rows = index.search("nortso on flare 2025-06")
+    assert [(r.date, r.provider["name"]) for r in rows] == [("2025-06-01", "NORTSO")]
+
+
+def test_pack_context_respects_budget():
+    index = SnapshotIndex(_view(), CALENDAR)
+    rows = index.search("flare in 2025-06")
+    context = pack_context(rows, 120)
+    lines = context.splitlines()
+    assert lines[0] == "network|date|epoch|rank|name|vote_power|reward_rate"
+    assert lines[1] == "flare|2025-06-05|11|1|Bifrost Wallet|100|0.05"
+    assert len(context) <= 120
+    assert pack_context([], 100) == "No matching snapshot data"
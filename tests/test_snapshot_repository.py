@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from snapshot_repository import SnapshotRepository
+
+
+def _write(path, date, providers=()):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"date": date, "providers": list(providers)}))
+
+
+def test_loads_lazily_including_month_folders(tmp_path):
+    _write(tmp_path / "2025-06" / "flare_snapshot_2025-06-04.json", "2025-06-04")
+    _write(tmp_path / "2025-06" / "songbird_snapshot_2025-06-01.json", "2025-06-01")
+    (tmp_path / "manifest.json").write_text("{}")
+    (tmp_path / ".clean_state.json").write_text("{}")
+
+    repo = SnapshotRepository([str(tmp_path)])
+    assert repo.version == 0
+
+    view = repo.view()
+    assert view.version == 1
+    assert [(f.network, f.date) for f in view] == [("songbird", "2025-06-01"), ("flare", "2025-06-04")]
+    assert view.files[0].path == os.path.join("2025-06", "songbird_snapshot_2025-06-01.json")
+
+
+def test_refresh_reads_only_new_files(tmp_path, monkeypatch):
+    _write(tmp_path / "flare_snapshot_2025-06-01.json", "2025-06-01")
+    repo = SnapshotRepository([str(tmp_path)])
+    first = repo.view()
+
+    loads = []
+    original = SnapshotRepository._load_file
+    monkeypatch.setattr(
+        SnapshotRepository, "_load_file",
+        staticmethod(lambda d, p: loads.append(os.path.basename(p)) or original(d, p)),
+    )
+
+    assert not repo.refresh()
+    assert repo.view() is first
+
+    _write(tmp_path / "flare_snapshot_2025-06-04.json", "2025-06-04")
+    assert repo.refresh()
+    assert loads == ["flare_snapshot_2025-06-04.json"]
+    # Readers holding the old view are unaffected
+    assert len(first) == 1
+    assert len(repo.view()) == 2 and repo.version == 2
+
+
+def test_refresh_drops_removed_and_skips_broken_files(tmp_path):
+    keep = tmp_path / "flare_snapshot_2025-06-01.json"
+    gone = tmp_path / "flare_snapshot_2025-06-04.json"
+    _write(keep, "2025-06-01")
+    _write(gone, "2025-06-04")
+    repo = SnapshotRepository([str(tmp_path)])
+    repo.view()
+
+    gone.unlink()
+    (tmp_path / "flare_snapshot_2025-06-08.json").write_text("{not json")
+    assert repo.refresh()
+    assert [f.date for f in repo.view()] == ["2025-06-01"]
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from snapshot_validator import CURRENT, DAILY, LEGACY, validate_archive, validate_bytes
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CURRENT_SNAPSHOT = {
+    "timestamp": "2025-07-11T04-03-17Z",
+    "network": "flare",
+    "providers": [{"name": "A<b>", "vote_power": 4.18}, {"name": "B", "vote_power": 2.0}],
+}
+
+DAILY_SNAPSHOT = {
+    "date": "2025-05-12",
+    "providers": [{
+        "rank": "1", "name": "Bifrost Wallet",
+        "vote_power": 1626339910, "vote_power_locked": 1626339910,
+        "vote_power_pct": 3.51, "vote_power_pct_locked": 3.51,
+        "change_24h_pct": 0.04, "reward_rate": 0.0324, "registered": "Yes",
+    }],
+}
+
+
+def raw(data):
+    return json.dumps(data).encode()
+
+
+def test_current_and_daily_snapshots_validate():
+    result = validate_bytes(raw(CURRENT_SNAPSHOT))
+    assert result.ok and result.kind == CURRENT and result.providers == 2
+    result = validate_bytes(raw(DAILY_SNAPSHOT))
+    assert result.ok and result.kind == DAILY and result.providers == 1
+
+
+def test_invalid_snapshot_reports_location():
+    bad = dict(CURRENT_SNAPSHOT, network="ethereum")
+    result = validate_bytes(raw(bad), "bad.json")
+    assert not result.ok
+    assert result.errors[0]["loc"] == "network"
+
+
+def test_legacy_current_vote_power_validates():
+    legacy = {
+        "timestamp": "2025-06-27T15:27:44.235398Z",
+        "providers": [{"name": "Bifrost Wallet", "vote_power_pct": 3.45}],
+    }
+    result = validate_bytes(raw(legacy))
+    assert result.ok and result.kind == LEGACY and result.providers == 1
+    # ISO timestamps mark the legacy format even when a network key is present
+    with_network = dict(legacy, network="flare", providers=[{"name": "A", "vote_power": 3.5}])
+    assert validate_bytes(raw(with_network)).kind == LEGACY
+    assert not validate_bytes(raw(dict(legacy, timestamp="yesterday"))).ok
+
+
+def test_early_daily_rows_with_string_percentages_validate():
+    row = dict(DAILY_SNAPSHOT["providers"][0], vote_power_pct="3.59%", vote_power_pct_locked="",
+               change_24h_pct="0.10%", reward_rate=".")
+    result = validate_bytes(raw(dict(DAILY_SNAPSHOT, providers=[row])))
+    assert result.ok, result.errors
+
+
+def test_empty_files_are_counted_separately(tmp_path):
+    (tmp_path / "flare_vp_2025-07-01T07-14-54Z.json").write_bytes(b"")
+    report = validate_archive([str(tmp_path)], workers=1)
+    assert (report.files, report.invalid, report.empty) == (1, 0, 1)
+
+
+def test_unknown_format_rejected():
+    result = validate_bytes(b'{"foo": 1}')
+    assert not result.ok and result.kind is None
+
+
+def test_archive_report_in_process_and_pool(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for i in range(5):
+        (tmp_path / "sub" / f"flare_vp_{i}.json").write_bytes(raw(CURRENT_SNAPSHOT))
+    (tmp_path / "flare_snapshot_2025-05-12.json").write_bytes(raw(DAILY_SNAPSHOT))
+    (tmp_path / "broken.json").write_text("{not json")
+    (tmp_path / "manifest.json").write_text("{}")
+
+    for workers in (1, 2):
+        report = validate_archive([str(tmp_path)], workers=workers, chunk_size=2)
+        assert (report.files, report.valid, report.invalid) == (7, 6, 1)
+        assert report.providers == 11
+        assert report.failures[0].path.endswith("broken.json")
+        assert json.loads(json.dumps(report.to_dict()))["invalid"] == 1
+
+
+def test_trusted_fast_path_skips_name_sanitization():
+    from schemas import validate_snapshot_data
+
+    assert validate_snapshot_data(CURRENT_SNAPSHOT).providers[0].name == "A"
+    assert validate_snapshot_data(CURRENT_SNAPSHOT, trusted=True).providers[0].name == "A<b>"
+
+
+def test_real_archive_sample_validates():
+    paths = []
+    for directory in ("daily_snapshots", "current_vote_power"):
+        found = sorted(
+            os.path.join(dirpath, name)
+            for dirpath, _, names in os.walk(os.path.join(ROOT, directory))
+            for name in names
+            if name.endswith(".json") and name != "manifest.json"
+        )
+        # Spread the sample across the archive's history and formats
+        paths.extend(found[:: max(1, len(found) // 40)])
+    if not paths:
+        pytest.skip("snapshot archive not present")
+
+    report = validate_archive(paths, workers=1)
+    assert report.files == len(paths)
+    assert report.invalid == 0, [(f.path, f.errors[:1]) for f in report.failures]
@@ -0,0 +1,118 @@
+import os
+import sys
+import json
+import math
+import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from epoch_calendar import EpochCalendar
+from vote_power_series import DownsampledSeries, lttb, parse_timestamp, update_series
+
+CALENDAR = EpochCalendar.from_datetimes([datetime.datetime(2025, 6, 1, 7, 10)], extrapolate=True)
+RESOLUTIONS = {"hourly": 0, "daily": 0, "epoch": 0}
+
+
+def _sample(directory, when, values):
+    stamp = when.strftime("%Y-%m-%dT%H-%M-%SZ")
+    path = directory / when.strftime("%Y-%m") / f"flare_vp_{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "timestamp": when.isoformat() + "Z",
+        "providers": [{"name": name, "vote_power_pct": pct} for name, pct in values.items()],
+    }))
+
+
+def _load(out, resolution):
+    with open(out / f"flare_{resolution}.json") as f:
+        return json.load(f)
+
+
+def test_parse_timestamp_accepts_content_and_file_name_stamps():
+    expected = datetime.datetime(2025, 6, 20, 13, 36, 22)
+    assert parse_timestamp("2025-06-20T13:36:22Z") == expected
+    assert parse_timestamp("2025-06-20T13-36-22Z") == expected
+    assert parse_timestamp("2025-06-20T13:36:22.5+00:00") == expected.replace(microsecond=500000)
+    assert parse_timestamp("soon") is None
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    points = [(float(x), math.sin(x / 10)) for x in range(1000)]
+    points[500] = (500.0, 25.0)
+    kept = lttb(points, 50)
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert kept == sorted(kept)
+    assert 500 in kept
+    assert lttb(points[:10], 50) == list(range(10))
+
+
+def test_buckets_track_count_mean_min_max():
+    series = DownsampledSeries("flare", "hourly")
+    base = datetime.datetime(2025, 6, 2, 10, 0)
+    for minutes, pct in ((0, 1.0), (20, 3.0), (40, 2.0), (70, 5.0)):
+        when = base + datetime.timedelta(minutes=minutes)
+        series.add(when.isoformat(), when, [{"name": "A", "vote_power_pct": pct}])
+
+    assert series.times == ["2025-06-02T10:00Z", "2025-06-02T11:00Z"]
+    assert series.count == [[3], [1]]
+    assert series.mean == [[2.0], [5.0]]
+    assert series.min == [[1.0], [5.0]]
+    assert series.max == [[3.0], [5.0]]
+    # Older or repeated samples are ignored
+    assert not series.add(base.isoformat(), base, [{"name": "A", "vote_power_pct": 9.0}])
+
+
+def test_retention_bounds_buckets():
+    series = DownsampledSeries("flare", "daily", retention=3)
+    for day in range(1, 8):
+        when = datetime.datetime(2025, 6, day, 12)
+        series.add(when.isoformat(), when, [{"name": "A", "vote_power_pct": float(day)}])
+    assert series.times == ["2025-06-05", "2025-06-06", "2025-06-07"]
+    assert series.chart("A") == [
+        ["2025-06-05", 5.0, 5.0, 5.0], ["2025-06-06", 6.0, 6.0, 6.0], ["2025-06-07", 7.0, 7.0, 7.0],
+    ]
+
+
+def test_incremental_updates_match_a_single_pass(tmp_path):
+    current = tmp_path / "current"
+    base = datetime.datetime(2025, 6, 1, 0, 0)
+    samples = [
+        (base + datetime.timedelta(minutes=37 * i), {"A": 1.0 + (i % 5), **({"B": 2.0 * i} if i > 40 else {})})
+        for i in range(400)
+    ]
+    for when, values in samples[:250]:
+        _sample(current, when, values)
+
+    incremental, single = tmp_path / "incremental", tmp_path / "single"
+    assert update_series(["flare"], str(current), str(incremental), CALENDAR, RESOLUTIONS) == {"flare": 250}
+    for when, values in samples[250:]:
+        _sample(current, when, values)
+    assert update_series(["flare"], str(current), str(incremental), CALENDAR, RESOLUTIONS) == {"flare": 150}
+    assert update_series(["flare"], str(current), str(incremental), CALENDAR, RESOLUTIONS) == {"flare": 0}
+    update_series(["flare"], str(current), str(single), CALENDAR, RESOLUTIONS)
+
+    for resolution in RESOLUTIONS:
+        assert _load(incremental, resolution) == _load(single, resolution)
+
+    epoch = _load(single, "epoch")
+    assert epoch["times"][0] == "2025-06-01T07:10Z"  # samples before the first epoch are skipped
+    assert epoch["providers"] == ["A", "B"]
+    in_epochs = sum(1 for when, _ in samples if when >= datetime.datetime(2025, 6, 1, 7, 10))
+    assert sum(row[0] or 0 for row in epoch["count"]) == in_epochs
+
+
+def test_chart_payload_is_capped(tmp_path):
+    current = tmp_path / "current"
+    base = datetime.datetime(2025, 6, 1, 8, 0)
+    for i in range(200):
+        _sample(current, base + datetime.timedelta(hours=i), {"A": float(i % 7)})
+
+    out = tmp_path / "series"
+    update_series(["flare"], str(current), str(out), CALENDAR, {"hourly": 0}, max_points=40)
+    with open(out / "flare_hourly.chart.json") as f:
+        chart = json.load(f)
+    assert len(_load(out, "hourly")["times"]) == 200
+    points = chart["providers"]["A"]
+    assert len(points) == 40
+    assert points[0][0] == "2025-06-01T08:00Z"
@@ -0,0 +1,200 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from vote_power_watcher import VotePowerState, VotePowerWatcher
+
+
+def event(address, vote_power, block, removed=False):
+    data = "0x" + "0" * 24 + address[2:] + format(vote_power, "064x")
+    return {"data": data, "blockNumber": hex(block), "removed": removed}
+
+
+A = "0x" + "a" * 40
+B = "0x" + "b" * 40
+
+
+class FakeChain:
+    """Minimal JSON-RPC node holding VotePower logs."""
+
+    def __init__(self, head=1000, filters=True):
+        self.head = head
+        self.logs = [event(A, 100, 500), event(B, 50, 600)]
+        self.filters = {} if filters else None
+        self.filter_count = 0
+        self.calls = []
+
+    def __call__(self, network, method, params=None):
+        self.calls.append(method)
+        if method == "eth_blockNumber":
+            return hex(self.head)
+        if method == "eth_getLogs":
+            lo, hi = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+            return [e for e in self.logs if lo <= int(e["blockNumber"], 16) <= hi]
+        if method == "eth_newFilter":
+            if self.filters is None:
+                raise RuntimeError("method not supported")
+            self.filter_count += 1
+            fid = hex(self.filter_count)
+            # Like real nodes, a filter only reports logs mined after it was created
+            self.filters[fid] = max(int(params[0]["fromBlock"], 16), self.head + 1)
+            return fid
+        if method == "eth_uninstallFilter":
+            return self.filters.pop(params[0], None) is not None
+        if method == "eth_getFilterChanges":
+            if params[0] not in self.filters:
+                raise RuntimeError("filter not found")
+            start = self.filters[params[0]]
+            self.filters[params[0]] = self.head + 1
+            return [e for e in self.logs if start <= int(e["blockNumber"], 16) <= self.head]
+        raise AssertionError(method)
+
+    def mine(self, *logs):
+        self.head += 1
+        self.logs.extend(logs)
+
+
+def make_watcher(chain, clock=lambda: 0.0, min_emit_interval=0):
+    emitted = []
+    watcher = VotePowerWatcher(
+        "flare", rpc=chain, filter_rpc=chain, emit=lambda net, providers: emitted.append(providers),
+        heartbeat=600, min_emit_interval=min_emit_interval, clock=clock,
+    )
+    return watcher, emitted
+
+
+def test_state_ignores_unchanged_values():
+    state = VotePowerState()
+    assert state.apply(event(A, 1, 1))
+    assert not state.apply(event(A, 1, 2))
+    assert state.apply(event(A, 2, 3))
+    assert state.version == 2
+    assert state.last_block == 3
+
+
+def test_emits_only_on_change():
+    chain = FakeChain()
+    watcher, emitted = make_watcher(chain)
+    assert watcher.step()
+    assert len(emitted) == 1
+    assert {p["raw_vote_power"] for p in emitted[0]} == {100, 50}
+
+    chain.mine()
+    assert not watcher.step()
+
+    chain.mine(event(A, 150, chain.head + 1))
+    assert watcher.step()
+    assert emitted[-1][0]["raw_vote_power"] == 150
+    # Seeding used one getLogs; afterwards only cheap filter polls
+    assert chain.calls.count("eth_getLogs") == 1
+    assert chain.calls.count("eth_getFilterChanges") == 2
+
+
+def test_heartbeat_reemits_unchanged_state():
+    now = [0.0]
+    chain = FakeChain()
+    watcher, emitted = make_watcher(chain, clock=lambda: now[0])
+    watcher.step()
+    now[0] = 599
+    assert not watcher.step()
+    now[0] = 600
+    assert watcher.step()
+    assert len(emitted) == 2
+
+
+def test_changes_within_min_emit_interval_are_merged():
+    now = [0.0]
+    chain = FakeChain()
+    watcher, emitted = make_watcher(chain, clock=lambda: now[0], min_emit_interval=30)
+    assert watcher.step()
+    now[0] = 10
+    chain.mine(event(A, 150, chain.head + 1))
+    assert not watcher.step()
+    now[0] = 20
+    chain.mine(event(B, 60, chain.head + 1))
+    assert not watcher.step()
+    now[0] = 30
+    assert watcher.step()
+    assert len(emitted) == 2
+    assert {p["raw_vote_power"] for p in emitted[-1]} == {150, 60}
+
+
+def test_blocks_mined_while_installing_the_filter_are_not_missed():
+    chain = FakeChain()
+    node = chain
+
+    def mine_around_new_filter(network, method, params=None):
+        if method == "eth_newFilter":
+            chain.mine(event(A, 130, chain.head + 1))  # before the filter exists
+            fid = node(network, method, params)
+            # Seen by both the filter and the catch-up query
+            chain.mine(event(B, 70, chain.head + 1))
+            chain.mine(event(B, 75, chain.head + 1))
+            return fid
+        return node(network, method, params)
+
+    watcher, emitted = make_watcher(chain)
+    watcher.rpc = watcher.filter_rpc = mine_around_new_filter
+    watcher.step()
+    assert {p["raw_vote_power"] for p in emitted[-1]} == {130, 75}
+    assert watcher.watermark == chain.head
+
+    # Replaying the filter's report of those blocks would flip B back to 70
+    version = watcher.state.version
+    chain.mine()
+    assert watcher.poll_once() == 0
+    assert watcher.state.version == version
+
+
+def test_falls_back_to_watermark_without_filters():
+    chain = FakeChain(filters=False)
+    watcher, emitted = make_watcher(chain)
+    watcher.step()
+    assert watcher.filter_id is None
+
+    chain.mine(event(B, 75, chain.head + 1))
+    watcher.step()
+    assert watcher.watermark == chain.head
+    assert {p["raw_vote_power"] for p in emitted[-1]} == {100, 75}
+
+    # No new blocks: no log query at all
+    queries = watcher.log_queries
+    watcher.step()
+    assert watcher.log_queries == queries
+
+
+def test_lost_filter_catches_up_and_reinstalls():
+    chain = FakeChain()
+    watcher, emitted = make_watcher(chain)
+    watcher.step()
+    chain.filters.clear()
+    chain.mine(event(A, 120, chain.head + 1))
+    assert watcher.step()
+    assert emitted[-1][0]["raw_vote_power"] == 120
+    assert watcher.filter_id in chain.filters
+
+
+def test_reorg_reseeds_state():
+    chain = FakeChain()
+    watcher, _ = make_watcher(chain)
+    watcher.step()
+    chain.mine(event(A, 999, chain.head + 1, removed=True))
+    watcher.step()
+    assert chain.calls.count("eth_getLogs") == 2
+    # The filter from the first seeding was uninstalled, not leaked
+    assert list(chain.filters) == [watcher.filter_id] == ["0x2"]
+
+
+def test_close_uninstalls_the_filter():
+    import threading
+
+    chain = FakeChain()
+    watcher, _ = make_watcher(chain)
+    stop = threading.Event()
+    stop.set()
+    watcher.step()
+    assert chain.filters
+    watcher.run(stop)
+    assert chain.filters == {}
+    assert watcher.filter_id is None
@@ -0,0 +1,177 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Stub selenium so webdriver_manager imports without a browser stack
+selenium = types.ModuleType("selenium")
+webdriver = types.ModuleType("selenium.webdriver")
+chrome = types.ModuleType("selenium.webdriver.chrome")
+options_module = types.ModuleType("selenium.webdriver.chrome.options")
+options_module.Options = object
+service_module = types.ModuleType("selenium.webdriver.chrome.service")
+service_module.Service = object
+
+selenium.webdriver = webdriver
+webdriver.chrome = chrome
+chrome.options = options_module
+chrome.service = service_module
+
+sys.modules.setdefault("selenium", selenium)
+sys.modules.setdefault("selenium.webdriver", webdriver)
+sys.modules.setdefault("selenium.webdriver.chrome", chrome)
+sys.modules.setdefault("selenium.webdriver.chrome.options", options_module)
+sys.modules.setdefault("selenium.webdriver.chrome.service", service_module)
+
+import threading
+
+import pytest
+
+import webdriver_manager
+from webdriver_manager import (
+    WebDriverManager,
+    WebDriverPool,
+    LEAN_PROFILE,
+    FULL_PROFILE,
+    get_profile,
+    apply_profile_options,
+    apply_profile_blocking,
+)
+from exceptions import ConfigurationError
+
+
+class FakeOptions:
+    def __init__(self):
+        self.arguments = []
+        self.experimental = {}
+        self.page_load_strategy = "normal"
+
+    def add_argument(self, arg):
+        self.arguments.append(arg)
+
+    def add_experimental_option(self, name, value):
+        self.experimental[name] = value
+
+
+class FakeDriver:
+    def __init__(self, fail=False):
+        self.commands = []
+        self.fail = fail
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.fail:
+            raise RuntimeError("cdp unavailable")
+        self.commands.append((cmd, params))
+
+
+def test_lean_profile_options():
+    options = apply_profile_options(FakeOptions(), LEAN_PROFILE)
+    assert options.page_load_strategy == "eager"
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert options.experimental["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+
+def test_full_profile_leaves_defaults():
+    options = apply_profile_options(FakeOptions(), FULL_PROFILE)
+    assert options.page_load_strategy == "normal"
+    assert options.arguments == []
+
+
+def test_allowed_hosts_restricts_resolution():
+    profile = LEAN_PROFILE.with_allowed_hosts(["flaremetrics.io", "*.flaremetrics.io"])
+    options = apply_profile_options(FakeOptions(), profile)
+    assert (
+        "--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE flaremetrics.io, EXCLUDE *.flaremetrics.io"
+        in options.arguments
+    )
+    assert LEAN_PROFILE.allowed_hosts is None
+
+
+def test_blocking_installs_cdp_patterns():
+    driver = FakeDriver()
+    apply_profile_blocking(driver, LEAN_PROFILE)
+    assert driver.commands[0] == ("Network.enable", {})
+    cmd, params = driver.commands[1]
+    assert cmd == "Network.setBlockedURLs"
+    assert "*.woff2" in params["urls"]
+    assert "*googletagmanager.com*" in params["urls"]
+
+
+def test_blocking_failure_is_not_fatal():
+    apply_profile_blocking(FakeDriver(fail=True), LEAN_PROFILE)
+    driver = FakeDriver()
+    apply_profile_blocking(driver, FULL_PROFILE)
+    assert driver.commands == []
+
+
+def test_unknown_profile():
+    with pytest.raises(ConfigurationError):
+        get_profile("tiny")
+
+
+class BlockingDriver:
+    """Driver whose in-flight call fails as soon as it is quit."""
+
+    def __init__(self):
+        self.quit_called = threading.Event()
+
+    def quit(self):
+        self.quit_called.set()
+
+    def get(self, url):
+        if self.quit_called.wait(5):
+            raise RuntimeError("session deleted")
+
+
+def test_pool_abort_quits_borrowed_drivers_and_frees_slots():
+    pool = WebDriverPool(size=1)
+    created = []
+    pool._manager.create_driver = lambda: created.append(BlockingDriver()) or created[-1]
+    errors = []
+    inside = threading.Event()
+
+    def borrower():
+        try:
+            with pool.session() as driver:
+                inside.set()
+                driver.get("https://flaremetrics.io")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    thread = threading.Thread(target=borrower)
+    thread.start()
+    assert inside.wait(2)
+    pool.abort()
+    thread.join(2)
+
+    assert errors == ["session deleted"]
+    assert created[0].quit_called.is_set()
+    # The slot is free again and the quit driver is not handed out
+    with pool.session() as driver:
+        assert driver is created[1]
+
+
+def test_failed_driver_setup_quits_the_browser(monkeypatch):
+    class BrokenDriver:
+        quit_calls = 0
+
+        def set_page_load_timeout(self, seconds):
+            raise RuntimeError("session not created")
+
+        def quit(self):
+            self.quit_calls += 1
+
+    started = []
+    monkeypatch.setattr(
+        sys.modules["selenium"].webdriver, "Chrome",
+        lambda **kwargs: started.append(BrokenDriver()) or started[-1], raising=False,
+    )
+    manager = WebDriverManager()
+    monkeypatch.setattr(manager, "_create_driver_options", lambda: None)
+    monkeypatch.setattr(manager, "_create_driver_service", lambda: None)
+
+    with pytest.raises(RuntimeError):
+        manager._start_driver()
+    assert started[0].quit_calls == 1
+    assert started[0] not in webdriver_manager._active_drivers
@@ -0,0 +1,329 @@
+"""
+Multi-resolution, downsampled vote power series for charts.
+
+The current vote power archive gains a sample every 10-60 minutes. This stage
+folds each new sample into per-provider buckets at three resolutions:
+
+* ``hourly`` - one bucket per UTC hour
+* ``daily``  - one bucket per UTC day
+* ``epoch``  - one bucket per reward epoch (from ``flare_epoch_schedule.json``)
+
+A bucket keeps the count, mean, minimum and maximum of the samples in it, so
+the envelope of short spikes survives the averaging. Each resolution keeps a
+bounded number of buckets (``SERIES_*_RETENTION``, 0 keeps all) and records
+the newest sample it has seen, so an update only reads files added since the
+last run. Chart payloads are further reduced to at most ``SERIES_MAX_POINTS``
+points per provider with Largest-Triangle-Three-Buckets (LTTB).
+
+Output per network and resolution in ``docs/series/``:
+
+* ``<network>_<resolution>.json`` - the buckets as time x provider columns
+  (also the state read back by the next update)
+* ``<network>_<resolution>.chart.json`` - ``{provider: [[time, mean, min, max], ...]}``
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import logging
+import argparse
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from build_bundles import CURRENT_DIR, NETWORKS, file_stamp, list_files, write_if_changed
+from epoch_calendar import EpochCalendar, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+SERIES_VERSION = 1
+SERIES_DIR = os.getenv("SERIES_DIR", os.path.join("docs", "series"))
+FIELD = "vote_power_pct"
+MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "300"))  # per provider in chart payloads
+RESOLUTIONS: Dict[str, int] = {  # buckets kept per resolution; 0 keeps all
+    "hourly": int(os.getenv("SERIES_HOURLY_RETENTION", str(24 * 7))),
+    "daily": int(os.getenv("SERIES_DAILY_RETENTION", "730")),
+    "epoch": int(os.getenv("SERIES_EPOCH_RETENTION", "0")),
+}
+
+
+def bucket_key(resolution: str, when: datetime.datetime, calendar: Optional[EpochCalendar] = None) -> Optional[str]:
+    """Start of the ``resolution`` bucket holding ``when`` (None if it has none)."""
+    if resolution == "hourly":
+        return when.strftime("%Y-%m-%dT%H:00Z")
+    if resolution == "daily":
+        return when.strftime("%Y-%m-%d")
+    if resolution == "epoch":
+        start = calendar.latest_start(when) if calendar else None
+        return start.strftime("%Y-%m-%dT%H:%MZ") if start else None
+    raise ValueError(f"Unknown resolution '{resolution}'")
+
+
+def _seconds(key: str) -> float:
+    when = parse_timestamp(key)
+    return (when - datetime.datetime(1970, 1, 1)).total_seconds() if when else 0.0
+
+
+def lttb(points: Sequence[Tuple[float, float]], threshold: int) -> List[int]:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept. Between them the points are
+    split into ``threshold - 2`` buckets and from each bucket the point forming
+    the largest triangle with the previously kept point and the average of the
+    next bucket is chosen.
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    kept = [0]
+    size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * size) + 1
+        end = int((i + 1) * size) + 1
+        next_end = min(int((i + 2) * size) + 1, n)
+        following = points[end:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in following) / len(following)
+        avg_y = sum(p[1] for p in following) / len(following)
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+class DownsampledSeries:
+    """
+    Count/mean/min/max buckets of one value per provider at one resolution.
+
+    Args:
+        network: Network the samples belong to
+        resolution: ``hourly``, ``daily`` or ``epoch``
+        retention: Buckets kept; 0 keeps all
+        field: Provider field aggregated
+    """
+
+    def __init__(self, network: str, resolution: str, retention: int = 0, field: str = FIELD):
+        self.network = network
+        self.resolution = resolution
+        self.retention = retention
+        self.field = field
+        self.providers: List[str] = []
+        self._columns: Dict[str, int] = {}
+        self.times: List[str] = []
+        # One row per bucket; rows may be shorter than ``providers`` (missing = None)
+        self.count: List[List[Optional[int]]] = []
+        self.mean: List[List[Optional[float]]] = []
+        self.min: List[List[Optional[float]]] = []
+        self.max: List[List[Optional[float]]] = []
+        self.last_sample = ""
+
+    def _column(self, name: str) -> int:
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = len(self.providers)
+            self.providers.append(name)
+        return column
+
+    def add(
+        self,
+        stamp: str,
+        when: datetime.datetime,
+        providers: Iterable[Dict[str, Any]],
+        calendar: Optional[EpochCalendar] = None,
+    ) -> bool:
+        """
+        Fold one sample into its bucket.
+
+        ``stamp`` orders samples; samples not newer than the last one added are
+        ignored. Returns True if the sample was used.
+        """
+        if stamp <= self.last_sample:
+            return False
+        self.last_sample = stamp
+        key = bucket_key(self.resolution, when, calendar)
+        if key is None or (self.times and key < self.times[-1]):
+            return False
+        if not self.times or key != self.times[-1]:
+            self.times.append(key)
+            for matrix in (self.count, self.mean, self.min, self.max):
+                matrix.append([])
+
+        count, mean, low, high = self.count[-1], self.mean[-1], self.min[-1], self.max[-1]
+        for provider in providers:
+            try:
+                value = float(provider.get(self.field))
+            except (TypeError, ValueError):
+                continue
+            column = self._column(provider.get("name", ""))
+            if column >= len(count):
+                extra = [None] * (column + 1 - len(count))
+                for row in (count, mean, low, high):
+                    row.extend(extra)
+            seen = count[column] or 0
+            if not seen:
+                count[column], mean[column], low[column], high[column] = 1, value, value, value
+                continue
+            count[column] = seen + 1
+            mean[column] = round(mean[column] + (value - mean[column]) / (seen + 1), 6)
+            low[column] = min(low[column], value)
+            high[column] = max(high[column], value)
+
+        if self.retention and len(self.times) > self.retention:
+            drop = len(self.times) - self.retention
+            del self.times[:drop]
+            for matrix in (self.count, self.mean, self.min, self.max):
+                del matrix[:drop]
+        return True
+
+    def chart(self, name: str, max_points: int = MAX_POINTS) -> List[List[Any]]:
+        """``[[time, mean, min, max], ...]`` for provider ``name``, LTTB-reduced to ``max_points``."""
+        column = self._columns.get(name)
+        if column is None:
+            return []
+        points = [
+            [time, self.mean[t][column], self.min[t][column], self.max[t][column]]
+            for t, time in enumerate(self.times)
+            if column < len(self.count[t]) and self.count[t][column]
+        ]
+        keep = lttb([(_seconds(p[0]), p[1]) for p in points], max_points)
+        return [points[i] for i in keep]
+
+    def chart_payload(self, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+        return {
+            "network": self.network,
+            "resolution": self.resolution,
+            "field": self.field,
+            "providers": {name: self.chart(name, max_points) for name in self.providers},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        width = len(self.providers)
+
+        def padded(matrix: List[List[Any]]) -> List[List[Any]]:
+            return [row + [None] * (width - len(row)) for row in matrix]
+
+        return {
+            "version": SERIES_VERSION,
+            "network": self.network,
+            "resolution": self.resolution,
+            "field": self.field,
+            "last_sample": self.last_sample,
+            "providers": list(self.providers),
+            "times": list(self.times),
+            "count": padded(self.count),
+            "mean": padded(self.mean),
+            "min": padded(self.min),
+            "max": padded(self.max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], retention: int = 0) -> "DownsampledSeries":
+        series = cls(data["network"], data["resolution"], retention, data.get("field", FIELD))
+        for name in data.get("providers", []):
+            series._column(name)
+        series.times = list(data.get("times", []))
+        series.count = [list(row) for row in data.get("count", [])]
+        series.mean = [list(row) for row in data.get("mean", [])]
+        series.min = [list(row) for row in data.get("min", [])]
+        series.max = [list(row) for row in data.get("max", [])]
+        series.last_sample = data.get("last_sample", "")
+        return series
+
+    @classmethod
+    def load(cls, path: str, network: str, resolution: str, retention: int = 0) -> "DownsampledSeries":
+        """Read the series at ``path``; a missing, unreadable or outdated file starts a new one."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == SERIES_VERSION:
+                return cls.from_dict(data, retention)
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Starting {path} afresh: {e}")
+        return cls(network, resolution, retention)
+
+
+def _dump(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def update_series(
+    networks: Sequence[str] = NETWORKS,
+    current_dir: str = CURRENT_DIR,
+    out_dir: str = SERIES_DIR,
+    calendar: Optional[EpochCalendar] = None,
+    resolutions: Optional[Dict[str, int]] = None,
+    max_points: int = MAX_POINTS,
+) -> Dict[str, int]:
+    """
+    Fold current vote power files newer than each series' last sample into it.
+
+    Returns:
+        Number of sample files read per network
+    """
+    resolutions = RESOLUTIONS if resolutions is None else resolutions
+    if calendar is None and "epoch" in resolutions:
+        calendar = EpochCalendar.load()
+    os.makedirs(out_dir, exist_ok=True)
+
+    read: Dict[str, int] = {}
+    for network in networks:
+        series = {
+            resolution: DownsampledSeries.load(
+                os.path.join(out_dir, f"{network}_{resolution}.json"), network, resolution, retention
+            )
+            for resolution, retention in resolutions.items()
+        }
+        watermark = min((s.last_sample for s in series.values()), default="")
+        paths = [p for p in list_files(current_dir, network) if file_stamp(p) > watermark]
+        read[network] = 0
+        for path in paths:
+            try:
+                with open(path) as f:
+                    sample = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable sample {path}: {e}")
+                continue
+            stamp = file_stamp(path)
+            when = parse_timestamp(str(sample.get("timestamp") or stamp))
+            if when is None or not isinstance(sample.get("providers"), list):
+                continue
+            read[network] += 1
+            for s in series.values():
+                s.add(stamp, when, sample["providers"], calendar)
+
+        for resolution, s in series.items():
+            stem = os.path.join(out_dir, f"{network}_{resolution}")
+            write_if_changed(f"{stem}.json", _dump(s.to_dict()))
+            write_if_changed(f"{stem}.chart.json", _dump(s.chart_payload(max_points)))
+        logger.info(
+            f"Series {network}: {read[network]} new samples, "
+            + ", ".join(f"{r} {len(s.times)} buckets" for r, s in series.items())
+        )
+    return read
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Update the downsampled vote power series.")
+    parser.add_argument("--networks", nargs="+", default=list(NETWORKS), help="Networks to update")
+    parser.add_argument("--current-dir", default=CURRENT_DIR, help="Published current vote power files")
+    parser.add_argument("--out", default=SERIES_DIR, help="Output directory")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS, help="Points per provider in chart payloads")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    read = update_series(args.networks, args.current_dir, args.out, max_points=args.max_points)
+    print(", ".join(f"{network}: {count} new samples" for network, count in read.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,342 @@
+"""
+Block-driven VotePower event watcher.
+
+Instead of re-reading the last 1,000 blocks of logs every ten minutes, the
+watcher seeds its state once and then tails new blocks: it installs an
+``eth_newFilter`` log filter and polls ``eth_getFilterChanges`` every few
+seconds. Nodes that do not keep filters (or drop them) are handled by
+falling back to ``eth_getLogs`` from a block-number watermark. Each event
+updates an in-memory address -> vote power map and a snapshot is written
+only when that map changes or the heartbeat interval passes. Bursts of
+changes are merged: snapshots are at least the minimum emit interval apart.
+
+Usage:
+    python vote_power_watcher.py [--networks flare songbird] [--once]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import current_vote_power_rpc
+from current_vote_power_rpc import (
+    VOTE_POWER_CONTRACT,
+    VOTE_POWER_EVENT_SIG,
+    VOTE_POWER_LOOKBACK_BLOCKS,
+    decode_vote_power_event,
+    providers_from_vote_powers,
+)
+from flare_rpc_new import make_rpc_call
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = float(os.getenv("VOTE_POWER_POLL_INTERVAL", "4"))  # seconds, ~2 Flare blocks
+HEARTBEAT_INTERVAL = float(os.getenv("VOTE_POWER_HEARTBEAT", "600"))  # seconds
+MIN_EMIT_INTERVAL = float(os.getenv("VOTE_POWER_MIN_EMIT_INTERVAL", "30"))  # seconds between snapshots
+MAX_BLOCK_RANGE = int(os.getenv("VOTE_POWER_MAX_BLOCK_RANGE", "2000"))  # blocks per eth_getLogs
+
+RpcCall = Callable[[str, str, Optional[List[Any]]], Any]
+
+
+def _block_number(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class VotePowerState:
+    """Latest vote power per provider address, updated event by event."""
+
+    def __init__(self):
+        self.vote_powers: Dict[str, int] = {}
+        self.version = 0  # bumped whenever a vote power actually changes
+        self.last_block = -1
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """Apply one log; return True if it changed a provider's vote power."""
+        if "blockNumber" in event:
+            self.last_block = max(self.last_block, _block_number(event["blockNumber"]))
+        try:
+            decoded = decode_vote_power_event(event)
+        except Exception as e:
+            logger.debug(f"Error processing event: {e}")
+            return False
+        if decoded is None:
+            return False
+        address, vote_power = decoded
+        if self.vote_powers.get(address) == vote_power:
+            return False
+        self.vote_powers[address] = vote_power
+        self.version += 1
+        return True
+
+    def apply_all(self, events: List[Dict[str, Any]]) -> int:
+        """Apply ``events`` in order and return how many changed the state."""
+        return sum(1 for event in events if self.apply(event))
+
+
+class VotePowerWatcher:
+    """
+    Tail VotePower events for one network and emit snapshots on change.
+
+    Args:
+        network: 'flare' or 'songbird'
+        rpc: ``(network, method, params) -> result`` JSON-RPC callable
+        filter_rpc: Callable used for filter methods; these are not retried
+            because a missing filter is handled by the watermark fallback
+        emit: Called with ``(network, providers)`` when a snapshot is due
+        heartbeat: Seconds after which an unchanged state is emitted again
+        min_emit_interval: Seconds a change waits after the previous snapshot,
+            so a burst of events produces one snapshot
+        use_filters: Try ``eth_newFilter`` before the watermark fallback
+        clock: Monotonic time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        network: str,
+        rpc: RpcCall = current_vote_power_rpc.rpc_call_with_retry,
+        filter_rpc: RpcCall = make_rpc_call,
+        emit: Callable[[str, List[Dict[str, Any]]], Any] = current_vote_power_rpc.save_providers,
+        heartbeat: float = HEARTBEAT_INTERVAL,
+        min_emit_interval: float = MIN_EMIT_INTERVAL,
+        lookback: int = VOTE_POWER_LOOKBACK_BLOCKS,
+        max_block_range: int = MAX_BLOCK_RANGE,
+        use_filters: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.network = network
+        self.rpc = rpc
+        self.filter_rpc = filter_rpc
+        self.emit = emit
+        self.heartbeat = heartbeat
+        self.min_emit_interval = min_emit_interval
+        self.lookback = lookback
+        self.max_block_range = max(1, max_block_range)
+        self.use_filters = use_filters
+        self.clock = clock
+
+        self.state = VotePowerState()
+        self.watermark: Optional[int] = None  # last block fully processed
+        self.filter_id: Optional[str] = None
+        self.filled_to = -1  # logs up to this block were read before the filter existed
+        self.log_queries = 0
+        self._emitted_version: Optional[int] = None
+        self._last_emit: Optional[float] = None
+
+    # --- RPC helpers ---
+
+    def _call(self, method: str, params: List[Any]) -> Any:
+        if method in ("eth_getLogs", "eth_getFilterChanges"):
+            self.log_queries += 1
+        if method in ("eth_newFilter", "eth_getFilterChanges", "eth_uninstallFilter"):
+            return self.filter_rpc(self.network, method, params)
+        return self.rpc(self.network, method, params)
+
+    def _log_filter(self, from_block: int, to_block: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "address": VOTE_POWER_CONTRACT,
+            "topics": [VOTE_POWER_EVENT_SIG],
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block) if to_block is not None else "latest",
+        }
+
+    def _head(self) -> int:
+        return _block_number(self._call("eth_blockNumber", []))
+
+    def _get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """Fetch logs for ``[from_block, to_block]`` in bounded ranges."""
+        events = []
+        start = from_block
+        while start <= to_block:
+            end = min(to_block, start + self.max_block_range - 1)
+            events.extend(self._call("eth_getLogs", [self._log_filter(start, end)]) or [])
+            start = end + 1
+        return events
+
+    # --- Lifecycle ---
+
+    def bootstrap(self) -> None:
+        """Seed the state from the lookback window and install a log filter."""
+        head = self._head()
+        self.state = VotePowerState()
+        self.state.apply_all(self._get_logs(max(0, head - self.lookback), head))
+        self.watermark = head
+        self._uninstall_filter()
+        if self.use_filters:
+            self.state.apply_all(self._install_filter())
+        logger.info(
+            f"{self.network}: seeded {len(self.state.vote_powers)} providers up to block {head} "
+            f"({'filter' if self.filter_id else 'watermark'} mode)"
+        )
+
+    def _install_filter(self) -> List[Dict[str, Any]]:
+        """
+        Install a log filter and return the logs it will not report.
+
+        Nodes only report logs mined after the filter was created, so blocks
+        between the watermark and that point are read once with ``eth_getLogs``.
+        """
+        try:
+            self.filter_id = self._call("eth_newFilter", [self._log_filter(self.watermark + 1)])
+        except Exception as e:
+            logger.info(f"{self.network}: eth_newFilter unavailable, using block watermark: {e}")
+            self.filter_id = None
+            self.use_filters = False
+            return []
+        start = self._head()
+        if start <= self.watermark:
+            return []
+        events = self._get_logs(self.watermark + 1, start)
+        self.watermark = self.filled_to = start
+        return events
+
+    def _uninstall_filter(self) -> None:
+        """Drop the node-side filter, if any, so re-seeding does not leak it."""
+        if self.filter_id is None:
+            return
+        filter_id, self.filter_id = self.filter_id, None
+        try:
+            self._call("eth_uninstallFilter", [filter_id])
+        except Exception as e:
+            # The node may already have expired it
+            logger.debug(f"{self.network}: could not uninstall filter {filter_id}: {e}")
+
+    def _poll_filter(self) -> Optional[List[Dict[str, Any]]]:
+        """Return new logs from the filter, or None if it is gone."""
+        try:
+            events = self._call("eth_getFilterChanges", [self.filter_id]) or []
+        except Exception as e:
+            # Filters expire on most nodes after a few minutes without polling
+            logger.info(f"{self.network}: log filter lost ({e}); catching up from block {self.watermark}")
+            self._uninstall_filter()
+            return None
+        # Skip logs the catch-up query already applied; removals still count
+        return [
+            event for event in events
+            if event.get("removed") or "blockNumber" not in event
+            or _block_number(event["blockNumber"]) > self.filled_to
+        ]
+
+    def _poll_watermark(self) -> List[Dict[str, Any]]:
+        head = self._head()
+        if head <= self.watermark:
+            return []
+        events = self._get_logs(self.watermark + 1, head)
+        self.watermark = head
+        return events
+
+    def poll_once(self) -> int:
+        """Fetch new events and apply them; return how many changed the state."""
+        if self.watermark is None:
+            self.bootstrap()
+            return self.state.version
+
+        events = None
+        if self.filter_id is not None:
+            events = self._poll_filter()
+        if events is None:
+            events = self._poll_watermark()
+            if self.use_filters:
+                events += self._install_filter()
+
+        if any(event.get("removed") for event in events):
+            # A reorg dropped logs we already applied; rebuild rather than guess
+            logger.warning(f"{self.network}: chain reorganisation detected, re-seeding state")
+            self.bootstrap()
+            return self.state.version
+
+        changed = self.state.apply_all(events)
+        if self.state.last_block > self.watermark:
+            self.watermark = self.state.last_block
+        return changed
+
+    def maybe_emit(self) -> bool:
+        """
+        Emit a snapshot if the state changed or the heartbeat is due.
+
+        A change within ``min_emit_interval`` of the previous snapshot is held
+        back and emitted, together with any later changes, once it has passed.
+        """
+        if not self.state.vote_powers:
+            return False
+        now = self.clock()
+        since_last = None if self._last_emit is None else now - self._last_emit
+        changed = self.state.version != self._emitted_version
+        heartbeat_due = since_last is None or since_last >= self.heartbeat
+        change_due = changed and (since_last is None or since_last >= self.min_emit_interval)
+        if not (change_due or heartbeat_due):
+            return False
+        providers = providers_from_vote_powers(dict(self.state.vote_powers), self.network)
+        self.emit(self.network, providers)
+        self._emitted_version = self.state.version
+        self._last_emit = now
+        logger.info(
+            f"{self.network}: emitted snapshot ({'change' if changed else 'heartbeat'}) "
+            f"at block {self.watermark}, {self.log_queries} log queries so far"
+        )
+        return True
+
+    def step(self) -> bool:
+        """Poll once and emit if needed; return True if a snapshot was written."""
+        self.poll_once()
+        return self.maybe_emit()
+
+    def close(self) -> None:
+        """Release the node-side log filter."""
+        self._uninstall_filter()
+
+    def run(self, stop: threading.Event, poll_interval: float = POLL_INTERVAL) -> None:
+        """Poll until ``stop`` is set, then close; RPC failures are logged and retried."""
+        try:
+            while not stop.is_set():
+                try:
+                    self.step()
+                except Exception as e:
+                    logger.error(f"{self.network}: poll failed: {e}")
+                stop.wait(poll_interval)
+        finally:
+            self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Watch VotePower events and write snapshots on change.")
+    parser.add_argument("--networks", nargs="+", default=["flare", "songbird"], choices=["flare", "songbird"])
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_INTERVAL,
+                        help="Seconds after which an unchanged snapshot is written again")
+    parser.add_argument("--min-emit-interval", type=float, default=MIN_EMIT_INTERVAL,
+                        help="Minimum seconds between snapshots; changes in between are merged")
+    parser.add_argument("--once", action="store_true", help="Seed, write one snapshot per network and exit")
+    args = parser.parse_args(argv)
+
+    watchers = [VotePowerWatcher(net, heartbeat=args.heartbeat, min_emit_interval=args.min_emit_interval) for net in args.networks]
+    if args.once:
+        for watcher in watchers:
+            try:
+                watcher.step()
+            finally:
+                watcher.close()
+        return
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    threads = [
+        threading.Thread(target=watcher.run, args=(stop, args.poll_interval), name=f"watch-{watcher.network}")
+        for watcher in watchers
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=1.0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
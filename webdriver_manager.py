@@ -3,23 +3,20 @@ WebDriver resource management with proper cleanup and context managers.
 """
 from __future__ import annotations
 import os
-import time
 import atexit
 import logging
+import threading
 from contextlib import contextmanager
-from typing import Optional, Generator
-
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-try:
-    from selenium.common.exceptions import WebDriverException
-except Exception:  # pragma: no cover - used only when selenium not installed
-    class WebDriverException(Exception):
-        """Fallback exception when selenium is unavailable."""
-        pass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Generator, List
 
 from exceptions import WebDriverError, ConfigurationError
+from retry_policy import RetryPolicy, DRIVER_CRASH
+
+if TYPE_CHECKING:  # selenium is imported lazily when a browser is started
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
 
 logger = logging.getLogger(__name__)
 
@@ -43,16 +40,131 @@ def _cleanup_all_drivers():
 atexit.register(_cleanup_all_drivers)
 
 
+def register_driver(driver) -> None:
+    """Track a driver created outside this module so it is quit on exit or abort."""
+    _active_drivers.add(driver)
+
+
+def unregister_driver(driver) -> None:
+    _active_drivers.discard(driver)
+
+
+def quit_active_drivers() -> None:
+    """
+    Quit every running WebDriver now.
+
+    Used when a collection passes its deadline: the blocked WebDriver call in
+    the hung thread then fails and the thread can finish.
+    """
+    for driver in list(_active_drivers):
+        _active_drivers.discard(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Error quitting WebDriver: {e}")
+
+
+# Seconds a page load or script may take before WebDriver gives up
+DRIVER_TIMEOUT = int(os.getenv("DRIVER_TIMEOUT", "30"))
+
+# Name of the default profile: "lean" blocks heavy resources, "full" loads everything
+SCRAPING_PROFILE = os.getenv("SCRAPING_PROFILE", "lean")
+
+# URL patterns for images, fonts and media (Network.setBlockedURLs wildcards)
+HEAVY_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+]
+
+TRACKER_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "facebook.net", "hotjar.com", "segment.io",
+    "plausible.io", "cloudflareinsights.com", "clarity.ms", "mixpanel.com",
+]
+
+
+@dataclass
+class ScrapingProfile:
+    """Browser settings that control what a scraping session loads."""
+    name: str
+    page_load_strategy: str = "normal"
+    block_images: bool = False
+    blocked_url_patterns: List[str] = field(default_factory=list)
+    # When set, every host outside this list fails DNS resolution
+    allowed_hosts: Optional[List[str]] = None
+
+    def with_allowed_hosts(self, hosts: List[str]) -> "ScrapingProfile":
+        """Return a copy of this profile restricted to ``hosts``."""
+        return ScrapingProfile(
+            name=self.name,
+            page_load_strategy=self.page_load_strategy,
+            block_images=self.block_images,
+            blocked_url_patterns=list(self.blocked_url_patterns),
+            allowed_hosts=list(hosts),
+        )
+
+
+FULL_PROFILE = ScrapingProfile(name="full")
+
+LEAN_PROFILE = ScrapingProfile(
+    name="lean",
+    page_load_strategy="eager",
+    block_images=True,
+    blocked_url_patterns=HEAVY_RESOURCE_PATTERNS + [f"*{d}*" for d in TRACKER_DOMAINS],
+)
+
+PROFILES = {"full": FULL_PROFILE, "lean": LEAN_PROFILE}
+
+
+def get_profile(name: Optional[str] = None) -> ScrapingProfile:
+    """Return the named profile, defaulting to ``SCRAPING_PROFILE``."""
+    name = name or SCRAPING_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ConfigurationError(f"Unknown scraping profile: {name}")
+
+
+def apply_profile_options(options: Options, profile: ScrapingProfile) -> Options:
+    """Apply the start-up parts of ``profile`` (load strategy, flags) to ``options``."""
+    options.page_load_strategy = profile.page_load_strategy
+    if profile.block_images:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    if profile.allowed_hosts:
+        excluded = ", ".join(f"EXCLUDE {host}" for host in profile.allowed_hosts)
+        options.add_argument(f'--host-resolver-rules=MAP * ~NOTFOUND, {excluded}')
+    return options
+
+
+def apply_profile_blocking(driver, profile: ScrapingProfile) -> None:
+    """Install CDP request blocking for ``profile`` on a started driver."""
+    if not profile.blocked_url_patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.blocked_url_patterns})
+    except Exception as e:
+        # Blocking is an optimisation only; never fail the scrape over it
+        logger.warning(f"Could not enable request blocking for {profile.name} profile: {e}")
+
+
 class WebDriverManager:
     """Manages WebDriver lifecycle with proper resource cleanup."""
     
-    def __init__(self, max_retries: int = 3, retry_delay: int = 5):
+    def __init__(self, max_retries: int = 3, retry_delay: int = 5, profile: Optional[ScrapingProfile] = None):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.profile = profile or get_profile()
         self.driver: Optional[webdriver.Chrome] = None
         
     def _create_driver_options(self) -> Options:
         """Create Chrome options for headless operation."""
+        from selenium.webdriver.chrome.options import Options
+
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
@@ -69,11 +181,14 @@ class WebDriverManager:
             if not os.path.exists(binary_path):
                 raise ConfigurationError(f"Chromium binary not found: {binary_path}")
             options.binary_location = binary_path
-            
+
+        apply_profile_options(options, self.profile)
         return options
         
     def _create_driver_service(self) -> Service:
         """Create Chrome service with custom driver path if specified."""
+        from selenium.webdriver.chrome.service import Service
+
         driver_path = os.getenv('CHROMEDRIVER')
         if driver_path:
             if not os.path.exists(driver_path):
@@ -83,9 +198,39 @@ class WebDriverManager:
             # Let selenium manage the driver automatically
             return Service()
     
+    def _start_driver(self) -> webdriver.Chrome:
+        """Start a single WebDriver instance without retrying."""
+        from selenium import webdriver
+
+        options = self._create_driver_options()
+        service = self._create_driver_service()
+
+        driver = webdriver.Chrome(service=service, options=options)
+
+        # Register for cleanup
+        _active_drivers.add(driver)
+
+        try:
+            # Bound every page load and script so a stuck page cannot hang the caller
+            driver.set_page_load_timeout(DRIVER_TIMEOUT)
+            driver.set_script_timeout(DRIVER_TIMEOUT)
+            apply_profile_blocking(driver, self.profile)
+        except Exception:
+            # A retry starts a new browser; do not leave this one running
+            _active_drivers.discard(driver)
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting half-initialised driver: {e}")
+            raise
+        return driver
+
     def create_driver(self) -> webdriver.Chrome:
         """
         Create a new WebDriver instance with retry logic.
+
+        Only driver start-up crashes are retried, with jittered exponential
+        backoff starting at ``retry_delay`` seconds.
         
         Returns:
             Chrome WebDriver instance
@@ -93,37 +238,18 @@ class WebDriverManager:
         Raises:
             WebDriverError: If driver creation fails after retries
         """
-        last_error = None
-        
-        for attempt in range(self.max_retries):
-            try:
-                options = self._create_driver_options()
-                service = self._create_driver_service()
-                
-                driver = webdriver.Chrome(service=service, options=options)
-                
-                # Test the driver with a simple operation
-                driver.set_page_load_timeout(30)
-                
-                # Register for cleanup
-                _active_drivers.add(driver)
-                
-                logger.info(f"WebDriver created successfully on attempt {attempt + 1}")
-                return driver
-                
-            except WebDriverException as e:
-                last_error = e
-                logger.warning(f"WebDriver creation attempt {attempt + 1} failed: {e}")
-                
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    
-            except Exception as e:
-                last_error = e
-                logger.error(f"Unexpected error creating WebDriver: {e}")
-                break
-        
-        raise WebDriverError(f"Failed to create WebDriver after {self.max_retries} attempts: {last_error}")
+        policy = RetryPolicy(
+            max_attempts=self.max_retries,
+            base_delay=self.retry_delay,
+            retry_on={DRIVER_CRASH},
+        )
+        try:
+            driver = policy.call(self._start_driver, description="WebDriver start")
+        except Exception as e:
+            raise WebDriverError(f"Failed to create WebDriver after {self.max_retries} attempts: {e}")
+
+        logger.info("WebDriver created successfully")
+        return driver
     
     def cleanup_driver(self, driver: webdriver.Chrome) -> None:
         """
@@ -159,13 +285,18 @@ class WebDriverManager:
 
 
 @contextmanager
-def get_webdriver(max_retries: int = 3, retry_delay: int = 5) -> Generator[webdriver.Chrome, None, None]:
+def get_webdriver(
+    max_retries: int = 3,
+    retry_delay: int = 5,
+    profile: Optional[ScrapingProfile] = None,
+) -> Generator[webdriver.Chrome, None, None]:
     """
     Context manager for WebDriver with automatic cleanup.
     
     Args:
         max_retries: Maximum retry attempts for driver creation
         retry_delay: Delay between retry attempts in seconds
+        profile: Scraping profile (defaults to ``SCRAPING_PROFILE``)
         
     Yields:
         Chrome WebDriver instance
@@ -175,7 +306,7 @@ def get_webdriver(max_retries: int = 3, retry_delay: int = 5) -> Generator[webdr
             driver.get("https://example.com")
             # Driver automatically cleaned up
     """
-    manager = WebDriverManager(max_retries=max_retries, retry_delay=retry_delay)
+    manager = WebDriverManager(max_retries=max_retries, retry_delay=retry_delay, profile=profile)
     
     try:
         driver = manager.create_driver()
@@ -184,6 +315,84 @@ def get_webdriver(max_retries: int = 3, retry_delay: int = 5) -> Generator[webdr
         manager.cleanup_driver(driver)
 
 
+class WebDriverPool:
+    """
+    Bounded pool of reusable WebDriver sessions for concurrent scraping.
+
+    Each borrower gets a session of its own; sessions are returned to the pool
+    after use and reused by later borrowers. A session that raised while in
+    use is discarded instead of being returned.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_retries: int = 3,
+        retry_delay: int = 5,
+        profile: Optional[ScrapingProfile] = None,
+    ):
+        self.size = size
+        self._manager = WebDriverManager(max_retries=max_retries, retry_delay=retry_delay, profile=profile)
+        self._idle: list = []
+        self._in_use: set = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def session(self) -> Generator[webdriver.Chrome, None, None]:
+        """Borrow a driver from the pool, creating one if none is idle."""
+        self._slots.acquire()
+        driver = None
+        healthy = False
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                driver = self._manager.create_driver()
+            with self._lock:
+                self._in_use.add(driver)
+            yield driver
+            healthy = True
+        finally:
+            if driver is not None:
+                with self._lock:
+                    # abort() already quit a driver it took from the borrower
+                    healthy = healthy and driver in self._in_use
+                    self._in_use.discard(driver)
+                if healthy:
+                    with self._lock:
+                        self._idle.append(driver)
+                else:
+                    self._manager.cleanup_driver(driver)
+            self._slots.release()
+
+    def close(self) -> None:
+        """Quit every idle driver held by the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._manager.cleanup_driver(driver)
+
+    def abort(self) -> None:
+        """
+        Quit every driver of the pool, including those currently borrowed.
+
+        A borrower blocked in a WebDriver call gets an error, leaves its
+        session and releases its slot; later borrowers start fresh drivers.
+        """
+        with self._lock:
+            drivers = self._idle + list(self._in_use)
+            self._idle, self._in_use = [], set()
+        for driver in drivers:
+            self._manager.cleanup_driver(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 def init_driver() -> webdriver.Chrome:
     """
     Legacy function for backward compatibility.